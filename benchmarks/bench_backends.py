@@ -0,0 +1,48 @@
+"""
+Compare pivot_to on each installed backend, for string and categorical keys.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_backends --rows 5000000
+"""
+import argparse
+import os
+import time
+from src.data_formatter.backends import available_backends
+from src.data_formatter.pivot_tables import pivot_to
+from benchmarks.bench_pivot_to import make_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type = int, default = 1_000_000)
+    parser.add_argument("--keys", type = int, default = 6)
+    parser.add_argument("--cardinality", type = int, default = 8)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    df = make_ledger(args.rows, args.keys, args.cardinality)
+    categorical = df.astype({x: "category" for x in df.columns if df[x].dtype == object})
+    print(f"{args.rows:,} rows, {args.keys} keys with {args.cardinality} values each, {os.cpu_count()} CPUs")
+
+    def best_of(run):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+        return result, min(times)
+
+    for label, data in [("string keys", df), ("categorical keys", categorical)]:
+        print(label)
+        expected, baseline = best_of(lambda: pivot_to(data, ["amount"], ["duration", "annum"], margins = True))
+        for backend in available_backends():
+            result, elapsed = best_of(
+                lambda: pivot_to(data, ["amount"], ["duration", "annum"], margins = True, backend = backend)
+            )
+            assert result.equals(expected)
+            print(f"  {backend:>8}: {elapsed:8.3f} s   {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
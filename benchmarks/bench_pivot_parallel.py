@@ -0,0 +1,50 @@
+"""
+Measure how pivot_parallel scales with the number of worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pivot_parallel --rows 5000000 --workers 1 2 4 8 16 32
+"""
+import argparse
+import os
+import time
+from src.data_formatter.pivot_tables import pivot_parallel, pivot_to
+from benchmarks.bench_pivot_to import make_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type = int, default = 1_000_000)
+    parser.add_argument("--keys", type = int, default = 6)
+    parser.add_argument("--cardinality", type = int, default = 8)
+    parser.add_argument("--workers", type = int, nargs = "+", default = None)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)))
+
+    df = make_ledger(args.rows, args.keys, args.cardinality)
+    print(f"{args.rows:,} rows, {args.keys} string keys with {args.cardinality} values each, {cpus} CPUs")
+
+    def best_of(run):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+        return result, min(times)
+
+    expected, baseline = best_of(lambda: pivot_to(df, ["amount"], ["duration", "annum"], margins = True))
+    print(f"  {'pivot_to':>12}: {baseline:8.3f} s")
+
+    for n in workers:
+        result, elapsed = best_of(
+            lambda: pivot_parallel(df, ["amount"], ["duration", "annum"], margins = True, max_workers = n)
+        )
+        assert result.equals(expected)
+        print(f"  {n:>4} workers: {elapsed:8.3f} s   {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
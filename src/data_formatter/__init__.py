@@ -1,5 +1,10 @@
 from .pivot_tables import pivot_to_standard_format
 from .pivot_tables import pivot_to_series_format
+from .pivot_tables import pivot_many
+from .pivot_tables import pivot_chunks
+from .pivot_tables import pivot_parallel
+from .pivot_tables import IncrementalPivot
+from .pivot_tables import add_subtotals
 
 from .dataframe_find import find_columns
 from .dataframe_find import find_columns_like
@@ -10,14 +15,25 @@ from .dataframe_find import find_rows_like
 from .dataframe_find import find_row_positions
 
 from .dataframe_add_calculation import add_calculated_column
+from .dataframe_add_calculation import add_calculated_columns
 from .dataframe_add_calculation import add_calculated_row
 from .dataframe_add_calculation import add_calculated_columns_by_group
 from .dataframe_add_calculation import add_calculated_rows_by_group
+from .dataframe_add_calculation import add_expression_columns_by_group
+from .dataframe_add_calculation import add_expression_rows_by_group
+from .dataframe_add_calculation import add_comparison_columns_by_group
+from .dataframe_add_calculation import add_comparison_rows_by_group
+
+from .expressions import compile_expressions
+from .expressions import comparison_expressions
 
 from .calculations import make_commonsize_vertical
 from .calculations import make_commonsize_horizontal
 from .calculations import growth
 
+from .time_intelligence import compute_durations
+from .time_intelligence import compute_durations_as_of
+
 from .excel_attributes import get_dataframe_attributes, get_chart_attributes
 from .excel_attributes import get_cell_range
 from .excel_attributes import get_dataframe_cell_range
@@ -29,11 +45,15 @@ from .excel_attributes import add_absolute_notation
 
 from .excel_output import create_workbook
 from .excel_output import quick_output
+from .excel_output import write_dataframe
+from .excel_output import compile_styler
 from .excel_output import add_named_region
 from .excel_output import add_dataframe_below
 from .excel_output import add_dataframes_below
 from .excel_output import add_dataframe_right
 from .excel_output import add_dataframes_right
+from .excel_output import add_range_styles
+from .excel_output import add_banding
 from .excel_output import format_page
 from .excel_output import bring_sheets_to_front
 from .excel_output import convert_named_ranges_to_print_areas
@@ -54,6 +74,14 @@ from .excel_dataframe_styles import alternate_color_rows
 from .excel_dataframe_styles import alternate_color_cols
 from .excel_dataframe_styles import format_category_level
 from .excel_dataframe_styles import format_hyperlink
+from .excel_dataframe_styles import range_style
+from .excel_dataframe_styles import range_format_standard
+from .excel_dataframe_styles import range_format_dollars
+from .excel_dataframe_styles import range_format_percent
+from .excel_dataframe_styles import range_format_totals
+from .excel_dataframe_styles import range_color_rows
+from .excel_dataframe_styles import range_color_cols
+from .excel_dataframe_styles import range_format_hyperlink
 
 from .excel_chart_styles import set_chart_size_and_position, set_chart_area_style
 from .excel_chart_styles import set_legend_style, set_axis_as_dollars, set_axis_as_date
@@ -63,4 +91,14 @@ from .util import get_even_numbers, replace_list_element, proper_case, sort_data
 from .util import only_one, not_in, unique_string, index_to_dict, repeat_c
 from .util import column_count, column_level_count, row_count, row_level_count
 
-from .constants import duration_order, annum_order
+from .constants import duration_order, annum_order, version_order
+from .constants import duration_dtype, annum_dtype, version_dtype
+
+from .categoricals import apply_canonical_dtypes
+from .categoricals import get_canonical_dtype
+from .categoricals import register_canonical_order
+
+from .backends import available_backends
+from .backends import get_backend
+from .backends import register_backend
+from .backends import group_aggregate
@@ -0,0 +1,313 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import polars
+except ImportError:  # polars is optional
+    polars = None
+
+try:
+    import duckdb
+except ImportError:  # duckdb is optional
+    duckdb = None
+
+
+# The aggregations every backend supports
+AGGREGATIONS = ['sum', 'count', 'min', 'max']
+
+
+class PandasBackend:
+    """
+    Group-by operations run with pandas. Always available and the reference for the others.
+
+    A backend answers two questions about a DataFrame, each in terms of row positions so
+    that the caller can rebuild labels from the original pandas columns:
+
+    - `aggregate`: the first row of each group and its aggregates, in order of first appearance.
+    - `first_by_group`: for every row, the first non-missing value among the selected rows of its group.
+    """
+
+    name = 'pandas'
+
+    def aggregate(
+        self,
+        df: pd.DataFrame,
+        keys: List[str],
+        aggregations: List[Tuple[str, str]],
+        dropna: bool = True
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Aggregate columns by group.
+
+        Args:
+            df (pd.DataFrame): The input DataFrame.
+            keys (List[str]): The columns to group by.
+            aggregations (List[Tuple[str, str]]): (column, function) pairs, with functions from `AGGREGATIONS`.
+            dropna (bool): Leave out groups with a missing key. Defaults to True.
+
+        Returns:
+            Tuple[np.ndarray, List[np.ndarray]]: The first row position of each group and one array per
+                                                 aggregation, with groups in order of first appearance.
+        """
+        grouped = df.groupby(keys, sort = False, dropna = dropna, observed = True)
+        # Rows with a missing key are numbered NaN when they are dropped
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype = np.intp)
+        valid = np.flatnonzero(codes >= 0)
+        first_rows = valid[np.unique(codes[valid], return_index = True)[1]]
+        results = [grouped[col].agg(func).to_numpy() for col, func in aggregations]
+        return first_rows, results
+
+    def first_by_group(self, df: pd.DataFrame, keys: List[str], values: List[str], mask: np.ndarray) -> np.ndarray:
+        """
+        Broadcast the first non-missing value among the rows where `mask` is True to every row of the group.
+
+        Args:
+            df (pd.DataFrame): The input DataFrame.
+            keys (List[str]): The columns to group by. Missing keys form their own group.
+            values (List[str]): The value columns.
+            mask (np.ndarray): The rows that may provide the value.
+
+        Returns:
+            np.ndarray: A float64 array with one row per input row and one column per value.
+        """
+        selected = df[values].where(np.broadcast_to(mask[:, None], (len(df), len(values))))
+        grouper = [df[k] for k in keys]
+        return selected.groupby(grouper, sort = False, dropna = False, observed = True).transform('first').to_numpy(dtype = np.float64)
+
+
+def _quote(name: str) -> str:
+    """Quote a column name for SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _row_numbered(df: pd.DataFrame, columns: List[str]) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Copy the given columns under plain positional names and add the row position as '__row'."""
+    names = {col: f"c{i}" for i, col in enumerate(dict.fromkeys(columns))}
+    frame = pd.DataFrame({names[col]: df[col].reset_index(drop = True) for col in names})
+    frame['__row'] = np.arange(len(df), dtype = np.int64)
+    return frame, names
+
+
+class PolarsBackend:
+    """Group-by operations run with Polars, which groups on all cores."""
+
+    name = 'polars'
+
+    def aggregate(
+        self,
+        df: pd.DataFrame,
+        keys: List[str],
+        aggregations: List[Tuple[str, str]],
+        dropna: bool = True
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Aggregate columns by group. See `PandasBackend.aggregate`."""
+        frame, names = _row_numbered(df, keys + [col for col, _ in aggregations])
+        data = polars.from_pandas(frame)
+        key_names = [names[k] for k in keys]
+        if dropna:
+            data = data.drop_nulls(key_names)
+        exprs = [polars.col('__row').min().alias('__first')]
+        for i, (col, func) in enumerate(aggregations):
+            exprs.append(getattr(polars.col(names[col]), func)().alias(f"a{i}"))
+        result = data.group_by(key_names, maintain_order = True).agg(exprs)
+        return (
+            result['__first'].to_numpy().astype(np.intp),
+            [result[f"a{i}"].to_numpy() for i in range(len(aggregations))]
+        )
+
+    def first_by_group(self, df: pd.DataFrame, keys: List[str], values: List[str], mask: np.ndarray) -> np.ndarray:
+        """Broadcast the first selected value of each group. See `PandasBackend.first_by_group`."""
+        frame, names = _row_numbered(df, keys + values)
+        frame['__mask'] = mask
+        data = polars.from_pandas(frame)
+        key_names = [names[k] for k in keys]
+        exprs = [
+            polars.col(names[v]).filter(polars.col('__mask') & polars.col(names[v]).is_not_null())
+            .first().over(key_names).cast(polars.Float64).alias(f"b{i}")
+            for i, v in enumerate(values)
+        ]
+        result = data.select(exprs)
+        return result.to_numpy().astype(np.float64).reshape(len(df), len(values))
+
+
+class DuckDBBackend:
+    """Group-by operations run as SQL on an in-process DuckDB connection."""
+
+    name = 'duckdb'
+
+    def aggregate(
+        self,
+        df: pd.DataFrame,
+        keys: List[str],
+        aggregations: List[Tuple[str, str]],
+        dropna: bool = True
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Aggregate columns by group. See `PandasBackend.aggregate`."""
+        frame, names = _row_numbered(df, keys + [col for col, _ in aggregations])
+        key_sql = ', '.join(_quote(names[k]) for k in keys)
+        selects = ['min(__row) AS __first']
+        for i, (col, func) in enumerate(aggregations):
+            expr = f"{func}({_quote(names[col])})"
+            # pandas sums an all-missing group to 0
+            selects.append(f"coalesce({expr}, 0) AS a{i}" if func in ('sum', 'count') else f"{expr} AS a{i}")
+        where = ' AND '.join(f"{_quote(names[k])} IS NOT NULL" for k in keys) if dropna else 'TRUE'
+        query = f"SELECT {', '.join(selects)} FROM ledger WHERE {where} GROUP BY {key_sql} ORDER BY __first"
+
+        with duckdb.connect() as con:
+            con.register('ledger', frame)
+            result = con.execute(query).df()
+        return (
+            result['__first'].to_numpy().astype(np.intp),
+            [result[f"a{i}"].to_numpy() for i in range(len(aggregations))]
+        )
+
+    def first_by_group(self, df: pd.DataFrame, keys: List[str], values: List[str], mask: np.ndarray) -> np.ndarray:
+        """Broadcast the first selected value of each group. See `PandasBackend.first_by_group`."""
+        frame, names = _row_numbered(df, keys + values)
+        frame['__mask'] = mask
+        partition = ', '.join(_quote(names[k]) for k in keys)
+        window = f"OVER (PARTITION BY {partition} ORDER BY __row ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)"
+        selects = [
+            f"CAST(first_value(CASE WHEN __mask THEN {_quote(names[v])} END IGNORE NULLS) {window} AS DOUBLE) AS b{i}"
+            for i, v in enumerate(values)
+        ]
+        query = f"SELECT {', '.join(selects)} FROM ledger ORDER BY __row"
+
+        with duckdb.connect() as con:
+            con.register('ledger', frame)
+            result = con.execute(query).df()
+        return result.to_numpy(dtype = np.float64, na_value = np.nan).reshape(len(df), len(values))
+
+
+_BACKENDS = {'pandas': PandasBackend()}
+if polars is not None:
+    _BACKENDS['polars'] = PolarsBackend()
+if duckdb is not None:
+    _BACKENDS['duckdb'] = DuckDBBackend()
+
+_EXTRAS = {'polars': 'polars', 'duckdb': 'duckdb'}
+
+
+def available_backends() -> List[str]:
+    """Return the names of the backends that can be used in this environment."""
+    return list(_BACKENDS)
+
+
+def register_backend(name: str, backend: object) -> None:
+    """
+    Register a backend under a name, replacing any backend already registered under it.
+
+    Args:
+        name (str): The name to select the backend with, e.g. 'spark'.
+        backend (object): An object with `aggregate` and `first_by_group` methods that behave like
+                          those of `PandasBackend`.
+    """
+    _BACKENDS[name] = backend
+
+
+def get_backend(name: Optional[str] = None) -> object:
+    """
+    Get a backend by name.
+
+    Args:
+        name (Optional[str]): 'pandas', 'polars', 'duckdb' or a registered name. Defaults to 'pandas'.
+
+    Returns:
+        object: The backend.
+
+    Raises:
+        ImportError: If the backend's package is not installed.
+        ValueError: If the name is unknown.
+    """
+    name = name or 'pandas'
+    if name in _BACKENDS:
+        return _BACKENDS[name]
+    if name in _EXTRAS:
+        raise ImportError(f"The '{name}' backend needs {name}: pip install data_formatter[{_EXTRAS[name]}]")
+    raise ValueError(f"Unknown backend '{name}'. Use any of {', '.join(_BACKENDS)}.")
+
+
+def _aggregate_dtype(dtype: np.dtype, func: str) -> np.dtype:
+    """Return the dtype pandas gives an aggregation of a column."""
+    if func == 'count':
+        return np.dtype(np.int64)
+    if dtype.kind in 'iub':
+        return np.dtype(np.int64) if func == 'sum' or dtype.kind == 'b' else dtype
+    return np.dtype(np.float64)
+
+
+def group_aggregate(
+    df: pd.DataFrame,
+    keys: List[str],
+    aggregations: List[Tuple[str, str]],
+    backend: Optional[str] = None,
+    dropna: bool = True
+) -> pd.DataFrame:
+    """
+    Aggregate columns by group on a backend and return the result as a pandas DataFrame.
+
+    The groups come back in order of first appearance, as with ``groupby(sort=False)``, and the
+    key labels are taken from the input rows, so they keep their pandas dtypes whichever backend
+    did the work. Aggregates are given the dtypes pandas would produce.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        keys (List[str]): The columns to group by.
+        aggregations (List[Tuple[str, str]]): (column, function) pairs, with functions from `AGGREGATIONS`.
+        backend (Optional[str]): The backend to run on. Defaults to 'pandas'.
+        dropna (bool): Leave out groups with a missing key. Defaults to True.
+
+    Returns:
+        pd.DataFrame: One row per group, indexed by the keys, with one column per (column, function) pair.
+
+    Raises:
+        ValueError: If a function is not in `AGGREGATIONS` or the backend is unknown.
+
+    Example:
+        group_aggregate(ledger, ['company', 'annum'], [('amount', 'sum')], backend='polars')
+    """
+    unknown = [func for _, func in aggregations if func not in AGGREGATIONS]
+    if len(unknown) > 0:
+        raise ValueError(f"Unsupported aggregations: {', '.join(unknown)}. Use any of {', '.join(AGGREGATIONS)}.")
+
+    first_rows, results = get_backend(backend).aggregate(df, list(keys), list(aggregations), dropna)
+
+    columns = {}
+    for (col, func), values in zip(aggregations, results):
+        dtype = _aggregate_dtype(df[col].dtype, func)
+        values = np.asarray(values)
+        if dtype.kind in 'iub' and pd.isna(values).any():
+            dtype = np.dtype(np.float64)
+        columns[(col, func)] = values.astype(dtype)
+
+    labels = df[list(keys)].take(first_rows)
+    index = pd.MultiIndex.from_frame(labels) if len(keys) > 1 else pd.Index(labels.iloc[:, 0], name = keys[0])
+    result = pd.DataFrame(columns, index = index)
+    if len(columns) > 0:
+        result.columns = pd.MultiIndex.from_tuples(list(columns))
+    return result
+
+
+def first_by_group(
+    df: pd.DataFrame,
+    keys: List[str],
+    values: List[str],
+    mask: np.ndarray,
+    backend: Optional[str] = None
+) -> np.ndarray:
+    """
+    For every row, get the first non-missing value among the rows of its group where `mask` is True.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        keys (List[str]): The columns to group by. Missing keys form their own group.
+        values (List[str]): The value columns.
+        mask (np.ndarray): The rows that may provide the value.
+        backend (Optional[str]): The backend to run on. Defaults to 'pandas'.
+
+    Returns:
+        np.ndarray: A float64 array with one row per input row and one column per value, NaN where
+                    the group has no such row.
+    """
+    return get_backend(backend).first_by_group(df, list(keys), list(values), np.asarray(mask, dtype = bool))
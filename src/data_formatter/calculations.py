@@ -1,7 +1,9 @@
 import numpy as np
-from typing import Union, List
+from typing import List, Optional, Union
 import pandas as pd
 from src.data_formatter.validate import *
+from src.data_formatter.index_lookup import get_index_lookup
+from src.data_formatter.backends import first_by_group
 
 
 def growth(x: Union[np.ndarray, float], y: Union[np.ndarray, float]) -> np.ndarray:
@@ -23,13 +25,149 @@ def growth(x: Union[np.ndarray, float], y: Union[np.ndarray, float]) -> np.ndarr
     return np.divide(x, y, out=np.zeros_like(x, dtype=np.float64), where=y != 0.0)
 
 
-def make_commonsize_vertical(df, category_col, category_val, group_cols):
-    calc = lambda x: x / x.loc[x.index.get_level_values(category_col) == category_val].values
-    result = df.groupby(group_cols, group_keys = False).apply(calc)
+def _axis_values(df: pd.DataFrame, name: Union[str, tuple]) -> np.ndarray:
+    """Get the values of an index level or, failing that, of a column."""
+    if name in df.index.names:
+        return df.index.get_level_values(name)
+    if name in df.columns:
+        return df[name]
+    raise KeyError(f"'{name}' is not an index level or a column of the DataFrame.")
+
+
+def make_commonsize_vertical(
+    df: pd.DataFrame,
+    category_col: Union[str, tuple],
+    category_val: Union[str, int],
+    group_cols: Union[str, List[Union[str, tuple]]],
+    backend: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Divide every row by the base row of its group, e.g. to express each line as a percent of revenue.
+
+    Rows are grouped by `group_cols`. Within each group, the first row whose `category_col`
+    equals `category_val` is the base. Base rows are selected once, broadcast to their group
+    with a single grouped `transform`, and the division is done in one array operation.
+    As in `growth`, rows whose base is zero, missing, or absent from the group get zero.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        category_col (Union[str, tuple]): The index level (or column) that identifies the base rows.
+        category_val (Union[str, int]): The value of `category_col` on the base rows.
+        group_cols (Union[str, List[Union[str, tuple]]]): The index levels (or columns) to group by.
+        backend (Optional[str]): The engine that finds each group's base row: 'pandas', 'polars' or
+                                 'duckdb'. Defaults to pandas.
+
+    Returns:
+        pd.DataFrame: A copy of the DataFrame with the numeric value columns divided by their base.
+                      Grouping and category columns, and non-numeric columns, are left as they are.
+
+    Raises:
+        ValueError: If the DataFrame is empty.
+        KeyError: If `category_col` or one of the `group_cols` is neither an index level nor a column.
+
+    Example:
+        make_commonsize_vertical(income_statement, 'line_item', 'Revenue', ['company', 'period'])
+    """
+    validate_dataframe_not_empty(df)
+    if isinstance(group_cols, (str, tuple)):
+        group_cols = [group_cols]
+
+    keys = [_axis_values(df, x) for x in group_cols]
+    is_base = np.asarray(_axis_values(df, category_col) == category_val)
+
+    key_columns = [x for x in group_cols + [category_col] if x not in df.index.names]
+    value_cols = [x for x in df.select_dtypes('number').columns if x not in key_columns]
+    values = df[value_cols]
+
+    # Broadcast the first base row of each group to every row of the group
+    frame = pd.DataFrame({f"key{i}": np.asarray(k) for i, k in enumerate(keys)})
+    for i, col in enumerate(value_cols):
+        frame[f"value{i}"] = values[col].to_numpy()
+    base = first_by_group(
+        frame, [f"key{i}" for i in range(len(keys))], [f"value{i}" for i in range(len(value_cols))], is_base, backend
+    )
+
+    result = df.copy()
+    numerator = values.to_numpy(dtype = np.float64)
+    result[value_cols] = np.divide(
+        numerator,
+        base,
+        out = np.zeros_like(numerator),
+        where = (base != 0.0) & ~np.isnan(base)
+    )
     return result
 
 
-def make_commonsize_horizontal(df):
-    df = df.apply(lambda x: x / x.shift(1), axis = 1)
-    df = df.drop(df.columns.values[0], axis = 1)
-    return df
+def make_commonsize_horizontal(
+    df: pd.DataFrame,
+    lag: int = 1,
+    base: Optional[int] = None,
+    level: Optional[Union[int, str]] = None
+) -> pd.DataFrame:
+    """
+    Divide each column by an earlier column, e.g. to get period-over-period growth.
+
+    By default each column is divided by the column `lag` places before it and the first
+    `lag` columns, which have nothing to compare against, are dropped. When `base` is given,
+    every column is instead divided by the column at that position (``base=0`` indexes every
+    period to the first one) and all columns are kept.
+
+    The division is a single operation on the 2-D array of values, with the same zero-safe
+    semantics as `growth`: dividing by zero gives zero.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame, with periods as columns.
+        lag (int): How many columns back to compare against. Defaults to 1.
+        base (Optional[int]): The position of a fixed base column. If None, use `lag`.
+        level (Optional[Union[int, str]]): A column level to split the columns into blocks,
+                                           for example 'duration'. Lags and base positions are
+                                           then applied within each block. If None, all columns
+                                           form one block.
+
+    Returns:
+        pd.DataFrame: The DataFrame of ratios.
+
+    Raises:
+        ValueError: If the DataFrame is empty, `lag` is not positive or `base` is outside a block.
+        TypeError: If `lag` or `base` is not an integer.
+
+    Example:
+        make_commonsize_horizontal(df, lag=12, level='duration')
+    """
+    validate_dataframe_not_empty(df)
+    validate_value_is_an_int(lag)
+    if lag < 1:
+        raise ValueError("The lag must be a positive integer.")
+    if base is not None:
+        validate_value_is_an_int(base)
+
+    # Split the column positions into blocks
+    if level is None:
+        blocks = [np.arange(len(df.columns))]
+    else:
+        if isinstance(level, str):
+            level = list(df.columns.names).index(level)
+        blocks = list(get_index_lookup(df.columns).value_positions(level).values())
+
+    # Pair every numerator column with its denominator column
+    numerators = []
+    denominators = []
+    for positions in blocks:
+        if base is None:
+            numerators.append(positions[lag:])
+            denominators.append(positions[:-lag] if lag < len(positions) else positions[:0])
+        else:
+            if not -len(positions) <= base < len(positions):
+                raise ValueError(f"The base position {base} is outside a block of {len(positions)} columns.")
+            numerators.append(positions)
+            denominators.append(np.full(len(positions), positions[base]))
+    numerators = np.concatenate(numerators)
+    denominators = np.concatenate(denominators)
+
+    # Keep the original column order
+    order = np.argsort(numerators, kind = 'stable')
+    numerators, denominators = numerators[order], denominators[order]
+
+    values = df.to_numpy(dtype = np.float64)
+    result = growth(values[:, numerators], values[:, denominators])
+    return pd.DataFrame(result, index = df.index, columns = df.columns[numerators])
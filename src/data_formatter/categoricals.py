@@ -0,0 +1,106 @@
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+from typing import Hashable, List, Optional
+from .constants import canonical_dtypes
+
+
+def get_canonical_dtype(name: Hashable) -> Optional[CategoricalDtype]:
+    """
+    Get the shared ordered categorical dtype registered for a column or level name.
+
+    Args:
+        name (Hashable): The column or level name, e.g. 'duration'.
+
+    Returns:
+        Optional[CategoricalDtype]: The registered dtype, or None if the name has none.
+    """
+    return canonical_dtypes.get(name)
+
+
+def register_canonical_order(name: str, order: List[str]) -> CategoricalDtype:
+    """
+    Register a canonical order for a column or level name.
+
+    The order is stored as one ordered `CategoricalDtype` that every frame converted with
+    `apply_canonical_dtypes` shares. Registering a name again replaces its order.
+
+    Args:
+        name (str): The column or level name, e.g. 'region'.
+        order (List[str]): The values in canonical order.
+
+    Returns:
+        CategoricalDtype: The registered dtype.
+
+    Raises:
+        ValueError: If the order contains duplicates.
+
+    Example:
+        register_canonical_order('region', ['North', 'South', 'East', 'West'])
+    """
+    if len(set(order)) != len(order):
+        raise ValueError(f"The order for '{name}' contains duplicate values.")
+    canonical_dtypes[name] = CategoricalDtype(list(order), ordered = True)
+    return canonical_dtypes[name]
+
+
+def _check_values(values: pd.Index, dtype: CategoricalDtype, name: Hashable) -> None:
+    """Raise if any non-missing value is not one of the dtype's categories."""
+    unknown = values[~values.isin(dtype.categories) & values.notna()]
+    if len(unknown) > 0:
+        raise ValueError(f"Values {list(unknown[:5])} of '{name}' are not in its canonical order.")
+
+
+def _canonical_index(index: pd.Index) -> pd.Index:
+    """Convert the registered levels of an index to their canonical categoricals."""
+    if isinstance(index, pd.MultiIndex):
+        for i, name in enumerate(index.names):
+            dtype = get_canonical_dtype(name)
+            if dtype is None or index.levels[i].dtype == dtype:
+                continue
+            _check_values(index.levels[i], dtype, name)
+            # The level values are unique, so the codes stay valid
+            index = index.set_levels(pd.CategoricalIndex(index.levels[i], dtype = dtype, name = name), level = i)
+        return index
+
+    dtype = get_canonical_dtype(index.name)
+    if dtype is None or index.dtype == dtype:
+        return index
+    _check_values(index.unique(), dtype, index.name)
+    return pd.CategoricalIndex(index, dtype = dtype, name = index.name)
+
+
+def apply_canonical_dtypes(df: pd.DataFrame, columns: bool = True, index: bool = True) -> pd.DataFrame:
+    """
+    Store every registered column and index level of a DataFrame as its canonical categorical.
+
+    Columns and index or column levels named 'duration', 'annum' or 'version' (or any name
+    added with `register_canonical_order`) are converted to the shared ordered dtype. Sorting,
+    grouping and pivoting then work on small integer codes, a plain sort puts the values in
+    canonical order, and the categories are stored once for every frame.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        columns (bool): Convert registered columns and column levels. Defaults to True.
+        index (bool): Convert registered index levels. Defaults to True.
+
+    Returns:
+        pd.DataFrame: A new DataFrame with the converted columns and levels.
+
+    Raises:
+        ValueError: If a registered column or level has a value outside its order.
+
+    Example:
+        pivot_to_standard_format(apply_canonical_dtypes(ledger))
+    """
+    df = df.copy(deep = False)
+    if columns:
+        for name in df.columns:
+            dtype = get_canonical_dtype(name)
+            if dtype is None or df[name].dtype == dtype:
+                continue
+            _check_values(pd.Index(df[name].unique()), dtype, name)
+            df[name] = df[name].astype(dtype)
+        df.columns = _canonical_index(df.columns)
+    if index:
+        df.index = _canonical_index(df.index)
+    return df
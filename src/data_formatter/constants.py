@@ -1,3 +1,5 @@
+from pandas.api.types import CategoricalDtype
+
 duration_order = [
     "WTD",
     "MTD",
@@ -25,3 +27,16 @@ version_order = [
     "Actual Vs Budget (%)",
     "Actual Vs Forecast (%)"
 ]
+
+
+# Ordered categorical dtypes built from the orders above. Frames that use these shared
+# instances store the levels as small integer codes that sort in canonical order.
+duration_dtype = CategoricalDtype(duration_order, ordered = True)
+annum_dtype = CategoricalDtype(annum_order, ordered = True)
+version_dtype = CategoricalDtype(version_order, ordered = True)
+
+canonical_dtypes = {
+    "duration": duration_dtype,
+    "annum": annum_dtype,
+    "version": version_dtype
+}
@@ -1,7 +1,144 @@
+from typing import Dict, List, Tuple
+from .constants import annum_order, version_order
 from .dataframe_find import find_common_columns
+from .expressions import compile_expressions, comparison_bases, comparison_expressions
+from .index_lookup import get_index_lookup, grouped_positions, aligned_group_positions
 from .validate import *
 
 
+def _labels_like(labels: List[Union[str, tuple]], index: pd.Index) -> pd.Index:
+    """Build an index from new labels, carrying over the level names of an existing axis."""
+    new_index = pd.Index(labels)
+    if new_index.nlevels == index.nlevels:
+        new_index = new_index.set_names(index.names)
+    return new_index
+
+
+def _insert_after(df: pd.DataFrame, new: pd.DataFrame, positions: List[int], axis: int = 1) -> pd.DataFrame:
+    """
+    Insert the rows or columns of `new` into `df` with a single concat.
+
+    Each entry of `new` lands directly after the original position given in `positions`
+    (``-1`` places it first). Entries that share a position keep their order in `new`.
+    The original frame is sliced into runs between insertion points, so the result is
+    assembled in one pass instead of one insert per entry.
+    """
+    positions = np.asarray(positions)
+    order = np.argsort(positions, kind = 'stable')
+    anchors, starts = np.unique(positions[order], return_index = True)
+    ends = list(starts[1:]) + [len(order)]
+
+    def take(frame, start, stop):
+        return frame.iloc[start:stop] if axis == 0 else frame.iloc[:, start:stop]
+
+    new = new.take(order, axis = axis)
+    pieces = []
+    start = 0
+    for anchor, new_start, new_end in zip(anchors, starts, ends):
+        if anchor + 1 > start:
+            pieces.append(take(df, start, anchor + 1))
+            start = anchor + 1
+        pieces.append(take(new, new_start, new_end))
+    if start < df.shape[axis]:
+        pieces.append(take(df, start, df.shape[axis]))
+
+    return pd.concat(pieces, axis = axis)
+
+
+def _plan_insertions(index: pd.Index, placements: List[tuple], append: bool = False) -> List[tuple]:
+    """
+    Work out where new labels land if they are inserted into an axis one at a time.
+
+    Each placement is ``(input_labels, new_label, position)``. Without a position, the new
+    label goes directly after the right-most of its inputs at that point, as `df.insert`
+    after the last input column would put it; inputs may be labels added by earlier
+    placements. An integer position places the label before that position of the original
+    axis, after earlier placements given the same position.
+
+    Returns:
+        List[tuple]: ``(anchor, new_label)`` pairs in final order, where ``anchor`` is the
+                     original position each new label follows (``-1`` for the front).
+    """
+    new_anchors = {}  # new label -> original position it follows
+    slots = {}  # original position -> new labels placed after it, in order
+
+    for input_labels, new_label, position in placements:
+        if position is not None:
+            anchor = position - 1
+            slots.setdefault(anchor, []).append(new_label)
+        else:
+            keys = []
+            for label in input_labels:
+                if label in new_anchors:
+                    anchor = new_anchors[label]
+                    keys.append((anchor, slots[anchor].index(label)))
+                else:
+                    keys.append((index.get_loc(label), -1))
+            anchor, after = max(keys)
+            slot = slots.setdefault(anchor, [])
+            slot.insert(len(slot) if append else after + 1, new_label)
+        new_anchors[new_label] = anchor
+
+    return [(anchor, label) for anchor in sorted(slots) for label in slots[anchor]]
+
+
+def _row_values(df: pd.DataFrame, pos: int) -> np.ndarray:
+    """
+    Get one row of a DataFrame as an array.
+
+    Frames with a single dtype keep it. Mixed frames return an object array so that each
+    element keeps its own type and the calculated row can be converted back per column.
+    """
+    if df.dtypes.nunique() <= 1:
+        return df.iloc[pos].to_numpy()
+    return df.iloc[[pos]].astype(object).to_numpy()[0]
+
+
+def _rows_to_frame(rows: List[np.ndarray], labels: List[Union[str, tuple]], df: pd.DataFrame) -> pd.DataFrame:
+    """Stack calculated rows into a frame shaped like `df`, inferring a dtype for each column."""
+    new = pd.DataFrame(np.vstack(rows), index = _labels_like(labels, df.index), columns = df.columns)
+    return new.infer_objects()
+
+
+def _add_calculated_blocks(
+    df: pd.DataFrame,
+    func: Callable,
+    names: List[str],
+    new_suffix: str,
+    axis: int = 1
+) -> pd.DataFrame:
+    """
+    Apply `func` once to 2-D blocks that stack every complete group, then insert the results.
+
+    Block ``i`` holds the ``names[i]`` column (or row) of every group side by side, so a
+    ufunc such as `np.subtract` handles all groups in a single call. Each result lands
+    directly after the last member of its group.
+    """
+    index = df.columns if axis == 1 else df.index
+    aligned = aligned_group_positions(index, names)
+    if aligned.shape[1] == 0:
+        return df
+
+    if axis == 1:
+        blocks = [df.iloc[:, positions].to_numpy() for positions in aligned]
+    else:
+        blocks = [df.iloc[positions].to_numpy() for positions in aligned]
+    result = np.broadcast_to(func(*blocks), blocks[0].shape)
+
+    # New labels keep the lower levels of their group and take the suffix as the highest level
+    members = index[aligned[0]]
+    labels = pd.MultiIndex.from_arrays(
+        [members.get_level_values(i) for i in range(index.nlevels - 1)] + [[new_suffix] * len(members)],
+        names = index.names
+    )
+    if axis == 1:
+        new = pd.DataFrame(result, index = df.index, columns = labels)
+    else:
+        new = pd.DataFrame(result, index = labels, columns = df.columns).infer_objects()
+
+    return _insert_after(df, new, aligned.max(axis = 0), axis = axis)
+
+
 def add_calculated_column(
     df: pd.DataFrame,
     func: Callable,
@@ -52,6 +189,82 @@ def add_calculated_column(
     return df
 
 
+def add_calculated_columns(
+    df: pd.DataFrame,
+    specs: List[tuple]
+) -> pd.DataFrame:
+    """
+    Add many calculated columns to the DataFrame with a single rebuild of the frame.
+
+    Each spec is a tuple of ``(func, column_names, new_column_name, position)``; the last two
+    entries are optional. Every function is evaluated first and the results are then placed
+    with one concat, instead of one `df.insert` per column.
+
+    Without a position, a new column lands where calling `add_calculated_column` for each spec
+    in order would put it: directly after the right-most of its input columns at that point.
+    A spec may use the output of an earlier spec as an input. An integer position places the
+    new column before the column at that position in the original DataFrame, after any other
+    new columns given the same position.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame.
+        specs (List[tuple]): The calculations to add, as
+                             ``(func, column_names, new_column_name, position)`` tuples.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with the calculated columns added.
+
+    Raises:
+        ValueError: If the DataFrame is empty, an input column does not exist or a new
+                    column name is already in use.
+        TypeError: If a function is not callable or a column name is not a string or tuple.
+
+    Example:
+        add_calculated_columns(df, [
+            (np.subtract, ['Actual', 'Budget'], 'Actual Vs Budget'),
+            (growth, ['Actual', 'Budget'], 'Actual Vs Budget (%)')
+        ])
+    """
+    validate_dataframe_not_empty(df)
+
+    new_arrays = {}
+    placements = []
+
+    for spec in specs:
+        func, column_names, new_column_name, position = (tuple(spec) + (None, None))[:4]
+        validate_callable(func)
+        if isinstance(column_names, (str, tuple)):
+            column_names = [column_names]
+
+        for col_name in column_names:
+            validate_value_is_string_or_tuple(col_name)
+            if col_name not in new_arrays:
+                validate_column_exists(df, col_name)
+
+        # Apply the function to the columns
+        columns = [new_arrays[x] if x in new_arrays else np.array(df[x]) for x in column_names]
+        new_column = func(*columns)
+
+        if new_column_name is None:
+            new_column_name = f"new_column_{len(df.columns) + len(new_arrays)}"
+        if new_column_name in new_arrays or new_column_name in df.columns:
+            raise ValueError(f"cannot insert {new_column_name}, already exists")
+
+        new_arrays[new_column_name] = new_column
+        placements.append((column_names, new_column_name, position))
+
+    if len(new_arrays) == 0:
+        return df
+
+    ordered = _plan_insertions(df.columns, placements)
+    new = pd.DataFrame(
+        {i: new_arrays[name] for i, (_, name) in enumerate(ordered)},
+        index = df.index
+    )
+    new.columns = _labels_like([name for _, name in ordered], df.columns)
+    return _insert_after(df, new, [anchor for anchor, _ in ordered], axis = 1)
+
+
 def add_calculated_row(
     df: pd.DataFrame,
     func: Callable,
@@ -61,21 +274,22 @@ def add_calculated_row(
     """
     Add a calculated row to the DataFrame by applying a function to one or more existing rows.
 
-    This function transposes the DataFrame, applies the `add_calculated_column` function,
-    and then transposes it back to add a new calculated row.
+    The new row is inserted directly after the last row in the list of provided row names.
+    Rows are read and written on `df.index` directly, so the frame is never transposed and
+    the dtypes of the existing columns are kept.
 
     Args:
-        df (pandas.DataFrame): The input DataFrame with multi-index columns.
+        df (pandas.DataFrame): The input DataFrame.
         func (Callable): The function to apply to the rows.
         *row_names (str): One or more row names to use as input for the function.
         new_row_name (Optional[str]): Name of the new row. If None, a default name is generated.
 
     Returns:
-        pandas.DataFrame: The modified DataFrame with the new row added.
+        pandas.DataFrame: A new DataFrame with the new row added.
 
     Raises:
-        ValueError: If the DataFrame is empty.
-        TypeError: If any of the row names are not strings.
+        ValueError: If the DataFrame is empty or a specified row does not exist.
+        TypeError: If the provided function is not callable or a row name is not a string.
 
     Example:
         If rows 'R1' and 'R2' are specified, the function adds a new row that is the result
@@ -83,36 +297,57 @@ def add_calculated_row(
     """
     # Validate inputs
     validate_dataframe_not_empty(df)
+    validate_callable(func)
     for row_name in row_names:
         validate_value_is_string(row_name)
+        validate_row_exists(df, row_name)
+
+    # Get the actual row data from the DataFrame
+    locs = [df.index.get_loc(x) for x in row_names]
+    rows = [_row_values(df, loc) for loc in locs]
 
-    # Transpose the DataFrame, apply the column function, and transpose back
-    transposed_df = df.T
-    transposed_result = add_calculated_column(transposed_df, func, *row_names, new_column_name = new_row_name)
-    return transposed_result.T
+    # Apply the function to the rows
+    new_row = func(*rows)
+
+    if new_row_name is None:
+        new_row_name = f"new_column_{len(df.index)}"
+
+    # Append the new row after the last input row with a single concat
+    new = _rows_to_frame([new_row], [new_row_name], df)
+    return _insert_after(df, new, [max(locs)], axis = 0)
 
 
 def add_calculated_columns_by_group(
     df: pd.DataFrame,
     func: Callable,
     *column_names: str,
-    new_column_suffix: Optional[str] = 'calculated'
+    new_column_suffix: Optional[str] = 'calculated',
+    vectorized: bool = False
 ) -> pd.DataFrame:
     """
     Add calculated columns to groups of common columns in a multi-index DataFrame.
 
     This function finds common columns based on the provided column names at the highest level,
     groups them by their lower levels, and applies a calculation to each group. The result is added
-    as a new column in each group.
+    as a new column in each group. All new columns are added in one pass with
+    `add_calculated_columns`.
+
+    With `vectorized=True` the function is called only once. Each argument is a 2-D array
+    holding one column name for every group side by side (for example all 'Actual' columns
+    and all 'Budget' columns), and `func` must return an array of the same shape. In this
+    mode the arguments follow the order of `column_names`, not the order of the columns
+    within each group.
 
     Args:
         df (pandas.DataFrame): The input DataFrame with multi-index columns.
         func (Callable): The function to apply to each group of common columns.
         *column_names (str): Column names at the highest level to identify common columns.
         new_column_suffix (Optional[str]): Suffix for the new column name. Defaults to 'calculated'.
+        vectorized (bool): Call `func` once on stacked 2-D blocks instead of once per group.
+                           Defaults to False.
 
     Returns:
-        pandas.DataFrame: The modified DataFrame with the new calculated columns added.
+        pandas.DataFrame: A new DataFrame with the new calculated columns added.
 
     Raises:
         ValueError: If the DataFrame's columns are not a MultiIndex.
@@ -129,51 +364,51 @@ def add_calculated_columns_by_group(
         validate_value_is_string(col_name)
         validate_string_in_any_column_tuple(df.columns, col_name)
 
-    # Get the multi-index column names as a flat index
-    column_names_index = df.columns.to_flat_index()
+    if vectorized:
+        return _add_calculated_blocks(df, func, list(column_names), new_column_suffix, axis = 1)
 
-    # Filter columns that match the criteria
-    filtered_columns = [col for col in column_names_index if col[-1] in column_names]
+    # Group the matching columns by their lower levels (all levels except the last one).
+    # The grouping comes from the cached lookup tables of the original columns.
+    grouped_columns = [df.columns[positions] for positions in grouped_positions(df.columns, column_names)]
 
-    # Group columns by their lower levels (all levels except the last one)
-    grouped_columns = {}
-    for col in filtered_columns:
-        lower_levels = col[:-1]
-        grouped_columns.setdefault(lower_levels, []).append(col)
-
-    # Apply the function to each group and add the result as a new column
-    for lower_levels, columns in grouped_columns.items():
+    # Collect one calculation per group and add them all in a single pass
+    specs = []
+    for columns in grouped_columns:
         if len(columns) == len(column_names):  # Ensure all specified columns are present
-            # column_data = [df[col] for col in columns]
-            # new_column = func(*column_data)
-            new_column_name = lower_levels + (new_column_suffix,)
-            # df[new_column_name] = new_column
-            df = add_calculated_column(df, func, *columns, new_column_name = new_column_name)
+            new_column_name = columns[0][:-1] + (new_column_suffix,)
+            specs.append((func, list(columns), new_column_name))
 
-    return df
+    return add_calculated_columns(df, specs)
 
 
 def add_calculated_rows_by_group(
     df: pd.DataFrame,
     func: Callable,
     *row_names: str,
-    new_row_suffix: Optional[str] = 'calculated'
+    new_row_suffix: Optional[str] = 'calculated',
+    vectorized: bool = False
 ) -> pd.DataFrame:
     """
     Add calculated rows to groups of common rows in a DataFrame.
 
-    This function transposes the DataFrame, applies the `add_calculated_columns_by_group`
-    function to specified rows (treated as columns), and then transposes it back to add
-    new calculated rows.
+    This is the row counterpart of `add_calculated_columns_by_group`. Rows are grouped by
+    their lower index levels, the function is applied to each group, and every new row is
+    placed directly after the last row of its group. All new rows are added with a single
+    concat, without transposing the DataFrame.
+
+    With `vectorized=True` the function is called once on 2-D blocks, one per row name,
+    that hold the matching row of every group (see `add_calculated_columns_by_group`).
 
     Args:
-        df (pandas.DataFrame): The input DataFrame.
+        df (pandas.DataFrame): The input DataFrame with multi-index rows.
         func (Callable): The function to apply to each group of common rows.
         *row_names (str): One or more row names to identify common rows.
         new_row_suffix (Optional[str]): Suffix for the new row name. Defaults to 'calculated'.
+        vectorized (bool): Call `func` once on stacked 2-D blocks instead of once per group.
+                           Defaults to False.
 
     Returns:
-        pd.DataFrame: The modified DataFrame with the new calculated rows added.
+        pd.DataFrame: A new DataFrame with the new calculated rows added.
 
     Raises:
         ValueError: If the DataFrame is empty or if any specified row does not exist.
@@ -185,12 +420,356 @@ def add_calculated_rows_by_group(
     """
     validate_rows_multiindex(df)
 
-    # Transpose the DataFrame, apply the column function, and transpose back
-    transposed_df = df.T
-    transposed_result = add_calculated_columns_by_group(
-        transposed_df,
-        func,
-        *row_names,
-        new_column_suffix = new_row_suffix
-    )
-    return transposed_result.T
+    for row_name in row_names:
+        validate_value_is_string(row_name)
+        validate_string_in_any_column_tuple(df.index, row_name)
+
+    if vectorized:
+        return _add_calculated_blocks(df, func, list(row_names), new_row_suffix, axis = 0)
+
+    rows = []
+    labels = []
+    anchors = []
+    for positions in grouped_positions(df.index, row_names):
+        if len(positions) == len(row_names):  # Ensure all specified rows are present
+            rows.append(func(*[_row_values(df, pos) for pos in positions]))
+            labels.append(df.index[positions[0]][:-1] + (new_row_suffix,))
+            anchors.append(positions[-1])
+
+    if len(rows) == 0:
+        return df
+
+    new = _rows_to_frame(rows, labels, df)
+    return _insert_after(df, new, anchors, axis = 0)
+
+
+def _evaluate_expression_blocks(
+    df: pd.DataFrame,
+    expressions: List[str],
+    axis: int = 1,
+    lvl: int = -1,
+    use_numexpr: Optional[bool] = None
+) -> Dict[str, tuple]:
+    """
+    Evaluate derived-metric expressions for every group of an axis.
+
+    Labels are grouped by all levels except `lvl`. Each expression is evaluated once on 2-D
+    blocks that hold its inputs for every group that has them, and derived metrics can feed
+    later ones. Each new label follows the right-most of its inputs, as sequential inserts
+    would place it; the anchor of an input that is itself new is the anchor of that input.
+
+    Returns:
+        Dict[str, tuple]: The results in evaluation order, mapping each target to its groups,
+        its 2-D block of values, its new labels and the original position each new label
+        follows, as `_insert_after` takes it.
+
+    Raises:
+        ValueError: If a new label already exists.
+    """
+    index = df.columns if axis == 1 else df.index
+    lookup = get_index_lookup(index)
+    lvl = lookup.normalize_level(lvl)
+    group_ids, group_count = lookup.group_ids(lvl)
+
+    names = [x for x in lookup.value_positions(lvl) if isinstance(x, str)]
+    compiled = compile_expressions(list(expressions), names)
+
+    # One representative label per group, used to build the labels of the new entries
+    _, representatives = np.unique(group_ids, return_index = True)
+
+    def take(positions):
+        return df.iloc[:, positions].to_numpy() if axis == 1 else df.iloc[positions].to_numpy()
+
+    base_positions = {}
+    results = {}  # target -> (groups, block, labels, anchors)
+    for expr in compiled:
+        if expr.target in results:
+            raise ValueError(f"cannot insert {expr.target}, already exists")
+
+        # Keep the groups that have every input
+        available = np.ones(group_count, dtype = bool)
+        for name in expr.inputs:
+            if name in results:
+                has_name = np.zeros(group_count, dtype = bool)
+                has_name[results[name][0]] = True
+            else:
+                if name not in base_positions:
+                    positions = np.full(group_count, -1, dtype = np.intp)
+                    found = lookup.positions(name, lvl)
+                    positions[group_ids[found]] = found
+                    base_positions[name] = positions
+                has_name = base_positions[name] >= 0
+            available &= has_name
+        groups = np.flatnonzero(available)
+        if len(groups) == 0:
+            continue
+
+        blocks = {}
+        anchors = np.full(len(groups), -1, dtype = np.intp)
+        for name in expr.inputs:
+            if name in results:
+                result_groups, result_block, _, result_anchors = results[name]
+                where = np.searchsorted(result_groups, groups)
+                blocks[name] = result_block[:, where] if axis == 1 else result_block[where]
+                anchors = np.maximum(anchors, result_anchors[where])
+            else:
+                blocks[name] = take(base_positions[name][groups])
+                anchors = np.maximum(anchors, base_positions[name][groups])
+
+        shape = (len(df.index), len(groups)) if axis == 1 else (len(groups), len(df.columns))
+        block = np.broadcast_to(expr.evaluate(blocks, use_numexpr), shape)
+
+        members = index[representatives[groups]]
+        arrays = [members.get_level_values(i) for i in range(index.nlevels)]
+        arrays[lvl] = [expr.target] * len(groups)
+        labels = pd.MultiIndex.from_arrays(arrays, names = index.names)
+        existing = labels.isin(index)
+        if existing.any():
+            raise ValueError(f"cannot insert {labels[np.argmax(existing)]}, already exists")
+        results[expr.target] = (groups, block, labels, anchors)
+
+    return results
+
+
+def _expression_results_frame(df: pd.DataFrame, results: Dict[str, tuple], axis: int = 1) -> pd.DataFrame:
+    """
+    Stack the evaluated results into one DataFrame, target by target in evaluation order.
+
+    New columns are built one by one, so each keeps the dtype of its own result.
+    """
+    index = df.columns if axis == 1 else df.index
+    labels = [label for _, _, target_labels, _ in results.values() for label in target_labels]
+    if axis == 1:
+        columns = (block[:, i] for _, block, _, _ in results.values() for i in range(block.shape[1]))
+        new = pd.DataFrame(dict(enumerate(columns)), index = df.index)
+        new.columns = _labels_like(labels, index)
+        return new
+
+    values = np.vstack([block for _, block, _, _ in results.values()])
+    new = pd.DataFrame(values, index = _labels_like(labels, index), columns = df.columns)
+    return new.infer_objects()
+
+
+def _add_expression_blocks(
+    df: pd.DataFrame,
+    expressions: List[str],
+    axis: int = 1,
+    lvl: int = -1,
+    use_numexpr: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Evaluate derived-metric expressions for every group of an axis and insert the results.
+
+    All results are inserted with a single concat. Within a group, new entries follow their
+    inputs in evaluation order.
+    """
+    results = _evaluate_expression_blocks(df, expressions, axis, lvl, use_numexpr)
+    if len(results) == 0:
+        return df
+
+    new = _expression_results_frame(df, results, axis)
+    anchors = np.concatenate([anchors for _, _, _, anchors in results.values()])
+    return _insert_after(df, new, anchors, axis = axis)
+
+
+def _canonical_positions(index: pd.Index, lvl: int, order: List[str]) -> np.ndarray:
+    """
+    Return the positions that put every group of an index in canonical order.
+
+    Groups (labels that share every level except `lvl`) keep the order of their first label.
+    Within a group, labels follow `order`; values that are not in `order` come last, in their
+    current order.
+    """
+    lookup = get_index_lookup(index)
+    group_ids, group_count = lookup.group_ids(lvl)
+    codes, uniques = lookup.level_codes(lvl)
+
+    rank_of = {name: i for i, name in enumerate(order)}
+    ranks = np.array([rank_of.get(x, len(order)) for x in uniques] + [len(order)])[codes]
+
+    first = np.full(group_count, len(index))
+    positions = np.arange(len(index))
+    np.minimum.at(first, group_ids, positions)
+    return np.lexsort((positions, ranks, first[group_ids]))
+
+
+def _add_comparison_blocks(
+    df: pd.DataFrame,
+    order: Optional[List[str]],
+    axis: int = 1,
+    lvl: int = -1,
+    use_numexpr: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Add every comparison of a canonical order to each group and put the groups in that order.
+
+    The comparisons are evaluated with the expression engine, added with one concat and
+    moved into canonical order with one `take`.
+    """
+    index = df.columns if axis == 1 else df.index
+    lookup = get_index_lookup(index)
+    lvl = lookup.normalize_level(lvl)
+
+    present = set(lookup.value_positions(lvl))
+    if order is None:
+        candidates = [annum_order, version_order]
+        matches = [len(present & set(comparison_bases(x))) for x in candidates]
+        if max(matches) == 0:
+            raise ValueError("None of the level values appear in annum_order or version_order; pass an order.")
+        order = candidates[int(np.argmax(matches))]
+
+    # skip comparisons that already exist or whose inputs are missing
+    names = [x for x in present if isinstance(x, str)]
+    compiled = compile_expressions(comparison_expressions(order), names + comparison_bases(order))
+    expressions = [x.source for x in compiled if x.target not in present and set(x.inputs) <= present]
+    results = _evaluate_expression_blocks(df, expressions, axis, lvl, use_numexpr)
+    if len(results) > 0:
+        df = pd.concat([df, _expression_results_frame(df, results, axis)], axis = axis)
+
+    index = df.columns if axis == 1 else df.index
+    positions = _canonical_positions(index, lvl, order)
+    return df.iloc[:, positions] if axis == 1 else df.iloc[positions]
+
+
+def add_expression_columns_by_group(
+    df: pd.DataFrame,
+    *expressions: str,
+    use_numexpr: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Add derived metrics declared as expressions to every group of common columns.
+
+    This is the expression counterpart of `add_calculated_columns_by_group`. Each expression
+    has the form ``"Target = expression"`` and refers to values of the highest column level,
+    such as ``"Actual Vs Budget (%) = growth(Actual, Budget) - 1"``. Columns are grouped by
+    their lower levels, and for every group that has all inputs a new column named by the
+    target is added. Each expression is evaluated once for all groups, expressions may use
+    the results of other expressions, and the new columns are added in a single pass. New
+    columns follow the last of their inputs, in the order the expressions are given
+    (an expression always comes after the metrics it uses).
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame with multi-index columns.
+        *expressions (str): One or more ``"Target = expression"`` strings.
+        use_numexpr (Optional[bool]): Evaluate with numexpr when it is installed and the
+                                      expression allows it. If None, decide automatically.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with the derived columns added.
+
+    Raises:
+        ValueError: If the DataFrame's columns are not a MultiIndex, an expression is invalid or
+                    a new column already exists.
+
+    Example:
+        add_expression_columns_by_group(
+            df,
+            "Actual Vs Budget = Actual - Budget",
+            "Actual Vs Budget (%) = growth(Actual, Budget) - 1"
+        )
+    """
+    validate_dataframe_not_empty(df)
+    validate_columns_multiindex(df)
+    for expression in expressions:
+        validate_value_is_string(expression)
+
+    return _add_expression_blocks(df, list(expressions), axis = 1, use_numexpr = use_numexpr)
+
+
+def add_expression_rows_by_group(
+    df: pd.DataFrame,
+    *expressions: str,
+    use_numexpr: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Add derived metrics declared as expressions to every group of common rows.
+
+    This is the row counterpart of `add_expression_columns_by_group`; the expressions refer
+    to values of the highest index level.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame with multi-index rows.
+        *expressions (str): One or more ``"Target = expression"`` strings.
+        use_numexpr (Optional[bool]): Evaluate with numexpr when it is installed and the
+                                      expression allows it. If None, decide automatically.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with the derived rows added.
+
+    Raises:
+        ValueError: If the DataFrame's rows are not a MultiIndex, an expression is invalid or
+                    a new row already exists.
+    """
+    validate_dataframe_not_empty(df)
+    validate_rows_multiindex(df)
+    for expression in expressions:
+        validate_value_is_string(expression)
+
+    return _add_expression_blocks(df, list(expressions), axis = 0, use_numexpr = use_numexpr)
+
+
+def add_comparison_columns_by_group(
+    df: pd.DataFrame,
+    order: Optional[List[str]] = None,
+    use_numexpr: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Add every variance and percent-variance column of a canonical order to each group of columns.
+
+    The order is a list such as `annum_order` or `version_order`. Entries of the form
+    ``"X Vs Y"`` become ``X - Y`` and entries ending in ``"(%)"`` become ``growth(X, Y) - 1``;
+    a short left-hand name such as ``"Current"`` stands for the base entry it starts
+    (``"Current Year"``). All comparisons are evaluated in one vectorized pass, groups that
+    lack an input are skipped, and each group of columns comes out in canonical order, so
+    no `sort_dataframe_by_custom_order` call is needed afterwards.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame with multi-index columns, with the order's
+                               base values (e.g. 'Current Year', 'Prior Year') in the highest level.
+        order (Optional[List[str]]): The canonical order. If None, use whichever of
+                                     `annum_order` and `version_order` matches the columns.
+        use_numexpr (Optional[bool]): Evaluate with numexpr when it is installed and the
+                                      expression allows it. If None, decide automatically.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with the comparison columns added, in canonical order.
+
+    Raises:
+        ValueError: If the DataFrame's columns are not a MultiIndex or no order matches.
+
+    Example:
+        add_comparison_columns_by_group(pivot_to_standard_format(df))
+    """
+    validate_dataframe_not_empty(df)
+    validate_columns_multiindex(df)
+
+    return _add_comparison_blocks(df, order, axis = 1, use_numexpr = use_numexpr)
+
+
+def add_comparison_rows_by_group(
+    df: pd.DataFrame,
+    order: Optional[List[str]] = None,
+    use_numexpr: Optional[bool] = None
+) -> pd.DataFrame:
+    """
+    Add every variance and percent-variance row of a canonical order to each group of rows.
+
+    This is the row counterpart of `add_comparison_columns_by_group`.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame with multi-index rows.
+        order (Optional[List[str]]): The canonical order. If None, use whichever of
+                                     `annum_order` and `version_order` matches the rows.
+        use_numexpr (Optional[bool]): Evaluate with numexpr when it is installed and the
+                                      expression allows it. If None, decide automatically.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with the comparison rows added, in canonical order.
+
+    Raises:
+        ValueError: If the DataFrame's rows are not a MultiIndex or no order matches.
+    """
+    validate_dataframe_not_empty(df)
+    validate_rows_multiindex(df)
+
+    return _add_comparison_blocks(df, order, axis = 0, use_numexpr = use_numexpr)
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from src.data_formatter.validate import *
+from src.data_formatter.index_lookup import get_index_lookup, match_positions, match_like_mask, mask_labels
 from typing import List, Tuple, Union
 
 
@@ -19,17 +21,30 @@ def find_columns(df: pd.DataFrame, column_name: str, lvl: Optional[int] = None)
     validate_dataframe_not_empty(df)
     validate_value_is_string(column_name)
 
-    if isinstance(df.columns, pd.MultiIndex):
-        if lvl is None:
-            return [col for col in df.columns if column_name in col]
-        else:
-            return [col for col in df.columns if col[lvl] == column_name]
-    else:
-        return [col for col in df.columns if col == column_name]
+    positions = match_positions(df.columns, column_name, lvl)
+    return mask_labels(df.columns, positions)
 
 
-def find_rows(df, row_name: str, lvl = None):
-    return find_columns(df.T, row_name, lvl)
+def find_rows(df: pd.DataFrame, row_name: str, lvl: Optional[int] = None) -> List[Union[str, Tuple]]:
+    """
+    Find rows in a DataFrame that match a given name.
+
+    This is the row counterpart of `find_columns` and searches `df.index` directly.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to search.
+        row_name (str): The name to search for.
+        lvl (Optional[int]): The level in the MultiIndex to search. If None, search all levels.
+
+    Returns:
+        List[Union[str, Tuple]]: A list of row names or tuples that match the criteria.
+    """
+    # validate
+    validate_dataframe_not_empty(df)
+    validate_value_is_string(row_name)
+
+    positions = match_positions(df.index, row_name, lvl)
+    return mask_labels(df.index, positions)
 
 
 def find_column_positions(df: pd.DataFrame, column_name: str, lvl: Optional[int] = None) -> List[int]:
@@ -55,20 +70,34 @@ def find_column_positions(df: pd.DataFrame, column_name: str, lvl: Optional[int]
     validate_dataframe_not_empty(df)
     validate_value_is_string(column_name)
 
-    # Use the find_columns function to get the list of requested columns
-    requested_cols = find_columns(df, column_name, lvl)
+    # Look the name up in the cached level tables
+    return match_positions(df.columns, column_name, lvl).tolist()
+
+
+def find_row_positions(df: pd.DataFrame, row_name: str, lvl: Optional[int] = None) -> List[int]:
+    """
+    Find the positions of rows in a DataFrame that match a given row name.
 
-    # Convert all columns to a list for easy enumeration
-    all_cols = df.columns.tolist()
+    This is the row counterpart of `find_column_positions` and searches `df.index` directly.
 
-    # Initialize a list to store the positions of the requested columns
-    positions = [i for i, col in enumerate(all_cols) if col in requested_cols]
+    Args:
+        df (pandas.DataFrame): The DataFrame to search within.
+        row_name (str): The name of the rows to find.
+        lvl (Optional[int]): The level of the index to consider if the DataFrame
+                             has a MultiIndex. Defaults to None.
 
-    return positions
+    Returns:
+        List[int]: A list of positions of rows that match the criteria.
 
+    Raises:
+        ValueError: If the DataFrame is empty.
+        TypeError: If the row name is not a string.
+    """
+    # Validate inputs
+    validate_dataframe_not_empty(df)
+    validate_value_is_string(row_name)
 
-def find_row_positions(df, row_name: str, lvl = None):
-    return find_column_positions(df.T, row_name, lvl)
+    return match_positions(df.index, row_name, lvl).tolist()
 
 
 def find_columns_like(df, substrings: str, lvl=None):
@@ -87,37 +116,31 @@ def find_columns_like(df, substrings: str, lvl=None):
     validate_dataframe_not_empty(df)
     validate_value_is_string(substrings)
 
-    # Ensure substrings is a list for consistent processing
-    if isinstance(substrings, str):
-        substrings = [substrings]
+    # Match the substrings against the unique level values and broadcast through the codes
+    mask = match_like_mask(df.columns, substrings, lvl)
+    return mask_labels(df.columns, mask)
 
-    # Initialize a list to store columns that match the substrings
-    all_cols = []
 
-    # Iterate over each column in the DataFrame
-    for col in df.columns:
-        # Check if the column is a tuple (MultiIndex)
-        if isinstance(col, tuple):
-            # Join the tuple levels into a single string and check for substrings
-            if any(substring in ''.join(str(level) for level in col) for substring in substrings):
-                all_cols.append(col)
-        else:
-            # Check for substrings in a single-level column
-            if any(substring in str(col) for substring in substrings):
-                all_cols.append(col)
+def find_rows_like(df, substrings: str, lvl = None):
+    """
+    Find rows in a DataFrame whose index labels contain the given substring(s).
 
-    # If a specific level is provided, filter columns based on that level
-    if lvl is not None:
-        lvls = df.columns.get_level_values(lvl)
-        in_lvls = [any(substring in str(x) for substring in substrings) for x in lvls]
-        specific_cols = [col for col, match in zip(df.columns, in_lvls) if match]
-        return specific_cols
+    This is the row counterpart of `find_columns_like` and searches `df.index` directly.
 
-    return all_cols
+    Args:
+        df (pandas.DataFrame): The DataFrame to search.
+        substrings (str or list): A substring or a list of substrings to search for in row names.
+        lvl (int or None, optional): The level of the MultiIndex to search. If None, search all levels.
 
+    Returns:
+        list: A list of row names (tuples) that contain the substring(s).
+    """
+    # validate
+    validate_dataframe_not_empty(df)
+    validate_value_is_string(substrings)
 
-def find_rows_like(df, substrings: str, lvl = None):
-    return find_columns_like(df = df.T, substrings = substrings, lvl = lvl)
+    mask = match_like_mask(df.index, substrings, lvl)
+    return mask_labels(df.index, mask)
 
 
 def find_common_columns(df, *column_strings):
@@ -164,28 +187,27 @@ def find_common_columns(df, *column_strings):
     for string in column_strings:
         validate_value_is_string(string)
 
-    # Get the multi-index column names as a flat index
-    column_names = df.columns.to_flat_index()
+    if len(column_strings) == 0:
+        return []
 
-    # Define a filter function to check if a column contains any of the given strings at the highest level
-    def filter_by(x):
-        return any(string == x[-1] or str(string) in str(x[-1]) for string in column_strings)
-
-    # Filter columns that match the criteria
-    filtered_columns = list(filter(filter_by, column_names))
+    # Filter columns whose highest level contains any of the given strings
+    lookup = get_index_lookup(df.columns)
+    filtered = match_like_mask(df.columns, list(column_strings), lvl = -1)
 
     # Group columns by their lower levels (all levels except the last one)
-    grouped_columns = {}
-    for col in filtered_columns:
-        lower_levels = col[:-1]
-        grouped_columns.setdefault(lower_levels, []).append(col)
-
-    # Find common columns where all strings are present for each combination of lower levels
-    common_columns = []
-    for lower_levels, columns in grouped_columns.items():
-        # Check if all column strings are present in the highest level for each group
-        column_sets = [set(col[-1] for col in columns)]
-        if all(set(column_strings).issubset(col_set) for col_set in column_sets):
-            common_columns.extend(columns)
-
-    return common_columns
+    group_ids, group_count = lookup.group_ids(-1)
+
+    # Keep the groups where every string is present in the highest level
+    keep = np.ones(group_count, dtype = bool)
+    for string in set(column_strings):
+        present = lookup.positions(string, -1)
+        keep &= np.bincount(group_ids[present], minlength = group_count) > 0
+
+    selected = np.flatnonzero(filtered & keep[group_ids])
+
+    # Order groups by their first matching column, and columns by position within each group
+    first_position = np.full(group_count, len(group_ids))
+    np.minimum.at(first_position, group_ids[selected], selected)
+    selected = selected[np.lexsort((selected, first_position[group_ids[selected]]))]
+
+    return mask_labels(df.columns, selected)
@@ -72,13 +72,13 @@ def get_dataframe_attributes(df, startcol, startrow):
 
     # Index and columns start and end positions
     index_startcol = startcol
-    index_startrow = startrow + col_levels + 2 if columns_is_multi else startrow + col_levels
+    index_startrow = startrow + col_levels + 2 if columns_is_multi else startrow + col_levels + 1
     index_endcol = startcol + index_levels
     index_endrow = endrow
 
     columns_startcol = startcol + index_levels + 1
     columns_startrow = startrow
-    columns_endcol = endcol + index_levels
+    columns_endcol = endcol
     columns_endrow = startrow + col_levels
 
     # Names of each level for index and columns
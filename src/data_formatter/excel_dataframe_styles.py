@@ -1,6 +1,5 @@
 from pandas.io.formats.excel import ExcelFormatter
 import pandas as pd
-from .util import get_even_numbers
 from itertools import repeat
 
 
@@ -59,15 +58,13 @@ def data_format_totals(s):
 
 
 def alternate_color_rows(s, dd, color = '#DCE6F0'):
-    even_rows = get_even_numbers(dd.index)
-    even_index = dd.index[even_rows]
+    even_index = dd.index[::2]
     x = pd.Series(f'background-color: {color};', index = even_index)
     return x
 
 
 def alternate_color_cols(s, dd, color = '#B8CCE4'):
-    even_cols = get_even_numbers(dd.columns)
-    even_col_values = dd.columns[even_cols]
+    even_col_values = dd.columns[::2]
     x = pd.Series(f'background-color: {color};', index = even_col_values)
     return x
 
@@ -75,3 +72,38 @@ def alternate_color_cols(s, dd, color = '#B8CCE4'):
 def format_hyperlink(s):
     return [("font-weight: bold; font-style: italic; text-decoration: underline; text-align: "
              "right; color: #C00000") for _ in s]
+
+
+# Range styles are XlsxWriter format properties for a block of a table's data, index or column
+# labels. rows and cols are positions within that block: an int, a list of ints, or a slice,
+# whose step picks every n-th row or column. add_range_styles writes them as conditional formats.
+def range_style(properties, part = 'data', rows = None, cols = None):
+    return {'properties': properties, 'part': part, 'rows': rows, 'cols': cols}
+
+
+def range_format_standard(rows = None, cols = None):
+    return range_style({'border': 1}, rows = rows, cols = cols)
+
+
+def range_format_dollars(rows = None, cols = None):
+    return range_style({'num_format': '$#,##0.00'}, rows = rows, cols = cols)
+
+
+def range_format_percent(rows = None, cols = None):
+    return range_style({'num_format': '0.0%'}, rows = rows, cols = cols)
+
+
+def range_format_totals(rows = -1, cols = None):
+    return range_style({'top': 2}, rows = rows, cols = cols)
+
+
+def range_color_rows(color = '#DCE6F0', part = 'data'):
+    return range_style({'bg_color': color}, part = part, rows = slice(0, None, 2))
+
+
+def range_color_cols(color = '#B8CCE4', part = 'data'):
+    return range_style({'bg_color': color}, part = part, cols = slice(0, None, 2))
+
+
+def range_format_hyperlink(rows = None, cols = None):
+    return range_style({'bold': True, 'italic': True, 'underline': 1, 'font_color': '#C00000'}, rows = rows, cols = cols)
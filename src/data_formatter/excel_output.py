@@ -1,34 +1,480 @@
+import collections
+import copy
+import datetime
+import itertools
+import numpy as np
 import pandas as pd
 import tempfile
 import os
 import string
+import weakref
 from openpyxl import load_workbook
+from pandas.io.formats.excel import CSSToExcelConverter, ExcelCell, ExcelFormatter
 from casefy import snakecase
-from .excel_attributes import get_dataframe_attributes, get_dataframe_cell_range
+from .excel_attributes import get_dataframe_attributes, get_dataframe_cell_range, get_cell_range
 from .excel_dataframe_styles import format_hyperlink, column_format_standard
-from .excel_dataframe_styles import column_format_header_1, alternate_color_rows
+from .excel_dataframe_styles import column_format_header_1, alternate_color_rows, range_color_rows, range_color_cols
 from .util import unique_string, proper_case
 
 
-def create_workbook(file = None):
+def _open_writer(path, constant_memory = False):
+    # In constant_memory mode XlsxWriter flushes each row to disk as soon as a later row is
+    # written, so memory is bounded by one row, but rows can no longer be revisited
+    engine_kwargs = {'options': {'constant_memory': True}} if constant_memory else None
+    return pd.ExcelWriter(
+        path,
+        engine = 'xlsxwriter',
+        date_format = 'mmm-yyyy',
+        datetime_format = 'mmm-yyyy',
+        engine_kwargs = engine_kwargs
+    )
+
+
+def _is_streaming(w):
+    return getattr(w.book, 'constant_memory', False)
+
+
+def _check_streaming_row(w, sheet_name, startrow):
+    # A streaming workbook has flushed every row above the last one written
+    if _is_streaming(w) and sheet_name in w.sheets and w.sheets[sheet_name].dim_rowmax is not None:
+        if startrow < w.sheets[sheet_name].dim_rowmax:
+            raise ValueError(
+                f"Cannot write at row {startrow} of '{sheet_name}': a streaming workbook only writes from "
+                f"the last row written ({w.sheets[sheet_name].dim_rowmax}) down."
+            )
+
+
+# The Formats of each workbook by their properties, and the properties of each Format
+_FORMAT_CACHE = weakref.WeakKeyDictionary()
+
+
+def _cached_format(w, properties):
+    # One Format per distinct set of XlsxWriter properties, shared by every table in the workbook
+    if not properties:
+        return None
+    formats, format_properties = _FORMAT_CACHE.setdefault(w.book, ({}, {}))
+    key = tuple(sorted(properties.items()))
+    if key not in formats:
+        formats[key] = w.book.add_format(properties)
+        format_properties[formats[key]] = dict(properties)
+    return formats[key]
+
+
+def _with_num_format(w, fmt, num_format):
+    # The Format a date or timedelta needs; like pandas, it replaces any number format of the style
+    if num_format is None:
+        return fmt
+    properties = {} if fmt is None else _FORMAT_CACHE[w.book][1][fmt]
+    return _cached_format(w, {**properties, 'num_format': num_format})
+
+
+# The XlsxWriter property each key of an Excel style sets, in the order to_excel looks them up;
+# the first key found sets the property
+_STYLE_PROPERTIES = {
+    'font': [
+        ('name', 'font_name'), ('sz', 'font_size'), ('size', 'font_size'), ('color', 'font_color'), ('b', 'bold'),
+        ('bold', 'bold'), ('i', 'italic'), ('italic', 'italic'), ('u', 'underline'), ('underline', 'underline'),
+        ('strike', 'font_strikeout'), ('vertAlign', 'font_script'), ('vertalign', 'font_script')
+    ],
+    'number_format': [('format_code', 'num_format'), (None, 'num_format')],
+    'protection': [('locked', 'locked'), ('hidden', 'hidden')],
+    'alignment': [
+        ('horizontal', 'align'), ('vertical', 'valign'), ('text_rotation', 'rotation'), ('wrap_text', 'text_wrap'),
+        ('indent', 'indent'), ('shrink_to_fit', 'shrink')
+    ],
+    'fill': [
+        ('patternType', 'pattern'), ('patterntype', 'pattern'), ('fill_type', 'pattern'),
+        ('start_color', 'fg_color'), ('fgColor', 'fg_color'), ('fgcolor', 'fg_color'),
+        ('end_color', 'bg_color'), ('bgColor', 'bg_color'), ('bgcolor', 'bg_color')
+    ],
+    'border': [('color', 'border_color'), ('style', 'border')] + [
+        (key, f'{side}{suffix}') for side in ['top', 'right', 'bottom', 'left']
+        for key, suffix in [(f'{side}.color', '_color'), (f'{side}.style', ''), (side, '')]
+    ]
+}
+_BORDER_STYLES = [
+    'none', 'thin', 'medium', 'dashed', 'dotted', 'thick', 'double', 'hair', 'mediumDashed', 'dashDot',
+    'mediumDashDot', 'dashDotDot', 'mediumDashDotDot', 'slantDashDot'
+]
+_UNDERLINES = {'none': 0, 'single': 1, 'double': 2, 'singleAccounting': 33, 'doubleAccounting': 34}
+
+
+def _xlsxwriter_properties(style, num_format = None):
+    # Flatten an Excel style from CSSToExcelConverter or ExcelFormatter.header_style into
+    # XlsxWriter Format properties, as to_excel does
+    properties = {} if num_format is None else {'num_format': num_format}
+    for group, values in (style or {}).items():
+        for key, name in _STYLE_PROPERTIES.get('border' if group == 'borders' else group, []):
+            value = values
+            for part in [] if key is None else key.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, dict) and name.endswith('color'):
+                value = value.get('rgb')
+            if value is not None and name not in properties:
+                properties[name] = value
+
+    if isinstance(properties.get('pattern'), str):
+        properties['pattern'] = 0 if properties['pattern'] == 'none' else 1
+    for name in ['border', 'top', 'right', 'bottom', 'left']:
+        if isinstance(properties.get(name), str):
+            style_name = properties[name]
+            properties[name] = _BORDER_STYLES.index(style_name) if style_name in _BORDER_STYLES else 2
+    if isinstance(properties.get('font_script'), str):
+        properties['font_script'] = ['baseline', 'superscript', 'subscript'].index(properties['font_script'])
+    if isinstance(properties.get('underline'), str):
+        properties['underline'] = _UNDERLINES[properties['underline']]
+    if properties.get('valign') == 'center':
+        properties['valign'] = 'vcenter'
+    return properties
+
+
+def _css_declarations(css):
+    # 'color: red; font-weight: bold' as [('color', 'red'), ('font-weight', 'bold')], as Styler reads it
+    declarations = []
+    for item in css.split(';'):
+        if item.strip() == '':
+            continue
+        if ':' not in item:
+            raise ValueError(
+                f"Styles supplied as string must follow CSS rule formats, for example 'attr: val;'. '{css}' was given."
+            )
+        prop, val = item.split(':', 1)
+        declarations.append((prop.strip(), val.strip()))
+    return declarations
+
+
+def _header_format(w):
+    # The header style of to_excel, which set_new_default_header_style can replace
+    return _cached_format(w, _xlsxwriter_properties(ExcelFormatter(pd.DataFrame()).header_style))
+
+
+def _native_formats(w, df):
+    # The header Format, and the compiled Formats of a Styler. Returns None if the Styler cannot
+    # be compiled with this version of pandas, so write_dataframe goes through to_excel instead.
+    header_format = _header_format(w)
+    if isinstance(df, pd.DataFrame):
+        return header_format, None
+    styles = compile_styler(w, df)
+    return None if styles is None else (header_format, styles)
+
+
+def _styler_results(styler):
+    # Apply the functions of a Styler and return the CSS each one gives the data as a DataFrame,
+    # together with the Styler that holds the CSS of the index and columns. Styler._compute
+    # records the CSS of the data with one label lookup per cell, which costs more than writing
+    # the table, so the DataFrame each function returns is caught as it is passed to
+    # _update_ctx. That relies on Styler internals: it runs on a copy of the Styler, and returns
+    # None if this version of pandas computes styles another way.
+    styler = copy.copy(styler)
+    styler.ctx, styler.ctx_index, styler.ctx_columns = (collections.defaultdict(list) for _ in range(3))
+    results = []
+    styler._update_ctx = results.append
+    try:
+        styler._compute()
+    except (AttributeError, TypeError):
+        return None
+    if len(styler.ctx) > 0 or not all(isinstance(x, pd.DataFrame) for x in results):
+        return None
+    return results, styler
+
+
+def compile_styler(w, styler):
+    # Compile the CSS of a Styler into XlsxWriter Formats. The Styler applies its functions as
+    # usual, but the CSS they return for the data is placed with one indexer per function instead
+    # of one label lookup per cell. Each distinct CSS string is parsed and converted once, and each
+    # distinct set of properties becomes one Format in the workbook cache, so every table written
+    # to the workbook shares them. Returns an array with the Format of every data cell, and the
+    # Formats of the index and column label cells by (row, col) position; a part the Styler does
+    # not style is None and keeps the to_excel default. Returns None if this version of pandas
+    # computes styles in a way the compiler does not know.
+    data = styler.data
+    if not data.index.is_unique or not data.columns.is_unique:
+        raise KeyError("`Styler.apply` and `.map` are not compatible with non-unique index or columns.")
+
+    computed = _styler_results(styler)
+    if computed is None:
+        return None
+    results, styler = computed
+
+    converter = CSSToExcelConverter()
+    compiled = {}
+
+    def compile_css(declarations):
+        key = frozenset({prop.lower(): val for prop, val in declarations}.items())
+        if key not in compiled:
+            compiled[key] = _cached_format(w, _xlsxwriter_properties(converter(key)))
+        return compiled[key]
+
+    def compile_ctx(ctx):
+        if not ctx:
+            return None
+        return {position: compile_css(declarations) for position, declarations in ctx.items()}
+
+    data_formats = None
+    if len(results) > 0:
+        css = np.full(data.shape, '', dtype = object)
+        for result in results:
+            rows = data.index.get_indexer(result.index)[:, None]
+            cols = data.columns.get_indexer(result.columns)
+            values = result.to_numpy(dtype = object)
+            styled = np.frompyfunc(lambda x: isinstance(x, str) and x != '', 1, 1)(values).astype(bool)
+            css[rows, cols] = np.where(styled, css[rows, cols] + ';' + np.where(styled, values, ''), css[rows, cols])
+        strings, codes = np.unique(css.ravel(), return_inverse = True)
+        formats = np.array([None] + [compile_css(_css_declarations(x)) for x in strings[1:]], dtype = object)
+        if strings[0] != '':
+            formats[0] = compile_css(_css_declarations(strings[0]))
+        data_formats = formats[codes].reshape(data.shape)
+
+    return {
+        'data': data_formats,
+        'index': compile_ctx(styler.ctx_index),
+        'columns': compile_ctx(styler.ctx_columns)
+        }
+
+
+def _excel_value(w, val):
+    # Convert a value the way to_excel does, returning it with the number format it needs
+    if pd.api.types.is_scalar(val) and pd.isna(val):
+        return '', None
+    if getattr(val, 'tzinfo', None) is not None:
+        raise ValueError(
+            "Excel does not support datetimes with timezones. Please ensure that datetimes are "
+            "timezone unaware before writing to Excel."
+        )
+    if pd.api.types.is_integer(val):
+        return int(val), None
+    if pd.api.types.is_float(val):
+        if np.isinf(val):
+            return 'inf' if val > 0 else '-inf', None
+        return float(val), None
+    if pd.api.types.is_bool(val):
+        return bool(val), None
+    if isinstance(val, datetime.datetime):
+        return val, w.datetime_format
+    if isinstance(val, datetime.date):
+        return val, w.date_format
+    if isinstance(val, datetime.timedelta):
+        return val.total_seconds() / 86400, '0'
+    return str(val), None
+
+
+def _label_spans(index):
+    # Where each merged label starts and how many rows or columns it spans, as in to_excel:
+    # a label starts a new span when it or any level above it changes; the last level never merges
+    if not isinstance(index, pd.MultiIndex):
+        return [{i: 1 for i in range(len(index))}]
+    spans = []
+    changed = np.zeros(len(index), dtype = bool)
+    if len(index) > 0:
+        changed[0] = True
+    for lvl in range(index.nlevels):
+        codes = index.codes[lvl]
+        changed[1:] |= codes[1:] != codes[:-1]
+        starts = np.flatnonzero(changed) if lvl < index.nlevels - 1 else np.arange(len(index))
+        lengths = np.diff(np.append(starts, len(index)))
+        spans.append(dict(zip(starts.tolist(), lengths.tolist())))
+    return spans
+
+
+def _level_values(index, lvl):
+    if isinstance(index, pd.MultiIndex):
+        return index.get_level_values(lvl)
+    if isinstance(index, pd.PeriodIndex):
+        return index.to_timestamp()
+    return index
+
+
+def _data_rows(w, df):
+    # The data block as one list of values per row, plus the cells that need a number format
+    values = df.to_numpy()
+    formatted = []
+    if values.dtype.kind in 'iub':
+        return values.tolist(), formatted
+    if values.dtype.kind == 'f':
+        rows = values.astype(object)
+        rows[np.isnan(values)] = None
+        rows[np.isposinf(values)] = 'inf'
+        rows[np.isneginf(values)] = '-inf'
+        return rows.tolist(), formatted
+
+    rows = []
+    for i, row in enumerate(df.itertuples(index = False, name = None)):
+        converted = []
+        for j, val in enumerate(row):
+            val, num_format = _excel_value(w, val)
+            if num_format is not None:
+                formatted.append((i, j, val, num_format))
+                val = None
+            converted.append(None if val == '' else val)
+        rows.append(converted)
+    return rows, formatted
+
+
+def _write_dataframe_native(w, df, sheet_name, startrow, startcol, index, header_format, styles = None):
+    # Write a DataFrame with the cell layout of to_excel(merge_cells=True), row by row and
+    # straight through the worksheet, without building a cell object per value. styles are the
+    # Formats from compile_styler; each row of data is written as runs of cells sharing one.
+    wks = w.book.get_worksheet_by_name(sheet_name)
+    if wks is None:
+        wks = w.book.add_worksheet(sheet_name)
+    styles = styles or {'data': None, 'index': None, 'columns': None}
+
+    def label(val, part, position):
+        fmt = header_format if styles[part] is None else styles[part].get(position)
+        val, num_format = _excel_value(w, val)
+        return val, _with_num_format(w, fmt, num_format)
+
+    columns = df.columns
+    index_levels = df.index.nlevels if index else 0
+    header_merges = {}
+    header_rows = []
+
+    # Column labels, with the column level names in the last index column
+    column_spans = _label_spans(columns)
+    for lvl in range(columns.nlevels):
+        cells = []
+        if columns.nlevels > 1:
+            cells.append((index_levels - 1, (_excel_value(w, columns.names[lvl])[0], header_format)))
+        values = _level_values(columns, lvl)
+        for i, span in column_spans[lvl].items():
+            val, fmt = label(values[i], 'columns', (lvl, i))
+            cells.append((index_levels + i, (val, fmt)))
+            for j in range(i + 1, i + span):
+                cells.append((index_levels + j, ('', fmt)))
+            if span > 1:
+                header_merges.setdefault(lvl, []).append((index_levels + i, index_levels + i + span - 1, val, fmt))
+        header_rows.append(dict(cells))
+
+    # Index names go on the last header row, or on a row of their own under MultiIndex columns
+    names = list(df.index.names)
+    if columns.nlevels > 1:
+        header_rows.append({})
+    if index and ((isinstance(df.index, pd.MultiIndex) and any(x is not None for x in names))
+                  or (not isinstance(df.index, pd.MultiIndex) and names[0])):
+        for j, name in enumerate(names):
+            header_rows[-1][j] = (_excel_value(w, name)[0], header_format)
+
+    for r, cells in enumerate(header_rows):
+        for c, (val, fmt) in sorted(cells.items()):
+            wks.write(startrow + r, startcol + c, val, fmt)
+        for first, last, val, fmt in header_merges.get(r, []):
+            wks.merge_range(startrow + r, startcol + first, startrow + r, startcol + last, val, fmt)
+
+    # Index labels, one merged cell per span
+    first_data_row = len(header_rows)
+    index_cells = [[] for _ in range(len(df.index))]
+    index_merges = []
+    for lvl, spans in enumerate(_label_spans(df.index) if index else []):
+        values = _level_values(df.index, lvl)
+        for i, span in spans.items():
+            val, fmt = label(values[i], 'index', (i, lvl))
+            index_cells[i].append((lvl, val, fmt))
+            for j in range(i + 1, i + span):
+                index_cells[j].append((lvl, '', fmt))
+            if span > 1:
+                index_merges.append((first_data_row + i, lvl, first_data_row + i + span - 1, val, fmt))
+
+    rows, formatted = _data_rows(w, df)
+    data_formats = styles['data']
+    formatted_by_row = {}
+    for i, j, val, num_format in formatted:
+        fmt = None if data_formats is None else data_formats[i, j]
+        formatted_by_row.setdefault(i, []).append((j, val, _with_num_format(w, fmt, num_format)))
+
+    for i, row in enumerate(rows):
+        r = startrow + first_data_row + i
+        for lvl, val, fmt in index_cells[i]:
+            wks.write(r, startcol + lvl, val, fmt)
+        if data_formats is None:
+            wks.write_row(r, startcol + index_levels, row)
+        else:
+            start = 0
+            for fmt, run in itertools.groupby(data_formats[i]):
+                end = start + len(list(run))
+                wks.write_row(r, startcol + index_levels + start, row[start:end], fmt)
+                start = end
+        for j, val, fmt in formatted_by_row.get(i, []):
+            wks.write(r, startcol + index_levels + j, val, fmt)
+
+    # A streaming worksheet cannot go back to merge the rows under an index label, which keep the
+    # label and its formatted blanks unmerged
+    if not _is_streaming(w):
+        for first, lvl, last, val, fmt in index_merges:
+            wks.merge_range(startrow + first, startcol + lvl, startrow + last, startcol + lvl, val, fmt)
+
+
+def write_dataframe(w, df, sheet_name = 'Sheet1', startrow = 0, startcol = 0, index = True):
+    # Write a DataFrame or Styler with the layout of to_excel, directly with XlsxWriter and row
+    # by row. The CSS of a Styler is compiled to cached Formats first instead of being parsed
+    # for every cell. If the pandas internals this needs are missing, pandas writes the table.
+    #
+    # to_excel writes the headers, then each index level and each data column from top to
+    # bottom, and merge_range pads the rows below a merged label at once, both of which lose
+    # data in constant_memory mode. The tables pandas has to write (those without columns) get
+    # their formatted cells sorted by row instead; labels merged across columns are merged on
+    # their row, and labels merged down rows are written as their value and formatted blanks.
+    # Only that table is held in memory.
+    _check_streaming_row(w, sheet_name, startrow)
+
+    data = df if isinstance(df, pd.DataFrame) else df.data
+    if len(data.columns) > 0 and (index or data.columns.nlevels == 1):
+        formats = _native_formats(w, df)
+        if formats is not None:
+            _write_dataframe_native(w, data, sheet_name, startrow, startcol, index, *formats)
+            return None
+
+    if not _is_streaming(w):
+        df.to_excel(w, sheet_name = sheet_name, startrow = startrow, startcol = startcol, index = index)
+        return None
+
+    wks = w.book.get_worksheet_by_name(sheet_name)
+    if wks is None:
+        wks = w.book.add_worksheet(sheet_name)
+
+    rows = {}
+    for cell in ExcelFormatter(df, index = index, merge_cells = True).get_formatted_cells():
+        if cell.mergestart is None or cell.mergeend is None or cell.mergestart == cell.row:
+            rows.setdefault(cell.row, []).append(cell)
+            continue
+        for row in range(cell.row, cell.mergestart + 1):
+            for col in range(cell.col, cell.mergeend + 1):
+                value = cell.val if (row, col) == (cell.row, cell.col) else ''
+                rows.setdefault(row, []).append(ExcelCell(row, col, value, cell.style))
+
+    for row in sorted(rows):
+        for cell in sorted(rows[row], key = lambda x: x.col):
+            val, num_format = _excel_value(w, cell.val)
+            fmt = _cached_format(w, _xlsxwriter_properties(cell.style, num_format))
+            if cell.mergestart is None or cell.mergeend is None:
+                wks.write(startrow + row, startcol + cell.col, val, fmt)
+            else:
+                wks.merge_range(
+                    startrow + row, startcol + cell.col, startrow + row, startcol + cell.mergeend, val, fmt
+                )
+
+
+def create_workbook(file = None, constant_memory = False):
     if file is None:
         with tempfile.NamedTemporaryFile(delete = False, suffix = '.xlsx') as tmp:
-            temp_file_path = tmp.name
+            file = tmp.name
 
-    # Write the DataFrame to the temporary Excel file
-    w = pd.ExcelWriter(temp_file_path, date_format = 'mmm-yyyy', datetime_format = 'mmm-yyyy')
-    return w
+    return _open_writer(file, constant_memory)
 
 
-def quick_output(df):
+def quick_output(df, constant_memory = False):
     # Create a temporary file
     with tempfile.NamedTemporaryFile(delete = False, suffix = '.xlsx') as tmp:
         temp_file_path = tmp.name
 
     # Write the DataFrame to the temporary Excel file
-    w = pd.ExcelWriter(temp_file_path, date_format = 'mmm-yyyy', datetime_format = 'mmm-yyyy')
-    df.to_excel(w)
-    w.sheets['Sheet1'].autofit()
+    w = _open_writer(temp_file_path, constant_memory)
+    write_dataframe(w, df)
+    if constant_memory:
+        # autofit needs every cell in memory
+        w.sheets['Sheet1'].set_column(0, df.index.nlevels - 1, 35)
+        w.sheets['Sheet1'].set_column(df.index.nlevels, df.index.nlevels + len(df.columns) - 1, 15)
+    else:
+        w.sheets['Sheet1'].autofit()
     w.close()
 
     # Open the temporary Excel file
@@ -53,7 +499,7 @@ def add_named_region(w, sheet_name = 'Sheet1', cell_range = "$A$1:$A$1", name_of
     return name_of_region
 
 
-def add_dataframe_below(w, df, sheet_name = 'Sheet1', startcol = 0, name_of_region = None):
+def add_dataframe_below(w, df, sheet_name = 'Sheet1', startcol = 0, name_of_region = None, range_styles = None):
     if sheet_name not in w.sheets:
         w.book.add_worksheet(sheet_name)
 
@@ -79,14 +525,21 @@ def add_dataframe_below(w, df, sheet_name = 'Sheet1', startcol = 0, name_of_regi
     if isinstance(df, pd.DataFrame):
         df.columns.names = [None for _ in df.columns.names]
 
-    df.to_excel(w, sheet_name = sheet_name, startrow = startrow, startcol = startcol)
+    # Row formats have to be set before the row is written when the workbook is streaming
     w.sheets[sheet_name].set_row(startrow, 20)
+    write_dataframe(w, df, sheet_name = sheet_name, startrow = startrow, startcol = startcol)
+    if range_styles is not None:
+        add_range_styles(w, sheet_name, w.sheets[sheet_name].attrs[name_of_region], range_styles)
     w.sheets[sheet_name].set_column(startcol, startcol, 35)
     col_count = len(df.columns)
     w.sheets[sheet_name].set_column(startcol + 1, startcol + col_count, 15)
+    return name_of_region
+
 
+def add_dataframe_right(w, df, sheet_name = 'Sheet1', startrow = 0, name_of_region = None, range_styles = None):
+    # Fail before the region is registered, so no name points at a table that was never written
+    _check_streaming_row(w, sheet_name, startrow)
 
-def add_dataframe_right(w, df, sheet_name = 'Sheet1', startrow = 0, name_of_region = None):
     if sheet_name not in w.sheets:
         w.book.add_worksheet(sheet_name)
 
@@ -110,13 +563,16 @@ def add_dataframe_right(w, df, sheet_name = 'Sheet1', startrow = 0, name_of_regi
     if isinstance(df, pd.DataFrame):
         df.columns.names = [None for _ in df.columns.names]
 
-    df.to_excel(w, sheet_name = sheet_name, startrow = startrow, startcol = startcol)
+    w.sheets[sheet_name].set_row(startrow, 20)
+    write_dataframe(w, df, sheet_name = sheet_name, startrow = startrow, startcol = startcol)
 
     w.sheets[sheet_name].attrs[name_of_region] = get_dataframe_attributes(df, startcol, startrow)
-    w.sheets[sheet_name].set_row(startrow, 20)
+    if range_styles is not None:
+        add_range_styles(w, sheet_name, w.sheets[sheet_name].attrs[name_of_region], range_styles)
     w.sheets[sheet_name].set_column(startcol, startcol, 35)
     col_count = len(df.columns)
     w.sheets[sheet_name].set_column(startcol + 1, startcol + col_count, 15)
+    return name_of_region
 
 
 def add_dataframes_below(w, df, sheet_name = 'Sheet1', startcol = 0, name_of_region = None):
@@ -164,6 +620,99 @@ def add_dataframes_right(w, df, sheet_name = 'Sheet1', startrow = 0, name_of_reg
         return None
 
 
+# The format properties Excel keeps in a conditional format; fonts, sizes and alignment are not
+CONDITIONAL_FORMAT_PROPERTIES = {
+    'bold', 'italic', 'underline', 'font_strikeout', 'font_color', 'num_format', 'pattern', 'bg_color',
+    'fg_color', 'border', 'top', 'bottom', 'left', 'right', 'border_color', 'top_color', 'bottom_color',
+    'left_color', 'right_color'
+    }
+
+
+def _position_runs(selection, length):
+    # The runs of consecutive positions a selection picks, and the step between picked positions
+    if selection is None:
+        return [(0, length - 1)] if length > 0 else [], 1
+    if isinstance(selection, slice):
+        start, stop, step = selection.indices(length)
+        if step < 1:
+            raise ValueError("Range styles only select positions in increasing order.")
+        if len(range(start, stop, step)) == 0:
+            return [], 1
+        # A MOD formula picks the positions, so the run covers the whole slice
+        return [(start, stop - 1)], step
+
+    positions = [selection] if isinstance(selection, int) else list(selection)
+    if any(x < -length or x >= length for x in positions):
+        raise ValueError(f"Positions {positions} are out of range for {length} rows or columns.")
+    positions = sorted({x % length for x in positions})
+    runs = []
+    for x in positions:
+        if len(runs) > 0 and runs[-1][1] == x - 1:
+            runs[-1] = (runs[-1][0], x)
+        else:
+            runs.append((x, x))
+    return runs, 1
+
+
+def add_range_styles(w, sheet_name, region, styles):
+    # Style blocks of a table with one conditional format each, so the cost depends on the number
+    # of ranges rather than cells. region is a table's attributes from get_dataframe_attributes,
+    # or the region name add_dataframe_below/right return. Every n-th row or column is
+    # picked with a MOD formula over the block instead of one range per row or column. Later
+    # styles take precedence over earlier ones.
+    wks = w.sheets[sheet_name]
+    attrs = wks.attrs[region] if isinstance(region, str) else region
+
+    for style in reversed(styles):
+        unsupported = set(style['properties']) - CONDITIONAL_FORMAT_PROPERTIES
+        if len(unsupported) > 0:
+            raise ValueError(f"Conditional formats cannot set {sorted(unsupported)}.")
+
+        prefix = '' if style['part'] == 'table' else f"{style['part']}_"
+        startrow, endrow = attrs[f'{prefix}startrow'], attrs[f'{prefix}endrow']
+        startcol, endcol = attrs[f'{prefix}startcol'], attrs[f'{prefix}endcol']
+        row_runs, row_step = _position_runs(style['rows'], endrow - startrow + 1)
+        col_runs, col_step = _position_runs(style['cols'], endcol - startcol + 1)
+        if len(row_runs) == 0 or len(col_runs) == 0:
+            continue
+
+        conditions = []
+        if row_step > 1:
+            conditions.append(f"MOD(ROW()-{startrow + row_runs[0][0] + 1},{row_step})=0")
+        if col_step > 1:
+            conditions.append(f"MOD(COLUMN()-{startcol + col_runs[0][0] + 1},{col_step})=0")
+        if len(conditions) == 0:
+            criteria = '=TRUE'
+        elif len(conditions) == 1:
+            criteria = f'={conditions[0]}'
+        else:
+            criteria = f"=AND({','.join(conditions)})"
+
+        ranges = [
+            get_cell_range(startrow + r0, startrow + r1, startcol + c0, startcol + c1, absolute = False)
+            for r0, r1 in row_runs for c0, c1 in col_runs
+            ]
+        first_row, last_row = startrow + row_runs[0][0], startrow + row_runs[0][1]
+        first_col, last_col = startcol + col_runs[0][0], startcol + col_runs[0][1]
+        wks.conditional_format(first_row, first_col, last_row, last_col, {
+            'type'       : 'formula',
+            'criteria'   : criteria,
+            'format'     : _cached_format(w, style['properties']),
+            'multi_range': ' '.join(ranges)
+            })
+
+
+def add_banding(w, sheet_name, region, axis = 0, color = None):
+    # Shade every other row (axis 0) or column (axis 1) of a table's data_cell_range like
+    # alternate_color_rows/cols, starting with the first, with a single MOD(ROW()) or MOD(COLUMN())
+    # conditional format instead of a background style per cell
+    if axis == 0:
+        style = range_color_rows() if color is None else range_color_rows(color)
+    else:
+        style = range_color_cols() if color is None else range_color_cols(color)
+    add_range_styles(w, sheet_name, region, [style])
+
+
 def format_page(w, sheet_name):
     w.sheets[sheet_name].set_landscape()
     w.sheets[sheet_name].hide_gridlines(2)
@@ -198,7 +747,7 @@ def convert_named_ranges_to_print_areas(file):
     w.save(file)
 
 
-def add_table_of_contents(w):
+def add_table_of_contents(w, banding = False):
     contents_sheet_name = "Contents"
 
     # get workbook name for use in hyperlink
@@ -226,17 +775,27 @@ def add_table_of_contents(w):
     styled_context = table_of_contents.style
     styled_context.apply_index(column_format_standard, axis = 1)
     styled_context.apply_index(column_format_header_1, axis = 1)
-    styled_context.apply(alternate_color_rows, dd = styled_context.data)
+    if not banding:
+        styled_context.apply(alternate_color_rows, dd = styled_context.data)
     styled_context.apply(format_hyperlink, subset = "Table Name")
 
     # Add worksheet and dataset
     w.book.add_worksheet(contents_sheet_name)
-    styled_context.to_excel(w, sheet_name = "Contents", index = False)
+    write_dataframe(w, styled_context, sheet_name = "Contents", index = False)
 
     # Add TOC named region
     cell_range = get_dataframe_cell_range(table_of_contents, 0, 0)
     add_named_region(w, contents_sheet_name, cell_range, contents_sheet_name)
 
+    # With banding, the rows below the header (written without an index) are shaded by one
+    # conditional format instead of a background style per row
+    if banding:
+        data_region = {
+            'data_startrow': 1, 'data_endrow': len(table_of_contents),
+            'data_startcol': 0, 'data_endcol': len(table_of_contents.columns) - 1
+            }
+        add_banding(w, contents_sheet_name, data_region)
+
     # format worksheet
     w.sheets["Contents"].set_column(0, 0, 15)
     w.sheets["Contents"].set_column(1, 1, 25)
@@ -0,0 +1,246 @@
+import ast
+import re
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from .calculations import growth
+
+try:
+    import numexpr
+except ImportError:  # numexpr is optional
+    numexpr = None
+
+
+# Functions that may be called inside an expression
+FUNCTIONS = {
+    'growth' : growth,
+    'abs'    : np.abs,
+    'sqrt'   : np.sqrt,
+    'log'    : np.log,
+    'exp'    : np.exp,
+    'minimum': np.minimum,
+    'maximum': np.maximum
+}
+
+# Functions numexpr can evaluate itself; expressions calling anything else run on NumPy
+NUMEXPR_FUNCTIONS = {'abs', 'sqrt', 'log', 'exp'}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd
+)
+
+
+class CompiledExpression:
+    """
+    A derived metric compiled from a string such as ``"Actual Vs Budget = Actual - Budget"``.
+
+    Attributes:
+        target (str): The name of the metric the expression defines.
+        source (str): The original expression string.
+        inputs (List[str]): The names the expression reads, in order of first use.
+        uses_numexpr (bool): Whether the expression can be evaluated with numexpr.
+    """
+
+    def __init__(self, target: str, source: str, inputs: List[str], body: str, placeholders: Dict[str, str]):
+        self.target = target
+        self.source = source
+        self.inputs = inputs
+        self._body = body
+        self._placeholders = placeholders
+        self._code = compile(body, f"<expression {target!r}>", 'eval')
+
+        calls = {node.func.id for node in ast.walk(ast.parse(body, mode = 'eval')) if isinstance(node, ast.Call)}
+        self.uses_numexpr = numexpr is not None and calls <= NUMEXPR_FUNCTIONS
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+    def evaluate(self, blocks: Dict[str, np.ndarray], use_numexpr: Optional[bool] = None) -> np.ndarray:
+        """
+        Evaluate the expression on arrays of the input metrics.
+
+        Args:
+            blocks (Dict[str, np.ndarray]): One array per input name. Arrays of any shape can be
+                                            used as long as they broadcast against each other.
+            use_numexpr (Optional[bool]): Use numexpr when possible. If None, use it whenever it
+                                          is installed and the expression supports it.
+
+        Returns:
+            np.ndarray: The value of the metric.
+        """
+        local_dict = {self._placeholders[name]: blocks[name] for name in self.inputs}
+        if use_numexpr is None:
+            use_numexpr = self.uses_numexpr
+        if use_numexpr and self.uses_numexpr:
+            return numexpr.evaluate(self._body, local_dict = local_dict)
+        return eval(self._code, {'__builtins__': {}}, {**FUNCTIONS, **local_dict})
+
+
+def _validate_tree(tree: ast.AST, placeholders: Dict[str, str], source: str) -> None:
+    """Check that an expression only uses arithmetic, known names and allowed functions."""
+    known = set(placeholders.values())
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in expression '{source}'.")
+        if isinstance(node, ast.Name) and node.id not in known and node.id not in FUNCTIONS:
+            raise ValueError(f"Unknown name '{node.id}' in expression '{source}'.")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"Unsupported function call in expression '{source}'.")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numeric constants are allowed in expression '{source}'.")
+
+
+def parse_expression(expression: str, names: List[str]) -> CompiledExpression:
+    """
+    Parse and compile a single ``"Target = expression"`` string.
+
+    Names may contain spaces and punctuation (for example ``"Actual Vs Budget (%)"``), so
+    they are matched against the list of known names, longest first, before the remaining
+    text is parsed as a Python expression. Only arithmetic operators, numeric constants and
+    the functions in `FUNCTIONS` are allowed.
+
+    Args:
+        expression (str): The expression to compile.
+        names (List[str]): The names the expression may refer to.
+
+    Returns:
+        CompiledExpression: The compiled expression.
+
+    Raises:
+        ValueError: If the expression is malformed or uses an unknown name.
+    """
+    if '=' not in expression:
+        raise ValueError(f"Expression '{expression}' must have the form 'Target = expression'.")
+    target, body = (x.strip() for x in expression.split('=', 1))
+    if target == '' or body == '':
+        raise ValueError(f"Expression '{expression}' must have the form 'Target = expression'.")
+
+    candidates = sorted(set(names) - {target}, key = len, reverse = True)
+    placeholders = {}
+    inputs = []
+
+    def replace(match):
+        name = match.group(0)
+        if name not in placeholders:
+            placeholders[name] = f"__metric_{len(placeholders)}"
+            inputs.append(name)
+        return placeholders[name]
+
+    if len(candidates) > 0:
+        pattern = re.compile('|'.join(rf"(?<!\w){re.escape(name)}(?!\w)" for name in candidates))
+        body = pattern.sub(replace, body)
+
+    try:
+        tree = ast.parse(body, mode = 'eval')
+    except SyntaxError:
+        raise ValueError(f"Could not parse expression '{expression}'.") from None
+    _validate_tree(tree, placeholders, expression)
+
+    return CompiledExpression(target, expression, inputs, body, placeholders)
+
+
+def compile_expressions(expressions: List[str], names: List[str]) -> List[CompiledExpression]:
+    """
+    Compile several expressions and order them so that every metric comes after its inputs.
+
+    A derived metric may use the result of another expression in the list. Independent
+    expressions keep the order they were given in.
+
+    Args:
+        expressions (List[str]): ``"Target = expression"`` strings.
+        names (List[str]): The names available in the data, for example the values of a
+                           MultiIndex level.
+
+    Returns:
+        List[CompiledExpression]: The compiled expressions in evaluation order.
+
+    Raises:
+        ValueError: If an expression is malformed, a target is defined twice or the
+                    expressions depend on each other in a cycle.
+
+    Example:
+        compile_expressions(
+            ["Actual Vs Budget (%) = growth(Actual, Budget) - 1", "Actual Vs Budget = Actual - Budget"],
+            ["Actual", "Budget"]
+        )
+    """
+    targets = [x.split('=', 1)[0].strip() for x in expressions]
+    if len(set(targets)) != len(targets):
+        raise ValueError("Each derived metric can only be defined once.")
+
+    all_names = list(names) + [x for x in targets if x not in names]
+    compiled = {x.target: x for x in (parse_expression(e, all_names) for e in expressions)}
+
+    ordered = []
+    done = set()
+    pending = list(targets)
+    while len(pending) > 0:
+        ready = [t for t in pending if all(x in done or x not in compiled for x in compiled[t].inputs)]
+        if len(ready) == 0:
+            raise ValueError(f"Circular dependency between expressions: {', '.join(pending)}.")
+        for t in ready:
+            ordered.append(compiled[t])
+            done.add(t)
+        pending = [t for t in pending if t not in done]
+
+    return ordered
+
+
+def _split_comparison(entry: str) -> Optional[Tuple[str, str, bool]]:
+    """Split ``"X Vs Y"`` or ``"X Vs Y (%)"`` into its two sides and whether it is a percentage."""
+    percent = entry.endswith('(%)')
+    body = entry[:-3].strip() if percent else entry
+    if ' Vs ' not in body:
+        return None
+    left, right = (x.strip() for x in body.split(' Vs ', 1))
+    return left, right, percent
+
+
+def comparison_bases(order: List[str]) -> List[str]:
+    """Return the entries of a canonical order that are not comparisons, e.g. 'Actual' and 'Budget'."""
+    return [x for x in order if _split_comparison(x) is None]
+
+
+def _resolve_base(name: str, bases: List[str], entry: str) -> str:
+    """Match one side of a comparison to a base entry, exactly or as the start of one."""
+    if name in bases:
+        return name
+    matches = [x for x in bases if x.startswith(name)]
+    if len(matches) != 1:
+        raise ValueError(f"Cannot tell which entry '{name}' refers to in '{entry}'.")
+    return matches[0]
+
+
+def comparison_expressions(order: List[str]) -> List[str]:
+    """
+    Turn the comparisons in a canonical order into expressions.
+
+    ``"X Vs Y"`` becomes ``X - Y`` and ``"X Vs Y (%)"`` becomes ``growth(X, Y) - 1``. A side may
+    be shortened to the start of a base entry, so ``"Current Vs Prior Year"`` compares
+    ``"Current Year"`` with ``"Prior Year"``.
+
+    Args:
+        order (List[str]): A canonical order such as `annum_order` or `version_order`.
+
+    Returns:
+        List[str]: One ``"Target = expression"`` string per comparison, in order.
+
+    Raises:
+        ValueError: If a side of a comparison does not match exactly one base entry.
+
+    Example:
+        comparison_expressions(["Actual", "Budget", "Actual Vs Budget"])
+        # ["Actual Vs Budget = Actual - Budget"]
+    """
+    bases = comparison_bases(order)
+    expressions = []
+    for entry in order:
+        parts = _split_comparison(entry)
+        if parts is None:
+            continue
+        left, right, percent = parts
+        left, right = _resolve_base(left, bases, entry), _resolve_base(right, bases, entry)
+        body = f"growth({left}, {right}) - 1" if percent else f"{left} - {right}"
+        expressions.append(f"{entry} = {body}")
+    return expressions
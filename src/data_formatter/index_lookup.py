@@ -0,0 +1,345 @@
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+# Maximum number of index objects that keep lookup tables alive at once
+LOOKUP_CACHE_SIZE = 128
+
+_lookup_cache: "OrderedDict[int, IndexLookup]" = OrderedDict()
+
+
+class IndexLookup:
+    """
+    Lookup tables for a single pandas Index, built lazily and cached by index identity.
+
+    Pandas indexes are immutable, so anything derived from one stays valid for as long as
+    the object is alive. Each table is computed the first time it is requested and reused
+    afterwards, which turns repeated finder calls against the same axis into dictionary hits.
+
+    Use ``get_index_lookup`` rather than creating instances directly so that the cache and
+    its eviction are handled for you.
+    """
+
+    def __init__(self, index: pd.Index):
+        self._index = weakref.ref(index)
+        self.nlevels = index.nlevels
+        self.size = len(index)
+        self._codes = {}
+        self._strings = {}
+        self._value_positions = {}
+        self._joined_strings = None
+        self._group_ids = {}
+
+    @property
+    def index(self) -> pd.Index:
+        """The index the tables were built from."""
+        return self._index()
+
+    def normalize_level(self, lvl: Optional[int]) -> int:
+        """Convert a possibly negative level number into a positive one."""
+        if self.nlevels == 1 or lvl is None:
+            return 0
+        return lvl % self.nlevels
+
+    def level_codes(self, lvl: int = 0) -> Tuple[np.ndarray, pd.Index]:
+        """Return the codes and unique values of a level (see ``level_codes``)."""
+        lvl = self.normalize_level(lvl)
+        if lvl not in self._codes:
+            self._codes[lvl] = level_codes(self.index, lvl)
+        return self._codes[lvl]
+
+    def level_strings(self, lvl: int = 0) -> np.ndarray:
+        """Return the string form of each unique level value, with ``'nan'`` for code ``-1``."""
+        lvl = self.normalize_level(lvl)
+        if lvl not in self._strings:
+            _, uniques = self.level_codes(lvl)
+            self._strings[lvl] = np.array([str(x) for x in uniques] + [str(np.nan)], dtype = object)
+        return self._strings[lvl]
+
+    def value_positions(self, lvl: int = 0) -> Dict[Hashable, np.ndarray]:
+        """
+        Return a mapping of each value of a level to the sorted positions where it appears.
+
+        Missing values are left out of the mapping.
+        """
+        lvl = self.normalize_level(lvl)
+        if lvl not in self._value_positions:
+            codes, uniques = self.level_codes(lvl)
+            order = np.argsort(codes, kind = 'stable')
+            counts = np.bincount(codes[codes >= 0], minlength = len(uniques))
+            start = int((codes < 0).sum())
+            table = {}
+            for value, count in zip(uniques, counts):
+                if count > 0:
+                    table[value] = order[start:start + count]
+                start += count
+            self._value_positions[lvl] = table
+        return self._value_positions[lvl]
+
+    def positions(self, value: Hashable, lvl: Optional[int] = None) -> np.ndarray:
+        """
+        Return the sorted positions of the labels that equal ``value``.
+
+        When ``lvl`` is None on a MultiIndex, a label matches if any of its levels equals the value.
+        """
+        levels = range(self.nlevels) if lvl is None else [lvl]
+        found = [self.value_positions(i).get(value) for i in levels]
+        found = [x for x in found if x is not None]
+        if len(found) == 0:
+            return np.array([], dtype = np.intp)
+        if len(found) == 1:
+            return found[0]
+        return np.unique(np.concatenate(found))
+
+    def joined_strings(self) -> np.ndarray:
+        """Return, for each label, the string form of its levels joined without a separator."""
+        if self._joined_strings is None:
+            joined = None
+            for i in range(self.nlevels):
+                codes, _ = self.level_codes(i)
+                strings = self.level_strings(i)[codes]
+                joined = strings if joined is None else joined + strings
+            self._joined_strings = joined
+        return self._joined_strings
+
+    def group_ids(self, lvl: int = -1) -> Tuple[np.ndarray, int]:
+        """
+        Group the labels by every level except ``lvl``.
+
+        Group ids are numbered in order of first appearance.
+
+        Returns:
+            Tuple[np.ndarray, int]: The group id of each label and the number of groups.
+        """
+        lvl = self.normalize_level(lvl)
+        if lvl not in self._group_ids:
+            key = np.zeros(self.size, dtype = np.int64)
+            for i in range(self.nlevels):
+                if i == lvl:
+                    continue
+                codes, uniques = self.level_codes(i)
+                key = key * (len(uniques) + 1) + (codes + 1)
+                # re-factorize after each level so the combined key never overflows
+                key, _ = pd.factorize(key)
+                key = key.astype(np.int64)
+            ids, uniques = pd.factorize(key)
+            self._group_ids[lvl] = (ids, len(uniques))
+        return self._group_ids[lvl]
+
+
+def _evict_index_lookup(key: int, lookup_ref: weakref.ref) -> None:
+    """Drop a cache entry once the index it was built from has been garbage collected."""
+    if _lookup_cache.get(key) is lookup_ref():
+        _lookup_cache.pop(key, None)
+
+
+def get_index_lookup(index: pd.Index) -> IndexLookup:
+    """
+    Get the cached lookup tables for an index, building them if needed.
+
+    The cache is keyed on the identity of the index object. An entry is removed as soon
+    as its index is garbage collected (for example after ``df.columns`` is replaced), and
+    the least recently used entries are dropped once more than ``LOOKUP_CACHE_SIZE``
+    indexes are cached.
+
+    Args:
+        index (pd.Index): The index (or columns) to look up.
+
+    Returns:
+        IndexLookup: The lookup tables for the index.
+    """
+    key = id(index)
+    lookup = _lookup_cache.get(key)
+    if lookup is not None and lookup.index is index:
+        _lookup_cache.move_to_end(key)
+        return lookup
+
+    lookup = IndexLookup(index)
+    _lookup_cache[key] = lookup
+    weakref.finalize(index, _evict_index_lookup, key, weakref.ref(lookup))
+
+    while len(_lookup_cache) > LOOKUP_CACHE_SIZE:
+        _lookup_cache.popitem(last = False)
+    return lookup
+
+
+def clear_index_lookup_cache() -> None:
+    """Remove every cached lookup table."""
+    _lookup_cache.clear()
+
+
+def level_codes(index: pd.Index, lvl: int = 0) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Get the integer codes and unique values for one level of an index.
+
+    For a MultiIndex the stored level codes are returned as-is. Any other index is
+    factorized, so the result always has the same shape: one code per label and a
+    small index of the distinct values the codes point into.
+
+    Args:
+        index (pd.Index): The index (or columns) to inspect.
+        lvl (int): The level to use when the index is a MultiIndex. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, pd.Index]: The codes (``-1`` for missing values) and the unique level values.
+    """
+    if isinstance(index, pd.MultiIndex):
+        return np.asarray(index.codes[lvl]), index.levels[lvl]
+
+    codes, uniques = pd.factorize(index)
+    return codes, pd.Index(uniques)
+
+
+def _contains_any(strings: np.ndarray, substrings: List[str]) -> np.ndarray:
+    """Return a boolean mask of the strings that contain any of the substrings."""
+    return np.array([any(sub in s for sub in substrings) for s in strings], dtype = bool)
+
+
+def match_positions(index: pd.Index, value: str, lvl: Optional[int] = None) -> np.ndarray:
+    """
+    Find the positions of the labels in an index that equal a value.
+
+    The positions come from the cached value-to-positions table of each level, so no
+    label tuples are built and repeated lookups against the same index are dictionary hits.
+    When ``lvl`` is None, a label matches if the value equals any of its levels.
+
+    Args:
+        index (pd.Index): The index (or columns) to search.
+        value (str): The value to search for.
+        lvl (Optional[int]): The MultiIndex level to search. If None, search all levels.
+                             Ignored for a single-level index.
+
+    Returns:
+        np.ndarray: The sorted positions of the matching labels.
+    """
+    return get_index_lookup(index).positions(value, lvl)
+
+
+def match_mask(index: pd.Index, value: str, lvl: Optional[int] = None) -> np.ndarray:
+    """
+    Build a boolean mask of the labels in an index that equal a value.
+
+    See ``match_positions`` for the matching rules.
+
+    Returns:
+        np.ndarray: A boolean array with one entry per label.
+    """
+    mask = np.zeros(len(index), dtype = bool)
+    mask[match_positions(index, value, lvl)] = True
+    return mask
+
+
+def match_like_mask(
+    index: pd.Index,
+    substrings: Union[str, List[str]],
+    lvl: Optional[int] = None
+) -> np.ndarray:
+    """
+    Build a boolean mask of the labels in an index that contain any of the substrings.
+
+    When ``lvl`` is given, only that level is searched. Otherwise the string form of every
+    level is joined for each label, which is the same text the label tuple would produce.
+    In both cases the string conversion happens once per index and is cached.
+
+    Args:
+        index (pd.Index): The index (or columns) to search.
+        substrings (Union[str, List[str]]): A substring or a list of substrings to search for.
+        lvl (Optional[int]): The MultiIndex level to search. If None, search all levels.
+
+    Returns:
+        np.ndarray: A boolean array with one entry per label.
+    """
+    if isinstance(substrings, str):
+        substrings = [substrings]
+
+    lookup = get_index_lookup(index)
+    if lvl is not None or lookup.nlevels == 1:
+        codes, _ = lookup.level_codes(0 if lvl is None else lvl)
+        matched = _contains_any(lookup.level_strings(0 if lvl is None else lvl), substrings)
+        return matched[codes]
+
+    return _contains_any(lookup.joined_strings(), substrings)
+
+
+def grouped_positions(index: pd.Index, values: List[Hashable], lvl: int = -1) -> List[np.ndarray]:
+    """
+    Find the labels whose ``lvl`` level is one of ``values`` and group them by all other levels.
+
+    Groups are ordered by their first matching label and positions are sorted within each
+    group, which is the order a scan over the label tuples would produce.
+
+    Args:
+        index (pd.Index): The index (or columns) to search.
+        values (List[Hashable]): The level values to keep.
+        lvl (int): The level holding the values. Defaults to -1, the highest level.
+
+    Returns:
+        List[np.ndarray]: The positions of the matching labels, one array per group.
+    """
+    lookup = get_index_lookup(index)
+    found = [lookup.positions(value, lvl) for value in dict.fromkeys(values)]
+    if len(found) == 0:
+        return []
+
+    selected = np.unique(np.concatenate(found))
+    group_ids, _ = lookup.group_ids(lvl)
+    ids = group_ids[selected]
+
+    # order by the group's first position, then by position
+    first = np.full(ids.max() + 1 if len(ids) > 0 else 0, len(index))
+    np.minimum.at(first, ids, selected)
+    order = np.lexsort((selected, first[ids]))
+    selected, ids = selected[order], ids[order]
+
+    boundaries = np.flatnonzero(np.diff(ids)) + 1
+    return np.split(selected, boundaries) if len(selected) > 0 else []
+
+
+def aligned_group_positions(index: pd.Index, values: List[Hashable], lvl: int = -1) -> np.ndarray:
+    """
+    Line up, group by group, the positions of each value of a level.
+
+    Labels are grouped by all levels except ``lvl``. Only groups that contain every value
+    exactly once are kept, in order of their first matching label. Row ``i`` of the result
+    holds the position of ``values[i]`` in each group, so taking the columns (or rows) at
+    those positions gives one 2-D block per value with the groups aligned.
+
+    Args:
+        index (pd.Index): The index (or columns) to search.
+        values (List[Hashable]): The level values to line up.
+        lvl (int): The level holding the values. Defaults to -1, the highest level.
+
+    Returns:
+        np.ndarray: An integer array of shape ``(len(values), number of complete groups)``.
+    """
+    if len(values) == 0:
+        return np.empty((0, 0), dtype = np.intp)
+
+    lookup = get_index_lookup(index)
+    group_ids, group_count = lookup.group_ids(lvl)
+
+    aligned = np.full((len(values), group_count), -1, dtype = np.intp)
+    counts = np.zeros(group_count, dtype = np.intp)
+    for i, value in enumerate(values):
+        positions = lookup.positions(value, lvl)
+        aligned[i, group_ids[positions]] = positions
+        counts += np.bincount(group_ids[positions], minlength = group_count)
+
+    complete = (counts == len(values)) & (aligned >= 0).all(axis = 0)
+    aligned = aligned[:, complete]
+
+    # order groups by their first matching position
+    order = np.argsort(aligned.min(axis = 0), kind = 'stable')
+    return aligned[:, order]
+
+
+def mask_positions(mask: np.ndarray) -> List[int]:
+    """Convert a boolean mask into a list of integer positions."""
+    return np.flatnonzero(mask).tolist()
+
+
+def mask_labels(index: pd.Index, mask: np.ndarray) -> List[Union[str, Tuple]]:
+    """Return the labels of an index selected by a boolean mask or an array of positions."""
+    return index[mask].tolist()
@@ -1,6 +1,212 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
 import pandas as pd
-from typing import List, Optional, Union
-from src.data_formatter.util import move_df_level_to_front
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.data_formatter.backends import group_aggregate
+from src.data_formatter.categoricals import apply_canonical_dtypes
+from src.data_formatter.validate import validate_value_is_an_int
+
+
+def _key_codes(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Factorize a key in order of first appearance, storing the codes in the smallest signed type."""
+    codes, uniques = pd.factorize(column)
+    return codes.astype(np.promote_types(np.int8, np.min_scalar_type(len(uniques))), copy = False), uniques
+
+
+def _group_codes(codes: List[np.ndarray], sizes: List[int]) -> np.ndarray:
+    """
+    Combine the codes of several keys into one code per row.
+
+    The combined codes sort like the tuples of key codes, so ordering by them orders the
+    rows by each key in turn. Rows where any key is missing (code -1) get -1.
+    """
+    combined = np.zeros(len(codes[0]), dtype = np.int64)
+    missing = np.zeros(len(combined), dtype = bool)
+    bound = 1
+    for key_codes, size in zip(codes, sizes):
+        size = max(size, 1)
+        if bound * size >= 2 ** 62:
+            # Renumber the combinations so far, keeping their order, before the product overflows
+            combined = pd.factorize(combined, sort = True)[0].astype(np.int64)
+            bound = int(combined.max()) + 1
+        missing |= key_codes < 0
+        combined = combined * size + key_codes
+        bound *= size
+    combined[missing] = -1
+    return combined
+
+
+def _number(codes: np.ndarray, sort: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Number the distinct values of non-negative `codes`, in sorted order or in order of first
+    appearance.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The number of each position and the first position of
+        each number.
+    """
+    bound = int(codes.max()) + 1
+    if sort and bound <= 4 * len(codes):
+        # Few possible values: rank them by counting instead of hashing and sorting
+        present = np.zeros(bound, dtype = bool)
+        present[codes] = True
+        numbers = (np.cumsum(present) - 1)[codes]
+        first = np.full(int(present.sum()), len(codes), dtype = np.intp)
+        np.minimum.at(first, numbers, np.arange(len(codes)))
+        return numbers, first
+
+    numbers, distinct = pd.factorize(codes)
+    # Numbered by first appearance, a value is new exactly where the running maximum grows
+    peak = np.maximum.accumulate(numbers)
+    first = np.flatnonzero(np.concatenate([[True], peak[1:] > peak[:-1]]))
+    if sort:
+        order = np.argsort(distinct, kind = 'stable')
+        rank = np.empty(len(order), dtype = numbers.dtype)
+        rank[order] = np.arange(len(order))
+        numbers, first = rank[numbers], first[order]
+    return numbers, first
+
+
+def _drop_unused(codes: np.ndarray, uniques: pd.Index) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Drop the values of a key that no cell uses, as unstacking does with
+    `MultiIndex.remove_unused_levels`. Like it, the values left are then numbered in order of
+    first appearance rather than in their original order.
+    """
+    used = np.zeros(len(uniques), dtype = bool)
+    used[codes] = True
+    if used.all():
+        return codes, uniques
+    order = pd.unique(codes)
+    renumber = np.empty(len(uniques), dtype = codes.dtype)
+    renumber[order] = np.arange(len(order))
+    return renumber[codes], uniques.take(order)
+
+
+def _axis_labels(codes: List[np.ndarray], uniques: List[pd.Index], names: List[str]) -> pd.MultiIndex:
+    """Build the labels of one axis of a pivot from the key codes of its first cells."""
+    return pd.MultiIndex(levels = uniques, codes = codes, names = names, verify_integrity = False)
+
+
+def _pivot_codes(
+    df: pd.DataFrame,
+    index: List[str],
+    columns: List[str],
+    values: List[str],
+    func: Union[str, List[str]]
+) -> Optional[pd.DataFrame]:
+    """
+    Pivot by grouping on the integer codes of the keys, for `pivot_to` with `fast`.
+
+    Each key is hashed once into small integer codes (categorical keys are not hashed at all)
+    and the codes are combined into one integer per row. The rows are then grouped on that
+    single integer, and the aggregated cells are placed in the table directly instead of
+    through `unstack`. The result is the same as
+    ``pivot_table(..., fill_value=0, observed=True, sort=False)``.
+
+    Returns:
+        Optional[pd.DataFrame]: The pivot, or None for the cases left to `pivot_table`: no index
+        or column keys, aggregations given as callables, results that are not numeric, or no
+        cells at all.
+    """
+    funcs = [func] if isinstance(func, str) else list(func)
+    if len(df) == 0 or len(index) == 0 or len(columns) == 0 or not all(isinstance(f, str) for f in funcs):
+        return None
+
+    keys = index + columns
+    factorized = [_key_codes(df[key]) for key in keys]
+    codes = [x[0] for x in factorized]
+    uniques = [x[1] for x in factorized]
+
+    # pivot_table keeps the value columns in the order of the DataFrame
+    data = df[[x for x in df.columns if x in values]]
+    combined = _group_codes(codes, [len(x) for x in uniques])
+    positions = np.flatnonzero(combined >= 0)
+    if len(positions) == 0:
+        return None
+    if len(positions) < len(df):
+        # Rows with a missing key are left out, as groupby does
+        data, combined = data.iloc[positions], combined[positions]
+    cells, first = _number(combined, sort = False)
+    first = positions[first]
+    # The cells are already numbered, so group on them as categorical codes without hashing again
+    grouper = pd.Categorical.from_codes(cells, categories = pd.RangeIndex(len(first)), validate = False)
+
+    tables = []
+    for f in funcs:
+        agged = data.groupby(grouper, observed = True).agg(f)
+        if not all(dtype.kind in 'iuf' for dtype in agged.dtypes):
+            return None
+        # Cells whose aggregates are all missing are left out, as in pivot_table
+        keep = agged.notna().any(axis = 1).to_numpy()
+        if not keep.any():
+            return None
+        agged, rows = agged[keep], first[keep]
+
+        cell_keys = [_drop_unused(x[rows], u) for x, u in zip(codes, uniques)]
+        cell_codes, cell_uniques = [x[0] for x in cell_keys], [x[1] for x in cell_keys]
+        cell_sizes = [len(x) for x in cell_uniques]
+
+        # Like unstack, order the rows by the codes of each key, and the columns the same way for
+        # one key but by first appearance of the whole combination for several
+        row_of, row_first = _number(_group_codes(cell_codes[:len(index)], cell_sizes[:len(index)]), sort = True)
+        col_of, col_first = _number(
+            _group_codes(cell_codes[len(index):], cell_sizes[len(index):]), sort = len(columns) == 1
+        )
+        row_labels = _axis_labels([x[row_first] for x in cell_codes[:len(index)]], cell_uniques[:len(index)], index)
+        col_labels = _axis_labels([x[col_first] for x in cell_codes[len(index):]], cell_uniques[len(index):], columns)
+        if len(index) == 1:
+            row_labels = row_labels.get_level_values(0)
+
+        blocks = []
+        for value in agged.columns:
+            cell_values = agged[value].to_numpy()
+            if cell_values.dtype.kind == 'f':
+                cell_values = np.nan_to_num(cell_values, nan = 0, posinf = np.inf, neginf = -np.inf)
+            block = np.zeros((len(row_first), len(col_first)), dtype = cell_values.dtype)
+            block[row_of, col_of] = cell_values
+            blocks.append(pd.DataFrame(block, index = row_labels, copy = False))
+        table = pd.concat(blocks, axis = 1)
+        table.columns = pd.MultiIndex(
+            levels = [pd.Index(agged.columns)] + list(col_labels.levels),
+            codes = [np.repeat(np.arange(agged.shape[1]), len(col_labels))]
+                    + [np.tile(x, agged.shape[1]) for x in col_labels.codes],
+            names = [None] + columns,
+            verify_integrity = False
+        )
+        tables.append(table)
+
+    return tables[0] if isinstance(func, str) else pd.concat(tables, axis = 1, keys = funcs)
+
+
+def _restore_levels(index: pd.Index, converted: List[str]) -> pd.Index:
+    """Turn categorical levels created from string keys back into plain levels."""
+    if isinstance(index, pd.MultiIndex):
+        levels = [
+            level.astype(level.categories.dtype) if name in converted and isinstance(level, pd.CategoricalIndex) else level
+            for name, level in zip(index.names, index.levels)
+        ]
+        return index.set_levels(levels)
+    if index.name in converted and isinstance(index, pd.CategoricalIndex):
+        return index.astype(index.categories.dtype)
+    return index
+
+
+def _prepend_level(index: pd.Index, title: str) -> pd.MultiIndex:
+    """Add a constant top level named and filled with `title`, without touching any data."""
+    if isinstance(index, pd.MultiIndex):
+        levels, codes, names = list(index.levels), list(index.codes), list(index.names)
+    else:
+        codes, uniques = pd.factorize(index)
+        levels, codes, names = [uniques], [codes], [index.name]
+    return pd.MultiIndex(
+        levels = [[title]] + levels,
+        codes = [np.zeros(len(index), dtype = np.intp)] + codes,
+        names = [title] + names,
+        verify_integrity = False
+    )
 
 
 def pivot_to(
@@ -10,55 +216,851 @@ def pivot_to(
     title: Optional[str] = None,
     func: Union[str, List[str]] = 'sum',
     margins: bool = False,
-    margins_name: str = 'Total'
+    margins_name: str = 'Total',
+    fast: bool = False,
+    subtotals: bool = False,
+    backend: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Pivot a DataFrame based on specified values and columns, automatically determining the index.
 
+    With `fast`, each key is factorized once and the rows are grouped on one combined integer
+    code, and the aggregated cells are placed in the table directly instead of through
+    `unstack` (see `_pivot_codes`). Only observed key combinations are kept, so categorical
+    keys do not add rows or columns for unused categories as they do on the default path
+    (``observed=False``); otherwise the result has the same labels, order and dtypes. Hashing string keys still dominates the time
+    for object columns; keys that already arrive as categoricals (for example after
+    `apply_canonical_dtypes`) are not hashed at all. Margins are left to `pivot_table`. See
+    ``benchmarks/bench_pivot_to.py``.
+
+    With `subtotals`, a subtotal row is added for each index level above the last with
+    `add_subtotals`. The margins are then rolled up from the aggregated pivot as well, rather
+    than recomputed from the data by `pivot_table`, which is much faster with several index
+    levels. Only 'sum', 'count', 'min' and 'max' can be rolled up this way.
+
+    With a `backend` such as 'polars' or 'duckdb', the group-by over the data runs on that
+    engine (see `data_formatter.backends`) and only the aggregated cells are laid out with
+    pandas, so the result has the same labels, order and dtypes as the pandas path.
+
     Args:
         df (pd.DataFrame): The input DataFrame.
         values (List[str]): The column names to use as values in the pivot table.
         columns (List[str]): The column names to use as columns in the pivot table.
-        title (Optional[str]): An optional title to add as a column in the DataFrame.
+        title (Optional[str]): An optional title to add as the top level of the result's columns.
+                               The input DataFrame is not modified.
         func (Union[str, List[str]]): The aggregation function(s) to apply. Defaults to 'sum'.
         margins (bool): Whether to add margins (subtotals) to the pivot table. Defaults to False.
         margins_name (str): The name to use for the margins row/column. Defaults to 'Total'.
+        fast (bool): Group on the integer codes of the keys, keeping only observed combinations.
+                     Defaults to False.
+        subtotals (bool): Add a subtotal row for each index level above the last. Defaults to False.
+        backend (Optional[str]): The engine to aggregate on: 'pandas', 'polars' or 'duckdb'. Any
+                                 backend other than pandas supports 'sum', 'count', 'min', 'max'
+                                 and 'mean'. Defaults to pandas.
 
     Returns:
         pd.DataFrame: The pivoted DataFrame.
 
+    Raises:
+        ValueError: If `subtotals` is used with a function that cannot be rolled up, e.g. 'mean',
+                    or a backend is given a function it does not support.
+        ImportError: If the backend's package is not installed.
+
     Example:
         pivot_to(df, values=['Sales'], columns=['Region'], title='Year', func='sum')
     """
-    if title is not None:
-        df.insert(0, title, title)
-        columns = [title] + columns
-
     data_index = [x for x in df.columns if x not in values and x not in columns]
 
-    df_pivot = df.pivot_table(
-        index=data_index,
-        columns=columns,
-        values=values,
-        aggfunc=func,
-        fill_value=0,
-        margins=margins,
-        margins_name=margins_name,
-        sort=False
-    )
+    if backend not in (None, 'pandas'):
+        spec = {
+            'values': values, 'columns': columns, 'index': data_index, 'func': func,
+            'margins': margins and not subtotals, 'margins_name': margins_name
+        }
+        partials = sorted({p for f in _spec_funcs(spec) for p in _PARTIALS[f]})
+        keys = data_index + columns
+        cube = group_aggregate(df, keys, [(v, p) for v in values for p in partials], backend = backend)
+        df_pivot = _pivot_from_cube(cube, keys, spec)
+    else:
+        df_pivot = None
+        if fast and not (margins and not subtotals):
+            df_pivot = _pivot_codes(df, data_index, columns, values, func)
+
+        if df_pivot is None:
+            df_pivot = df.pivot_table(
+                index=data_index,
+                columns=columns,
+                values=values,
+                aggfunc=func,
+                fill_value=0,
+                margins=margins and not subtotals,
+                margins_name=margins_name,
+                observed=fast,
+                sort=False
+            )
+
+    if subtotals:
+        rollup = func if isinstance(func, str) else {col: col[0] for col in df_pivot.columns}
+        _rollup_funcs(df_pivot.columns, rollup)
+        if margins:
+            df_pivot = _margin_columns(df_pivot, func, margins_name)
+            rollup = func if isinstance(func, str) else {col: col[0] for col in df_pivot.columns}
+        df_pivot = add_subtotals(df_pivot, rollup, name = margins_name, grand_total = margins)
 
     if title is not None:
-        df_pivot = move_df_level_to_front(df_pivot, "Testing Data", axis = 1)
+        df_pivot.columns = _prepend_level(df_pivot.columns, title)
     return df_pivot
 
 
-def pivot_to_standard_format(df, title = None):
+def pivot_to_standard_format(df, title = None, canonical = False):
+    """
+    Pivot a long DataFrame to amounts by duration and annum.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame with 'amount', 'duration' and 'annum' columns.
+        title (Optional[str]): An optional title to add as the top column level.
+        canonical (bool): Store the 'duration' and 'annum' columns of the input and the levels
+                          of the output as the shared ordered categoricals from `constants`.
+                          Only the observed combinations of them are kept. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The pivoted DataFrame.
+    """
     data_values = ['amount']
     data_cols = ['duration', 'annum']
+    if canonical:
+        return apply_canonical_dtypes(pivot_to(apply_canonical_dtypes(df), data_values, data_cols, title = title, fast = True))
     return pivot_to(df, data_values, data_cols, title = title)
 
 
-def pivot_to_series_format(df, title = None):
+def pivot_to_series_format(df, title = None, canonical = False):
+    """
+    Pivot a long DataFrame to amounts by duration and period ending.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame with 'amount', 'duration' and 'period_ending' columns.
+        title (Optional[str]): An optional title to add as the top column level.
+        canonical (bool): Store the 'duration' column of the input and level of the output as
+                          the shared ordered categorical from `constants`. Only the observed
+                          combinations are kept. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The pivoted DataFrame.
+    """
     data_values = ['amount']
     data_cols = ['duration', 'period_ending']
+    if canonical:
+        return apply_canonical_dtypes(pivot_to(apply_canonical_dtypes(df), data_values, data_cols, title = title, fast = True))
     return pivot_to(df, data_values, data_cols, title = title)
+
+
+# The partial aggregates each function needs, and how to combine partials when rolling up
+_PARTIALS = {
+    'sum': ['sum'],
+    'count': ['count'],
+    'min': ['min'],
+    'max': ['max'],
+    'mean': ['sum', 'count']
+}
+_COMBINE = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def _spec_funcs(spec: dict) -> List[str]:
+    """Return the aggregation functions of a pivot spec as a list, checking they can be rolled up."""
+    funcs = spec.get('func', 'sum')
+    funcs = [funcs] if isinstance(funcs, str) else list(funcs)
+    for f in funcs:
+        if f not in _PARTIALS:
+            raise ValueError(f"Cannot roll up '{f}'; use one of {', '.join(_PARTIALS)}.")
+    return funcs
+
+
+def _rollup_funcs(columns: pd.Index, func: Union[str, Dict]) -> Union[str, Dict]:
+    """Return how to roll up each column of an aggregated pivot, e.g. counts are summed."""
+    funcs = {col: func for col in columns} if isinstance(func, str) else dict(func)
+    for col, f in funcs.items():
+        if f not in _COMBINE:
+            raise ValueError(f"Cannot roll up '{f}' from an aggregated pivot; use one of {', '.join(_COMBINE)}.")
+    if isinstance(func, str):
+        return _COMBINE[func]
+    return {col: _COMBINE[funcs[col]] for col in columns}
+
+
+def _total_label(prefix: tuple, name: str, nlevels: int) -> Union[str, tuple]:
+    """Label a total row: the group's prefix, then `name`, then blanks for the remaining levels."""
+    label = prefix + (name,) + ('',) * (nlevels - len(prefix) - 1)
+    return label if nlevels > 1 else name
+
+
+def add_subtotals(
+    df: pd.DataFrame,
+    func: Union[str, Dict] = 'sum',
+    levels: Optional[List[Union[int, str]]] = None,
+    name: str = 'Total',
+    grand_total: bool = True
+) -> pd.DataFrame:
+    """
+    Add subtotal rows for index levels of an aggregated pivot, and optionally a grand total.
+
+    The subtotals are rolled up from the pivot itself with one ``groupby(level=...)`` per level,
+    so the source data is not aggregated again. A subtotal row is labelled with its group's
+    keys followed by `name`, e.g. ``('North', 'Total', '')``, and placed after the group. Groups
+    are kept together in the order they first appear. All rows are added with a single concat
+    and put in place with a single take.
+
+    Args:
+        df (pd.DataFrame): The aggregated pivot, e.g. the result of `pivot_to`.
+        func (Union[str, Dict]): How the pivot was aggregated: 'sum', 'count', 'min' or 'max', or a
+                                 dict mapping each column to one of them. Defaults to 'sum'.
+        levels (Optional[List[Union[int, str]]]): The index levels to subtotal, by position or name.
+                                                  Defaults to every level but the last.
+        name (str): The label of the total rows. Defaults to 'Total'.
+        grand_total (bool): Whether to add a grand total row at the end. Defaults to True.
+
+    Returns:
+        pd.DataFrame: A new DataFrame with the subtotal rows.
+
+    Raises:
+        ValueError: If a function cannot be rolled up (e.g. 'mean') or a level is the last level.
+
+    Example:
+        add_subtotals(pivot_to(ledger, ['amount'], ['annum']), levels=['company'])
+    """
+    nlevels = df.index.nlevels
+    rollup = _rollup_funcs(df.columns, func)
+    if levels is None:
+        levels = list(range(nlevels - 1))
+    levels = sorted({df.index._get_level_number(x) for x in levels})
+    if len(levels) > 0 and levels[-1] >= nlevels - 1:
+        raise ValueError("The last index level cannot be subtotalled; its subtotals are the rows themselves.")
+
+    n = len(df)
+    sentinel = n + 1
+    # One sort key per subtotalled level: the group's rank in order of first appearance
+    detail_keys = [df.groupby(level = list(range(i + 1)), sort = False).ngroup().to_numpy() for i in levels]
+    pieces = [df]
+    keys = [detail_keys + [np.arange(n)]]
+
+    for depth, i in enumerate(levels):
+        totals = df.groupby(level = list(range(i + 1)), sort = False).agg(rollup)
+        prefixes = totals.index if isinstance(totals.index, pd.MultiIndex) else [(x,) for x in totals.index]
+        totals.index = pd.Index([_total_label(tuple(x), name, nlevels) for x in prefixes], tupleize_cols = True)
+        first = np.unique(detail_keys[depth], return_index = True)[1]
+        group_keys = [detail_keys[d][first] if d <= depth else np.full(len(totals), sentinel) for d in range(len(levels))]
+        pieces.append(totals)
+        keys.append(group_keys + [np.full(len(totals), sentinel)])
+
+    if grand_total:
+        total = df.groupby(np.zeros(n, dtype = np.intp)).agg(rollup)
+        total.index = pd.Index([_total_label((), name, nlevels)], tupleize_cols = True)
+        pieces.append(total)
+        keys.append([np.full(1, sentinel)] * (len(levels) + 1))
+
+    result = pd.concat(pieces)
+    result.index.names = df.index.names
+    order = np.lexsort([np.concatenate(k) for k in zip(*keys)][::-1])
+    return result.take(order)
+
+
+def _margin_columns(df: pd.DataFrame, func: Union[str, List[str]], margins_name: str) -> pd.DataFrame:
+    """Add a margin column after each value block of an aggregated pivot, as `pivot_table` does."""
+    head = 1 if isinstance(func, str) else 2
+    blocks, block_keys = pd.factorize(df.columns.droplevel(list(range(head, df.columns.nlevels))))
+
+    margins = {}
+    for b, key in enumerate(block_keys):
+        key = key if isinstance(key, tuple) else (key,)
+        f = _COMBINE[func if isinstance(func, str) else key[0]]
+        block = df.iloc[:, np.flatnonzero(blocks == b)].to_numpy()
+        margins[_total_label(key, margins_name, df.columns.nlevels)] = getattr(np, f)(block, axis = 1)
+    result = pd.concat([df, pd.DataFrame(margins, index = df.index)], axis = 1)
+    result.columns.names = df.columns.names
+
+    # Each margin goes after the last column of its block
+    order = np.lexsort([np.concatenate([np.zeros(df.shape[1]), np.ones(len(block_keys))]),
+                        np.concatenate([blocks, np.arange(len(block_keys))])])
+    return result.take(order, axis = 1)
+
+
+def _aggregate_partials(df: pd.DataFrame, keys: List[str], values: List[str], partials: List[str]) -> pd.DataFrame:
+    """Group a DataFrame by every key and compute the partial aggregates of each value."""
+    return df.groupby(keys, sort = False, observed = True)[values].agg(partials)
+
+
+def _merge_partials(cubes: List[pd.DataFrame], keys: List[str]) -> pd.DataFrame:
+    """Combine cubes of partial aggregates that may share key combinations."""
+    if len(cubes) == 1:
+        return cubes[0]
+    combined = pd.concat(cubes)
+    return combined.groupby(level = keys, sort = False, observed = True).agg(
+        {col: _COMBINE[col[1]] for col in combined.columns}
+    )
+
+
+def _roll_up(cube: pd.DataFrame, keys: List[str], values: List[str], partial: str) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Aggregate one partial of the cube to `keys` and return one long row per key combination.
+
+    The keys are returned as categoricals built from the codes the grouping already computed,
+    so laying the result out does not hash the key values again.
+
+    Returns:
+        Tuple[pd.DataFrame, List[str]]: The long DataFrame and the keys that were made categorical.
+    """
+    columns = [(v, partial) for v in values]
+    if list(cube.index.names) == keys:
+        rolled = cube[columns]
+    else:
+        rolled = cube[columns].groupby(level = keys, sort = False, observed = True).agg(_COMBINE[partial])
+
+    index = rolled.index if isinstance(rolled.index, pd.MultiIndex) else pd.MultiIndex.from_arrays([rolled.index])
+    long = {}
+    converted = []
+    for name, level, codes in zip(keys, index.levels, index.codes):
+        if isinstance(level, pd.CategoricalIndex):
+            long[name] = level.take(codes)
+        else:
+            long[name] = pd.Categorical.from_codes(codes, categories = level)
+            converted.append(name)
+    for v, col in zip(values, columns):
+        long[v] = rolled[col].to_numpy()
+    return pd.DataFrame(long), converted
+
+
+def _pivot_from_cube(cube: pd.DataFrame, keys: List[str], spec: dict) -> pd.DataFrame:
+    """Lay out one pivot spec from a cube of partial aggregates with `pivot_to`."""
+    values = list(spec['values'])
+    columns = list(spec['columns'])
+    index = list(spec.get('index', [x for x in keys if x not in columns]))
+    funcs = _spec_funcs(spec)
+    pivot_kwargs = {'margins': spec.get('margins', False), 'margins_name': spec.get('margins_name', 'Total')}
+
+    for key, allowed in spec.get('where', {}).items():
+        cube = cube[cube.index.get_level_values(key).isin(allowed)]
+
+    def layout(partial, func):
+        long, converted = _roll_up(cube, index + columns, values, partial)
+        result = pivot_to(long, values, columns, func = func, fast = True, **pivot_kwargs)
+        result.index = _restore_levels(result.index, converted)
+        result.columns = _restore_levels(result.columns, converted)
+        return result
+
+    pieces = {}
+    for f in funcs:
+        if f == 'mean':
+            # Sums and counts (and their margins) add up, so the mean is their ratio
+            sums, counts = layout('sum', 'sum'), layout('count', 'sum')
+            pieces[f] = (sums / counts.where(counts > 0)).fillna(0)
+        else:
+            pieces[f] = layout(f, 'sum' if f == 'count' else f)
+
+    result = pieces[funcs[0]] if isinstance(spec.get('func', 'sum'), str) else pd.concat(pieces, axis = 1)
+    if spec.get('title') is not None:
+        result.columns = _prepend_level(result.columns, spec['title'])
+    return result
+
+
+def _check_spec_keys(spec_list: List[dict], keys: List[str]) -> None:
+    """Raise if a spec refers to a column that is not a key."""
+    for spec in spec_list:
+        used = list(spec['columns']) + list(spec.get('index', [])) + list(spec.get('where', {}))
+        unknown = [x for x in used if x not in keys]
+        if len(unknown) > 0:
+            raise ValueError(f"Columns {unknown} are not keys of the DataFrame.")
+
+
+def pivot_many(
+    df: pd.DataFrame,
+    specs: Union[List[dict], Dict[str, dict]]
+) -> Union[List[pd.DataFrame], Dict[str, pd.DataFrame]]:
+    """
+    Build many pivot tables from one grouped pass over a DataFrame.
+
+    Every column that is not a value of some spec is a key. The keys are grouped once at the
+    finest grain and the partial aggregates every spec needs (sums, counts, minimums and
+    maximums) are computed in that single pass. Each pivot is then rolled up from this much
+    smaller cube and laid out with `pivot_to`, so a report of many pivots costs about one
+    groupby over the source.
+
+    Each spec is a dictionary with these keys:
+
+    - ``values`` (List[str]): The columns to aggregate.
+    - ``columns`` (List[str]): The keys to use as columns.
+    - ``index`` (List[str], optional): The keys to use as the index. Defaults to every other key,
+      as in `pivot_to`.
+    - ``where`` (Dict[str, List], optional): Only keep rows whose key is one of the given values,
+      e.g. ``{'duration': ['MTD', 'YTD']}``.
+    - ``func`` (str or List[str], optional): 'sum', 'count', 'min', 'max' or 'mean'. Defaults to 'sum'.
+    - ``title``, ``margins`` and ``margins_name`` (optional): Passed to `pivot_to`.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        specs (Union[List[dict], Dict[str, dict]]): The pivots to build, as a list or as a
+                                                    dictionary of names to specs.
+
+    Returns:
+        Union[List[pd.DataFrame], Dict[str, pd.DataFrame]]: The pivot tables, in the same shape as `specs`.
+
+    Raises:
+        ValueError: If a spec uses an unknown column or an aggregation that cannot be rolled up.
+
+    Example:
+        pivot_many(ledger, {
+            'standard': {'values': ['amount'], 'columns': ['duration', 'annum'], 'index': ['account']},
+            'ytd': {'values': ['amount'], 'columns': ['annum'], 'index': ['account'], 'where': {'duration': ['YTD']}}
+        })
+    """
+    named = isinstance(specs, dict)
+    spec_list = list(specs.values()) if named else list(specs)
+
+    values = list(dict.fromkeys(v for spec in spec_list for v in spec['values']))
+    keys = [x for x in df.columns if x not in values]
+    _check_spec_keys(spec_list, keys)
+
+    # The one pass over the source: every partial aggregate at the finest grain
+    partials = sorted({p for spec in spec_list for f in _spec_funcs(spec) for p in _PARTIALS[f]})
+    cube = _aggregate_partials(df, keys, values, partials)
+
+    results = [_pivot_from_cube(cube, keys, spec) for spec in spec_list]
+    return dict(zip(specs.keys(), results)) if named else results
+
+
+def pivot_chunks(
+    chunks: Iterable[pd.DataFrame],
+    values: List[str],
+    columns: List[str],
+    title: Optional[str] = None,
+    func: Union[str, List[str]] = 'sum',
+    margins: bool = False,
+    margins_name: str = 'Total',
+    merge_every: int = 8
+) -> pd.DataFrame:
+    """
+    Pivot a DataFrame that arrives in chunks, without holding it in memory.
+
+    Each chunk is reduced to partial aggregates keyed by every index and column key, and the
+    partials are merged as they arrive, so memory is bounded by the number of distinct key
+    combinations rather than the number of rows. The result is the same as calling `pivot_to`
+    on the concatenated chunks, including the order of first appearance.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks, for example ``pd.read_csv(path, chunksize=1_000_000)``
+                                         or the row groups of a Parquet file. Every chunk must have
+                                         the same columns.
+        values (List[str]): The column names to use as values in the pivot table.
+        columns (List[str]): The column names to use as columns in the pivot table.
+        title (Optional[str]): An optional title to add as the top level of the result's columns.
+        func (Union[str, List[str]]): 'sum', 'count', 'min', 'max' or 'mean', or a list of them.
+                                      Defaults to 'sum'.
+        margins (bool): Whether to add margins (subtotals) to the pivot table. Defaults to False.
+        margins_name (str): The name to use for the margins row/column. Defaults to 'Total'.
+        merge_every (int): How many chunk partials to collect before merging them. Defaults to 8.
+
+    Returns:
+        pd.DataFrame: The pivoted DataFrame.
+
+    Raises:
+        ValueError: If there are no chunks, or `func` cannot be computed from partial aggregates.
+
+    Example:
+        pivot_chunks(pd.read_csv('ledger.csv', chunksize=1_000_000), ['amount'], ['duration', 'annum'])
+    """
+    validate_value_is_an_int(merge_every)
+    if merge_every < 1:
+        raise ValueError("merge_every must be at least 1.")
+    spec = {
+        'values': values, 'columns': columns, 'title': title, 'func': func,
+        'margins': margins, 'margins_name': margins_name
+    }
+    partials = sorted({p for f in _spec_funcs(spec) for p in _PARTIALS[f]})
+
+    keys = None
+    cube = None
+    pending = []
+    for chunk in chunks:
+        if keys is None:
+            keys = [x for x in chunk.columns if x not in values]
+            _check_spec_keys([spec], keys)
+        pending.append(_aggregate_partials(chunk, keys, values, partials))
+        if len(pending) >= merge_every:
+            cube = _merge_partials(([cube] if cube is not None else []) + pending, keys)
+            pending = []
+
+    if keys is None:
+        raise ValueError("There are no chunks to pivot.")
+    cube = _merge_partials(([cube] if cube is not None else []) + pending, keys)
+    return _pivot_from_cube(cube, keys, spec)
+
+
+def _partition_partials(part: pd.DataFrame, keys: List[str], values: List[str], partials: List[str]) -> pd.DataFrame:
+    """Aggregate one partition in a worker, keeping the first source row of each key combination."""
+    cube = _aggregate_partials(part, keys, values, partials)
+    cube[('__row', 'min')] = part.groupby(keys, sort = False, observed = True)['__row'].min().to_numpy()
+    return cube
+
+
+def pivot_parallel(
+    df: pd.DataFrame,
+    values: List[str],
+    columns: List[str],
+    title: Optional[str] = None,
+    func: Union[str, List[str]] = 'sum',
+    margins: bool = False,
+    margins_name: str = 'Total',
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Pivot a DataFrame using several processes.
+
+    The rows are hash-partitioned by their index keys, so every row of the result comes from
+    exactly one partition. Each partition is reduced to partial aggregates in a
+    `ProcessPoolExecutor` worker, and the partials are put back in order of first appearance
+    and laid out with `pivot_to`. Margins are computed from the partial totals, so the result
+    is the same as `pivot_to` on the whole DataFrame.
+
+    Sending the partitions to the workers copies them, so this pays off when the grouping
+    is expensive compared with the data, e.g. many rows and several string keys. See
+    ``benchmarks/bench_pivot_parallel.py``.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        values (List[str]): The column names to use as values in the pivot table.
+        columns (List[str]): The column names to use as columns in the pivot table.
+        title (Optional[str]): An optional title to add as the top level of the result's columns.
+        func (Union[str, List[str]]): 'sum', 'count', 'min', 'max' or 'mean', or a list of them.
+                                      Defaults to 'sum'.
+        margins (bool): Whether to add margins (subtotals) to the pivot table. Defaults to False.
+        margins_name (str): The name to use for the margins row/column. Defaults to 'Total'.
+        max_workers (Optional[int]): The number of worker processes and partitions. Defaults to
+                                     the number of CPUs. With 1, everything runs in this process.
+
+    Returns:
+        pd.DataFrame: The pivoted DataFrame.
+
+    Raises:
+        ValueError: If `func` cannot be computed from partial aggregates or `max_workers` is not positive.
+
+    Example:
+        pivot_parallel(ledger, ['amount'], ['duration', 'annum'], max_workers=8)
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    validate_value_is_an_int(max_workers)
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1.")
+
+    spec = {
+        'values': values, 'columns': columns, 'title': title, 'func': func,
+        'margins': margins, 'margins_name': margins_name
+    }
+    partials = sorted({p for f in _spec_funcs(spec) for p in _PARTIALS[f]})
+    keys = [x for x in df.columns if x not in values]
+    _check_spec_keys([spec], keys)
+    index = [x for x in keys if x not in columns]
+
+    if max_workers == 1 or len(df) < 2 * max_workers:
+        return _pivot_from_cube(_aggregate_partials(df, keys, values, partials), keys, spec)
+
+    # String keys travel to the workers as categorical codes, which are cheap to pickle,
+    # hash and group
+    rows = df[keys + values].assign(__row = np.arange(len(df)))
+    converted = [x for x in keys if rows[x].dtype == object]
+    rows = rows.astype({x: 'category' for x in converted})
+
+    # Hash-partition the rows by their index keys with a single take
+    buckets = (pd.util.hash_pandas_object(rows[index], index = False).to_numpy() % max_workers).astype(np.intp)
+    order = np.argsort(buckets, kind = 'stable')
+    rows = rows.take(order)
+    bounds = np.cumsum(np.bincount(buckets, minlength = max_workers))[:-1]
+    parts = [rows.iloc[start:stop] for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(rows)])]
+    parts = [x for x in parts if len(x) > 0]
+
+    with ProcessPoolExecutor(max_workers = max_workers) as executor:
+        cubes = list(executor.map(
+            _partition_partials, parts, repeat(keys), repeat(values), repeat(partials)
+        ))
+
+    # Index keys never span partitions, so the cubes only need to be put back in order
+    cube = pd.concat(cubes)
+    cube = cube.iloc[np.argsort(cube[('__row', 'min')].to_numpy(), kind = 'stable')]
+    cube = cube.drop(columns = [('__row', 'min')])
+
+    result = _pivot_from_cube(cube, keys, spec)
+    result.index = _restore_levels(result.index, converted)
+    result.columns = _restore_levels(result.columns, converted)
+    return result
+
+
+class IncrementalPivot:
+    """
+    A pivot table that keeps its aggregated state and is refreshed with new rows.
+
+    The state is one dense array per partial aggregate (sum, count, minimum or maximum) with a
+    row per index key and a column per column key, plus running totals per row, per column
+    and overall for the margins. Keys are mapped to positions with dictionaries and new keys
+    are appended. An update groups only the new rows and folds them into the affected cells
+    and totals, so it costs time proportional to the delta rather than to the history.
+
+    The laid-out table is cached. When an update only touches existing keys, the affected
+    cells and margins are written into it directly; new keys trigger a layout from the
+    state, which costs time proportional to the size of the table. The result is the same
+    as calling `pivot_to` on all rows received so far.
+
+    Example:
+        pivot = IncrementalPivot(['amount'], ['duration', 'annum'], margins=True)
+        pivot.update(history)
+        report = pivot.update(new_postings)
+    """
+
+    def __init__(
+        self,
+        values: List[str],
+        columns: List[str],
+        index: Optional[List[str]] = None,
+        title: Optional[str] = None,
+        func: Union[str, List[str]] = 'sum',
+        margins: bool = False,
+        margins_name: str = 'Total'
+    ):
+        """
+        Args:
+            values (List[str]): The column names to use as values in the pivot table.
+            columns (List[str]): The column names to use as columns in the pivot table.
+            index (Optional[List[str]]): The column names to use as the index. If None, every other
+                                         column of the first update is used, as in `pivot_to`.
+            title (Optional[str]): An optional title to add as the top level of the result's columns.
+            func (Union[str, List[str]]): 'sum', 'count', 'min', 'max' or 'mean', or a list of them.
+                                          Defaults to 'sum'.
+            margins (bool): Whether to add margins (subtotals) to the pivot table. Defaults to False.
+            margins_name (str): The name to use for the margins row/column. Defaults to 'Total'.
+
+        Raises:
+            ValueError: If `func` cannot be updated incrementally.
+        """
+        self.values = list(values)
+        self.columns = list(columns)
+        self.index = list(index) if index is not None else None
+        self._spec = {
+            'values': self.values, 'columns': self.columns, 'title': title, 'func': func,
+            'margins': margins, 'margins_name': margins_name
+        }
+        self._funcs = _spec_funcs(self._spec)
+        self._partials = sorted({p for f in self._funcs for p in _PARTIALS[f]} | {'count'})
+
+        self._row_ids = {}
+        self._col_ids = {}
+        self._cells = {}
+        self._row_totals = {}
+        self._col_totals = {}
+        self._grand_totals = {}
+        self._first_seen = np.full((0, 0), -1, dtype = np.int64)
+        self._seen = 0
+        self._frame = None
+
+    def _initial(self, partial: str, dtype: np.dtype):
+        """Return the value a partial aggregate starts from."""
+        if partial == 'min':
+            return np.inf if dtype.kind == 'f' else np.iinfo(dtype).max
+        if partial == 'max':
+            return -np.inf if dtype.kind == 'f' else np.iinfo(dtype).min
+        return 0
+
+    def _start(self, delta: pd.DataFrame) -> None:
+        """Fix the keys and the state dtypes from the first update."""
+        if self.index is None:
+            self.index = [x for x in delta.columns if x not in self.values and x not in self.columns]
+        _check_spec_keys([{**self._spec, 'index': self.index}], [x for x in delta.columns if x not in self.values])
+
+        self._dtypes = {}
+        for partial in self._partials:
+            for v in self.values:
+                dtype = delta[v].dtype
+                if partial == 'count':
+                    dtype = np.dtype(np.int64)
+                elif dtype.kind in 'iub':
+                    dtype = np.dtype(np.int64)
+                else:
+                    dtype = np.dtype(np.float64)
+                self._dtypes[(v, partial)] = dtype
+                self._cells[(v, partial)] = np.full((0, 0), self._initial(partial, dtype), dtype = dtype)
+                self._row_totals[(v, partial)] = np.full(0, self._initial(partial, dtype), dtype = dtype)
+                self._col_totals[(v, partial)] = np.full(0, self._initial(partial, dtype), dtype = dtype)
+                self._grand_totals[(v, partial)] = np.asarray(self._initial(partial, dtype), dtype = dtype)
+
+    def _grow(self, rows: int, cols: int) -> None:
+        """Make room for at least `rows` index keys and `cols` column keys, doubling as needed."""
+        old_rows, old_cols = self._first_seen.shape
+        if rows <= old_rows and cols <= old_cols:
+            return
+        new_rows = max(rows, 2 * old_rows) if rows > old_rows else old_rows
+        new_cols = max(cols, 2 * old_cols) if cols > old_cols else old_cols
+
+        def grow(array, shape, fill):
+            grown = np.full(shape, fill, dtype = array.dtype)
+            grown[tuple(slice(0, n) for n in array.shape)] = array
+            return grown
+
+        self._first_seen = grow(self._first_seen, (new_rows, new_cols), -1)
+        for key, dtype in self._dtypes.items():
+            fill = self._initial(key[1], dtype)
+            self._cells[key] = grow(self._cells[key], (new_rows, new_cols), fill)
+            self._row_totals[key] = grow(self._row_totals[key], (new_rows,), fill)
+            self._col_totals[key] = grow(self._col_totals[key], (new_cols,), fill)
+
+    @staticmethod
+    def _fold(partial: str, array: np.ndarray, positions, updates: np.ndarray) -> None:
+        """Combine new partial aggregates into the state at the given positions."""
+        if partial in ('sum', 'count'):
+            np.add.at(array, positions, updates)
+        elif partial == 'min':
+            # fmin/fmax skip the NaN a delta gives cells whose values are all missing
+            np.fmin.at(array, positions, updates)
+        else:
+            np.fmax.at(array, positions, updates)
+
+    def _value(self, func: str, v: str, cells: Dict[str, np.ndarray]) -> np.ndarray:
+        """Turn partial aggregates into the values of one function, with 0 where nothing was seen."""
+        count = cells['count']
+        if func == 'count':
+            return count
+        if func == 'mean':
+            return np.where(count > 0, cells['sum'] / np.where(count > 0, count, 1), 0)
+        return np.where(count > 0, cells[func], 0)
+
+    def update(self, delta: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fold new rows into the pivot and return the updated table.
+
+        Args:
+            delta (pd.DataFrame): The new rows, with the same columns as earlier updates.
+
+        Returns:
+            pd.DataFrame: The updated pivot table (a copy that later updates do not change).
+        """
+        if not hasattr(self, '_dtypes'):
+            self._start(delta)
+
+        keys = self.index + self.columns
+        grouped = delta.groupby(keys, sort = False, observed = True)[self.values].agg(self._partials)
+        if len(grouped) > 0:
+            self._apply(grouped)
+        return self.pivot()
+
+    def _apply(self, grouped: pd.DataFrame) -> None:
+        """Fold a delta that is already grouped by every key into the state."""
+        levels = [grouped.index.get_level_values(i) for i in range(grouped.index.nlevels)]
+        n_index = len(self.index)
+        row_keys = zip(*levels[:n_index])
+        col_keys = zip(*levels[n_index:])
+
+        old_rows, old_cols = len(self._row_ids), len(self._col_ids)
+        rows = np.fromiter((self._row_ids.setdefault(k, len(self._row_ids)) for k in row_keys), dtype = np.intp)
+        cols = np.fromiter((self._col_ids.setdefault(k, len(self._col_ids)) for k in col_keys), dtype = np.intp)
+        new_keys = len(self._row_ids) > old_rows or len(self._col_ids) > old_cols
+        self._grow(len(self._row_ids), len(self._col_ids))
+
+        # Remember when each cell was first seen, which decides the layout order
+        new_cells = self._first_seen[rows, cols] < 0
+        self._first_seen[rows[new_cells], cols[new_cells]] = self._seen + np.arange(new_cells.sum())
+        self._seen += int(new_cells.sum())
+
+        for key in self._dtypes:
+            updates = grouped[key].to_numpy().astype(self._dtypes[key], copy = False)
+            self._fold(key[1], self._cells[key], (rows, cols), updates)
+            self._fold(key[1], self._row_totals[key], rows, updates)
+            self._fold(key[1], self._col_totals[key], cols, updates)
+            grand = self._grand_totals[key].reshape(1)
+            self._fold(key[1], grand, np.zeros(len(updates), dtype = np.intp), updates)
+            self._grand_totals[key] = grand.reshape(())
+
+        if self._frame is not None:
+            if new_keys:
+                self._frame = None
+            else:
+                self._write(np.unique(rows), np.unique(cols), rows, cols)
+
+    def _state(self, func: str, v: str, source: Dict[tuple, np.ndarray], where) -> np.ndarray:
+        """Read the final values of one function and value from a state array."""
+        return self._value(func, v, {p: source[(v, p)][where] for p in _PARTIALS[func] + ['count']})
+
+    def _write(self, touched_rows: np.ndarray, touched_cols: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> None:
+        """Write the cells, totals and margins an update touched into the cached table."""
+        frame = self._frame
+        for func in self._funcs:
+            for v in self.values:
+                positions = self._col_positions[(func, v)]
+                for c in np.unique(cols):
+                    cell_rows = rows[cols == c]
+                    self._set(frame, self._row_positions[cell_rows], positions[c],
+                              self._state(func, v, self._cells, (cell_rows, c)))
+                if self._spec['margins']:
+                    margin_col = self._margin_col_positions[(func, v)]
+                    self._set(frame, self._row_positions[touched_rows], margin_col,
+                              self._state(func, v, self._row_totals, touched_rows))
+                    self._set(frame, np.array([self._margin_row_position]), positions[touched_cols],
+                              self._state(func, v, self._col_totals, touched_cols))
+                    self._set(frame, np.array([self._margin_row_position]), margin_col,
+                              self._state(func, v, self._grand_totals, ()))
+
+    @staticmethod
+    def _set(frame: pd.DataFrame, row_positions: np.ndarray, col_positions, values: np.ndarray) -> None:
+        """Assign values in place, keeping the dtypes of the laid-out columns."""
+        if np.ndim(col_positions) == 0:
+            frame.iloc[row_positions, col_positions] = np.asarray(values).astype(frame.dtypes.iloc[col_positions])
+        else:
+            for col, value in zip(col_positions, np.asarray(values)):
+                frame.iloc[row_positions, col] = np.asarray([value]).astype(frame.dtypes.iloc[col])
+
+    def _layout(self) -> pd.DataFrame:
+        """Lay out the table from the state and record where each key ended up."""
+        n_rows, n_cols = len(self._row_ids), len(self._col_ids)
+        seen = self._first_seen[:n_rows, :n_cols]
+        rows, cols = np.nonzero(seen >= 0)
+        order = np.argsort(seen[rows, cols], kind = 'stable')
+        rows, cols = rows[order], cols[order]
+
+        row_frame = pd.DataFrame(list(self._row_ids), columns = self.index).take(rows)
+        col_frame = pd.DataFrame(list(self._col_ids), columns = self.columns).take(cols)
+        keys = pd.concat([row_frame.reset_index(drop = True), col_frame.reset_index(drop = True)], axis = 1)
+        cube = pd.DataFrame(
+            {key: self._cells[key][rows, cols] for key in self._dtypes},
+            index = pd.MultiIndex.from_frame(keys)
+        )
+        frame = _pivot_from_cube(cube, self.index + self.columns, {**self._spec, 'index': self.index})
+
+        # Positions of every key in the table, for in-place updates
+        single_index = len(self.index) == 1
+        row_labels = [k[0] if single_index else k for k in self._row_ids]
+        self._row_positions = frame.index.get_indexer(row_labels)
+        prefix = [self._spec['title']] if self._spec['title'] is not None else []
+        multi_func = not isinstance(self._spec['func'], str)
+        self._col_positions = {}
+        self._margin_col_positions = {}
+        for func in self._funcs:
+            head = prefix + ([func] if multi_func else [])
+            for v in self.values:
+                labels = [tuple(head + [v] + list(k)) for k in self._col_ids]
+                self._col_positions[(func, v)] = frame.columns.get_indexer(labels)
+                if self._spec['margins']:
+                    margin = tuple(head + [v, self._spec['margins_name']] + [''] * (len(self.columns) - 1))
+                    self._margin_col_positions[(func, v)] = frame.columns.get_loc(margin)
+        if self._spec['margins']:
+            margin_row = self._spec['margins_name'] if single_index else \
+                tuple([self._spec['margins_name']] + [''] * (len(self.index) - 1))
+            self._margin_row_position = frame.index.get_loc(margin_row)
+        return frame
+
+    def pivot(self) -> pd.DataFrame:
+        """
+        Return the current pivot table.
+
+        Returns:
+            pd.DataFrame: The pivot table of every row received so far (a copy).
+
+        Raises:
+            ValueError: If no rows have been received yet.
+        """
+        if self._seen == 0:
+            raise ValueError("The pivot has not received any rows yet.")
+        if self._frame is None:
+            self._frame = self._layout()
+        return self._frame.copy()
@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Union
+from .backends import group_aggregate
+from .constants import duration_order
+
+# Length in months of the calendar periods behind each month-based duration
+_DURATION_MONTHS = {'MTD': 1, 'QTD': 3, 'YTD': 12}
+
+_WEEKDAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+_MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+
+class _Ledger:
+    """
+    A ledger summed by key and day, sorted once, with a running total per key.
+
+    The running total of a key up to any day is found with a binary search, so the amount
+    between two days is the difference of two lookups. Each key's running total starts from
+    zero, so a key with small amounts keeps its precision next to keys with large ones. Every duration is such a difference:
+    to-date durations start at the beginning of the current week, month, quarter or year
+    and LTM starts a fixed number of months back.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col: str, value_col: str, keys: List[str], backend: Optional[str] = None):
+        days = pd.to_datetime(df[date_col]).to_numpy().astype('datetime64[D]')
+        data = pd.DataFrame({k: df[k] for k in keys})
+        data['__day'] = days
+        data['__value'] = df[value_col].to_numpy()
+
+        # the only sort: sum the ledger by key and day
+        if backend in (None, 'pandas'):
+            summed = data.groupby(keys + ['__day'], sort = True, dropna = False)['__value'].sum()
+        else:
+            summed = group_aggregate(data, keys + ['__day'], [('__value', 'sum')], backend = backend, dropna = False)
+            summed = summed[('__value', 'sum')].sort_index()
+
+        if len(keys) > 0:
+            key_index = summed.index.droplevel(-1)
+            # missing keys are kept as a group of their own, as in the groupby above
+            self.key_ids, key_labels = pd.factorize(key_index, use_na_sentinel = False)
+            self.keys = pd.DataFrame(list(key_labels) if len(keys) > 1 else {keys[0]: key_labels})
+            self.keys.columns = keys
+        else:
+            self.key_ids = np.zeros(len(summed), dtype = np.intp)
+            self.keys = pd.DataFrame(index = range(1))
+
+        self.days = summed.index.get_level_values(-1).to_numpy().astype('datetime64[D]').astype(np.int64)
+        self.totals = summed.groupby(self.key_ids, sort = False).cumsum().to_numpy()
+        self.starts = np.searchsorted(self.key_ids, np.arange(len(self.keys)))
+
+        # keys and days combined into one sorted search key
+        self.origin = self.days.min()
+        self.span = self.days.max() - self.origin + 1
+        self.search = self.key_ids * self.span + (self.days - self.origin)
+        self.first_day = np.full(len(self.keys), np.iinfo(np.int64).max)
+        np.minimum.at(self.first_day, self.key_ids, self.days)
+
+    def running_total(self, key_ids: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Return the running total of each key up to the given day.
+
+        Days are clipped to the range of the ledger, so that a day before the first entry of
+        a key has a total of zero. Two totals of the same key differ by the amount between
+        the two days.
+        """
+        days = np.clip(days, self.origin - 1, self.origin + self.span - 1)
+        positions = np.searchsorted(self.search, key_ids * self.span + (days - self.origin), side = 'right')
+        return np.where(positions > self.starts[key_ids], self.totals[np.maximum(positions - 1, 0)], 0)
+
+
+def _period_start(days: np.ndarray, duration: str, week_end: str, year_end: str) -> np.ndarray:
+    """Return the first day of the week, month, quarter or year each day falls in."""
+    if duration == 'WTD':
+        week_start = (_WEEKDAYS.index(week_end) + 1) % 7
+        # 1970-01-01 was a Thursday
+        return days - (days + 3 - week_start) % 7
+
+    length = _DURATION_MONTHS[duration]
+    fiscal_start = (_MONTHS.index(year_end) + 1) % 12
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    start = months - (months - fiscal_start) % length
+    return start.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+
+
+def _months_back(days: np.ndarray, months: int) -> np.ndarray:
+    """Move each day back a number of months, clipping to the end of shorter months."""
+    dates = pd.DatetimeIndex(days.astype('datetime64[D]')) - pd.DateOffset(months = months)
+    return dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def _evaluate(
+    ledger: _Ledger,
+    key_ids: np.ndarray,
+    days: np.ndarray,
+    durations: List[str],
+    week_end: str,
+    year_end: str,
+    ltm_months: int
+) -> List[np.ndarray]:
+    """Compute each duration for pairs of keys and as-of days."""
+    to_date = ledger.running_total(key_ids, days)
+    results = []
+    for duration in durations:
+        if duration == 'LTM':
+            start = _months_back(days, ltm_months)
+            results.append(to_date - ledger.running_total(key_ids, start))
+        else:
+            start = _period_start(days, duration, week_end, year_end)
+            results.append(to_date - ledger.running_total(key_ids, start - 1))
+    return results
+
+
+def _validate_durations(durations: Optional[List[str]], week_end: str, year_end: str) -> List[str]:
+    """Check the duration names and calendar settings, returning the durations to compute."""
+    if durations is None:
+        durations = duration_order
+    unknown = [x for x in durations if x not in duration_order]
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown durations: {', '.join(unknown)}. Use any of {', '.join(duration_order)}.")
+    if week_end not in _WEEKDAYS:
+        raise ValueError(f"week_end must be one of {', '.join(_WEEKDAYS)}.")
+    if year_end not in _MONTHS:
+        raise ValueError(f"year_end must be one of {', '.join(_MONTHS)}.")
+    return list(durations)
+
+
+def _prepare(
+    df: pd.DataFrame,
+    date_col: str,
+    value_col: str,
+    keys: Optional[List[str]],
+    backend: Optional[str] = None
+) -> _Ledger:
+    """Check the input columns and build the ledger."""
+    if df.empty:
+        raise ValueError("The DataFrame is empty.")
+    for col in [date_col, value_col] + list(keys or []):
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' does not exist in the DataFrame.")
+    if keys is None:
+        keys = [x for x in df.columns if x not in (date_col, value_col)]
+    return _Ledger(df, date_col, value_col, list(keys), backend)
+
+
+def _long_format(
+    ledger: _Ledger,
+    key_ids: np.ndarray,
+    labels: np.ndarray,
+    label_col: str,
+    durations: List[str],
+    results: List[np.ndarray],
+    value_col: str
+) -> pd.DataFrame:
+    """Stack the results of each duration into one long DataFrame."""
+    n = len(key_ids)
+    out = ledger.keys.iloc[np.tile(key_ids, len(durations))].reset_index(drop = True)
+    out[label_col] = np.tile(labels, len(durations))
+    out['duration'] = np.repeat(durations, n)
+    out[value_col] = np.concatenate(results) if len(results) > 0 else []
+    return out
+
+
+def compute_durations(
+    df: pd.DataFrame,
+    date_col: str = 'date',
+    value_col: str = 'amount',
+    keys: Optional[List[str]] = None,
+    durations: Optional[List[str]] = None,
+    freq: Optional[str] = None,
+    week_end: str = 'SUN',
+    year_end: str = 'DEC',
+    ltm_months: int = 12,
+    backend: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Compute WTD, MTD, QTD, YTD and LTM amounts from a daily or period-level ledger in one pass.
+
+    The ledger is summed by key and day and sorted once. A running total per key is then
+    read at the start of each period with a binary search, so every duration is the
+    difference of two running totals rather than a separate groupby.
+
+    Args:
+        df (pd.DataFrame): The ledger, with one row per key, date and amount.
+        date_col (str): The column holding the dates. Defaults to 'date'.
+        value_col (str): The column holding the amounts. Defaults to 'amount'.
+        keys (Optional[List[str]]): The columns that identify a series. If None, every column
+                                    except the date and amount columns is used.
+        durations (Optional[List[str]]): The durations to compute, from `duration_order`.
+                                         Defaults to all of them.
+        freq (Optional[str]): Report at the end of every period of this frequency (for example
+                              'M' or 'Q') from the first to the last date, carrying the running
+                              totals over periods without activity. If None, report on every
+                              date in the ledger.
+        week_end (str): The last day of the week for WTD, e.g. 'SUN' or 'SAT'. Defaults to 'SUN'.
+        year_end (str): The last month of the (fiscal) year for QTD and YTD. Defaults to 'DEC'.
+        ltm_months (int): The number of months in the LTM window. Defaults to 12.
+        backend (Optional[str]): The engine that sums the ledger by key and day: 'pandas', 'polars'
+                                 or 'duckdb'. Defaults to pandas.
+
+    Returns:
+        pd.DataFrame: A long DataFrame with the key columns, 'period_ending', 'duration' and the
+                      amount column, ready for `pivot_to_series_format`.
+
+    Raises:
+        ValueError: If the DataFrame is empty, a column is missing or a duration is unknown.
+
+    Example:
+        compute_durations(ledger, keys=['company', 'account'], freq='M')
+    """
+    durations = _validate_durations(durations, week_end, year_end)
+    ledger = _prepare(df, date_col, value_col, keys, backend)
+
+    if freq is None:
+        key_ids, days = ledger.key_ids, ledger.days
+    else:
+        start, end = ledger.days.min().astype('datetime64[D]'), ledger.days.max().astype('datetime64[D]')
+        ends = pd.period_range(start, end, freq = freq).to_timestamp(how = 'end').normalize()
+        ends = ends.to_numpy().astype('datetime64[D]').astype(np.int64)
+        key_ids = np.repeat(np.arange(len(ledger.keys)), len(ends))
+        days = np.tile(ends, len(ledger.keys))
+        # a key is reported from the end of the period holding its first entry
+        active = days >= ledger.first_day[key_ids]
+        key_ids, days = key_ids[active], days[active]
+
+    results = _evaluate(ledger, key_ids, days, durations, week_end, year_end, ltm_months)
+    labels = days.astype('datetime64[D]').astype('datetime64[ns]')
+    return _long_format(ledger, key_ids, labels, 'period_ending', durations, results, value_col)
+
+
+def compute_durations_as_of(
+    df: pd.DataFrame,
+    as_of: Union[str, pd.Timestamp],
+    date_col: str = 'date',
+    value_col: str = 'amount',
+    keys: Optional[List[str]] = None,
+    durations: Optional[List[str]] = None,
+    week_end: str = 'SUN',
+    year_end: str = 'DEC',
+    ltm_months: int = 12,
+    backend: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Compute each duration as of a date, a month earlier and a year earlier.
+
+    The three as-of dates are labelled 'Current Year', 'Prior Month' and 'Prior Year' in an
+    'annum' column, which is the long format `pivot_to_standard_format` expects.
+
+    Args:
+        df (pd.DataFrame): The ledger, with one row per key, date and amount.
+        as_of (Union[str, pd.Timestamp]): The reporting date.
+        date_col (str): The column holding the dates. Defaults to 'date'.
+        value_col (str): The column holding the amounts. Defaults to 'amount'.
+        keys (Optional[List[str]]): The columns that identify a series. If None, every column
+                                    except the date and amount columns is used.
+        durations (Optional[List[str]]): The durations to compute. Defaults to all of them.
+        week_end (str): The last day of the week for WTD. Defaults to 'SUN'.
+        year_end (str): The last month of the (fiscal) year. Defaults to 'DEC'.
+        ltm_months (int): The number of months in the LTM window. Defaults to 12.
+        backend (Optional[str]): The engine that sums the ledger by key and day. Defaults to pandas.
+
+    Returns:
+        pd.DataFrame: A long DataFrame with the key columns, 'annum', 'duration' and the amount column.
+
+    Example:
+        pivot_to_standard_format(compute_durations_as_of(ledger, '2024-06-30'))
+    """
+    durations = _validate_durations(durations, week_end, year_end)
+    ledger = _prepare(df, date_col, value_col, keys, backend)
+
+    as_of = pd.Timestamp(as_of).normalize()
+    annums = {
+        'Current Year': as_of,
+        'Prior Month': as_of - pd.DateOffset(months = 1),
+        'Prior Year': as_of - pd.DateOffset(years = 1)
+    }
+    # keep month ends on month ends, e.g. 30 June -> 31 May
+    if as_of.is_month_end:
+        annums = {k: v + pd.offsets.MonthEnd(0) for k, v in annums.items()}
+
+    key_count = len(ledger.keys)
+    key_ids = np.tile(np.arange(key_count), len(annums))
+    days = np.repeat(pd.DatetimeIndex(list(annums.values())).to_numpy().astype('datetime64[D]').astype(np.int64), key_count)
+    labels = np.repeat(list(annums.keys()), key_count)
+
+    results = _evaluate(ledger, key_ids, days, durations, week_end, year_end, ltm_months)
+    return _long_format(ledger, key_ids, labels, 'annum', durations, results, value_col)
@@ -1,12 +1,13 @@
 from itertools import repeat
+import numpy as np
 import pandas as pd
-from typing import List, Union
+from typing import Dict, List, Union
 from src.data_formatter.validate import *
+from src.data_formatter.index_lookup import get_index_lookup
 
 
 def get_even_numbers(x):
-    df_row_count = list(range(0, len(x)))
-    return [num for num in df_row_count if num % 2 == 0]
+    return list(range(0, len(x), 2))
 
 
 def replace_list_element(lst, old, new):
@@ -40,62 +41,97 @@ def proper_case(obj):
         return obj
 
 
+def _level_sort_keys(idx: pd.Index, orders: Dict[int, List]) -> List[np.ndarray]:
+    """
+    Build one integer sort key per level of an index.
+
+    Levels with a custom order are ranked by the codes of an ordered categorical, with
+    values missing from the order ranked last. Every other level is ranked by its natural
+    sort order. Missing labels sort after everything else.
+    """
+    lookup = get_index_lookup(idx)
+    keys = []
+    for i in range(idx.nlevels):
+        codes, uniques = lookup.level_codes(i)
+        if i in orders:
+            order = list(dict.fromkeys(orders[i]))
+            ranks = pd.Categorical(uniques, categories = order, ordered = True).codes.astype(np.int64)
+            ranks[ranks < 0] = len(order)
+        else:
+            ranks = np.empty(len(uniques), dtype = np.int64)
+            ranks[uniques.argsort()] = np.arange(len(uniques))
+        missing = max(len(order), len(uniques)) + 1 if i in orders else len(uniques) + 1
+        keys.append(np.append(ranks, missing)[codes])
+    return keys
+
+
 def sort_dataframe_by_custom_order(
     df: pd.DataFrame,
-    desired_order: List[Union[str, int]],
+    desired_order: Union[List[Union[str, int]], Dict[Union[str, int], List[Union[str, int]]]],
     axis: int = 0,
-    level: int = 0
+    level: Union[int, str] = 0
 ) -> pd.DataFrame:
     """
     Sort a DataFrame based on a custom order for a specified index or column level,
     while preserving the order of the lower levels.
 
     This function sorts the DataFrame by rearranging the specified axis (rows or columns)
-    according to a given sequence for a particular level of a MultiIndex. The order of
-    the lower levels is preserved.
+    according to a given sequence for a particular level of a MultiIndex. Levels without a
+    custom order are sorted by their values, and labels that tie keep their current order.
+
+    Several levels can be sorted at once by passing a dictionary of level to order, for
+    example ``{'duration': duration_order, 'annum': annum_order}``. Each level is ranked with
+    the codes of an ordered categorical and the labels are sorted with a single `np.lexsort`,
+    so no Python comparison runs per label.
 
     Args:
         df (pandas.DataFrame): The DataFrame to sort.
-        desired_order (List[Union[str, int]]): The desired order for the specified level.
+        desired_order (Union[List[Union[str, int]], Dict[Union[str, int], List[Union[str, int]]]]):
+            The desired order for the specified level, or a dictionary that maps levels
+            (numbers or names) to their desired order.
         axis (int): The axis to sort (0 for index, 1 for columns). Defaults to 0.
-        level (int): The level of the MultiIndex to sort by. Defaults to 0.
+        level (Union[int, str]): The level of the MultiIndex to sort by when `desired_order` is
+                                 a list. Defaults to 0.
 
     Returns:
         pd.DataFrame: The sorted DataFrame.
 
     Raises:
         ValueError: If any element in desired_order is not found in the specified level.
+        KeyError: If a level is neither a level name nor a level number of the axis.
 
     Example:
         If a DataFrame has columns [('One', 'A', 1), ('One', 'A', 2), ('Two', 'B', 1)]
         and you supply an order of ['Two', 'One'] for axis=1, level=0,
         the columns will be reordered to [('Two', 'B', 1), ('One', 'A', 1), ('One', 'A', 2)].
     """
-    def sort_key(index):
-        # Create a key based on the desired order for the specified level
-        level_key = desired_order.index(index[level]) if index[level] in desired_order else len(desired_order)
-        # Create a tuple that maintains the order of all preceding levels
-        return tuple(list(index[:level]) + [level_key] + list(index[level + 1:]))
-
     # Extract the MultiIndex
     idx = df.columns if axis == 1 else df.index
 
-    # Validate that all elements in desired_order are present in the specified level
-    level_values = idx.get_level_values(level)
-    for item in desired_order:
-        if item not in level_values:
-            raise ValueError(f"'{item}' not found in level {level} of the {'columns' if axis == 1 else 'index'}.")
-
-    # Sort the index using the custom sort key
-    sorted_idx = sorted(idx, key=sort_key)
-
-    # Reindex the DataFrame based on the sorted index
-    if axis == 1:
-        df = df.loc[:, sorted_idx]
-    else:
-        df = df.loc[sorted_idx]
-
-    return df
+    if not isinstance(desired_order, dict):
+        desired_order = {level: desired_order}
+
+    # Validate that all elements of each order are present in their level
+    orders = {}
+    lookup = get_index_lookup(idx)
+    for lvl, order in desired_order.items():
+        if lvl in idx.names:
+            number = idx.names.index(lvl)
+        elif isinstance(lvl, (int, np.integer)) and -idx.nlevels <= lvl < idx.nlevels:
+            number = lookup.normalize_level(int(lvl))
+        else:
+            raise KeyError(f"Level {lvl} not found")
+        level_values = set(lookup.value_positions(number))
+        for item in order:
+            if item not in level_values:
+                raise ValueError(f"'{item}' not found in level {lvl} of the {'columns' if axis == 1 else 'index'}.")
+        orders[number] = order
+
+    # The first level is the primary key, so it goes last in np.lexsort
+    keys = _level_sort_keys(idx, orders)
+    positions = np.lexsort(keys[::-1]) if len(keys) > 0 else np.arange(len(idx))
+
+    return df.take(positions, axis = axis)
 
 
 def table_level_values(df, axis = 0, level = 0, unique = True):
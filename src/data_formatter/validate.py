@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from typing import Callable, Optional, Union, Tuple
+from .index_lookup import match_like_mask, match_positions
 
 
 def validate_dataframe_not_empty(df: pd.DataFrame) -> None:
@@ -15,6 +16,12 @@ def validate_column_exists(df: pd.DataFrame, column_name: str) -> None:
         raise ValueError(f"Column '{column_name}' does not exist in the DataFrame.")
 
 
+def validate_row_exists(df: pd.DataFrame, row_name: str) -> None:
+    """Check if a row exists in the DataFrame."""
+    if row_name not in df.index:
+        raise ValueError(f"Row '{row_name}' does not exist in the DataFrame.")
+
+
 def validate_callable(func: Callable) -> None:
     """Check if the provided function is callable."""
     if not callable(func):
@@ -46,6 +53,9 @@ def validate_string_in_any_column_tuple(columns: pd.Index, string: str) -> bool:
     """
     Check if a string is present in any of the column tuples of a DataFrame.
 
+    As with ``string in label``, a MultiIndex label matches when one of its levels equals the
+    string, and a label of a single-level index matches when it contains the string.
+
     Args:
         columns (pd.Index): The columns of the DataFrame, expected to be a MultiIndex.
         string (str): The string to search for in the column tuples.
@@ -56,9 +66,12 @@ def validate_string_in_any_column_tuple(columns: pd.Index, string: str) -> bool:
     Raises:
         ValueError: If the string is not found in any of the column tuples.
     """
-    for column_tuple in columns:
-        if string in column_tuple:
-            return True
+    if isinstance(columns, pd.MultiIndex):
+        found = len(match_positions(columns, string)) > 0
+    else:
+        found = match_like_mask(columns, string).any()
+    if found:
+        return True
     raise ValueError(f"The string '{string}' is not in any of the column tuples.")
 
 
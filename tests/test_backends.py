@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.data_formatter import backends
+from src.data_formatter.backends import available_backends, first_by_group, get_backend, group_aggregate
+from src.data_formatter.calculations import make_commonsize_vertical
+from src.data_formatter.pivot_tables import pivot_to
+from src.data_formatter.time_intelligence import compute_durations
+
+
+def _ledger(n = 500):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'company': rng.choice(['A', 'B', 'C', None], n),
+        'duration': rng.choice(['MTD', 'YTD'], n),
+        'annum': rng.choice(['Current Year', 'Prior Year'], n),
+        'amount': rng.integers(0, 100, n),
+        'units': np.where(rng.random(n) < 0.1, np.nan, rng.random(n))
+    })
+
+
+class TestPandasBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.df = _ledger()
+
+    def test_matches_groupby(self):
+        result = group_aggregate(self.df, ['company', 'annum'], [('amount', 'sum'), ('units', 'count')])
+        expected = self.df.groupby(['company', 'annum'], sort = False).agg({'amount': 'sum', 'units': 'count'})
+        self.assertEqual(result.index.tolist(), expected.index.tolist())
+        self.assertEqual(result[('amount', 'sum')].tolist(), expected['amount'].tolist())
+        self.assertEqual(result[('units', 'count')].dtype, np.int64)
+
+    def test_keeps_missing_keys(self):
+        result = group_aggregate(self.df, ['company'], [('amount', 'max')], dropna = False)
+        self.assertEqual(len(result), 4)
+
+    def test_first_by_group(self):
+        df = pd.DataFrame({'k': ['a', 'a', 'b', 'b'], 'v': [1.0, 2.0, 3.0, np.nan]})
+        result = first_by_group(df, ['k'], ['v'], np.array([False, True, False, True]))
+        self.assertEqual(result[:2, 0].tolist(), [2.0, 2.0])
+        self.assertTrue(np.isnan(result[2:, 0]).all())
+
+    def test_unknown_backend_and_function(self):
+        with self.assertRaises(ValueError):
+            get_backend('spark')
+        with self.assertRaises(ValueError):
+            group_aggregate(self.df, ['company'], [('amount', 'median')])
+
+    def test_missing_package(self):
+        if 'polars' in available_backends():
+            self.skipTest("polars is installed")
+        with self.assertRaises(ImportError):
+            pivot_to(self.df, ['amount'], ['annum'], backend = 'polars')
+
+
+class BackendAgreement:
+    """Checks that a backend gives exactly the output of the pandas backend."""
+
+    backend = None
+
+    def setUp(self):
+        self.df = _ledger()
+
+    def test_group_aggregate(self):
+        aggregations = [('amount', 'sum'), ('amount', 'min'), ('units', 'max'), ('units', 'count')]
+        for dropna in [True, False]:
+            expected = group_aggregate(self.df, ['company', 'annum'], aggregations, dropna = dropna)
+            result = group_aggregate(self.df, ['company', 'annum'], aggregations, backend = self.backend, dropna = dropna)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_pivot_to(self):
+        # pivot_table leaves rows with any missing value out of its margins, so use complete rows
+        df = self.df.dropna(subset = ['units'])
+        for func in ['sum', 'count', 'mean', ['min', 'max']]:
+            expected = pivot_to(df, ['amount', 'units'], ['duration', 'annum'], func = func, margins = True)
+            result = pivot_to(
+                df, ['amount', 'units'], ['duration', 'annum'], func = func, margins = True, backend = self.backend
+            )
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_make_commonsize_vertical(self):
+        df = self.df.dropna(subset = ['company']).set_index(['company', 'duration', 'annum'])
+        expected = make_commonsize_vertical(df, 'annum', 'Prior Year', ['company', 'duration'])
+        result = make_commonsize_vertical(df, 'annum', 'Prior Year', ['company', 'duration'], backend = self.backend)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_compute_durations(self):
+        df = self.df[['company', 'amount']].assign(
+            date = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(len(self.df)) % 90, unit = 'D')
+        )
+        expected = compute_durations(df, freq = 'M')
+        pd.testing.assert_frame_equal(compute_durations(df, freq = 'M', backend = self.backend), expected)
+
+    def test_compute_durations_missing_key(self):
+        df = pd.DataFrame({
+            'company': ['A', 'A', None, None, 'B'],
+            'date': pd.to_datetime(['2024-01-05', '2024-02-03', '2024-01-10', '2024-02-03', '2024-02-03']),
+            'amount': [1.0, 2.0, 10.0, 20.0, 100.0]
+        })
+        result = compute_durations(df, keys = ['company'], durations = ['YTD'], backend = self.backend)
+        result = result[result['period_ending'] == '2024-02-03']
+        self.assertEqual(result['company'].tolist()[:2], ['A', 'B'])
+        self.assertTrue(pd.isna(result['company'].iloc[2]))
+        self.assertEqual(result['amount'].tolist(), [3.0, 100.0, 30.0])
+
+
+@unittest.skipUnless(backends.polars is not None, "polars is not installed")
+class TestPolarsBackend(BackendAgreement, unittest.TestCase):
+    backend = 'polars'
+
+
+@unittest.skipUnless(backends.duckdb is not None, "duckdb is not installed")
+class TestDuckDBBackend(BackendAgreement, unittest.TestCase):
+    backend = 'duckdb'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -139,5 +139,77 @@ class TestMakeCommonSizeVertical(unittest.TestCase):
         np.testing.assert_array_almost_equal(result['value2'].values, expected_values2)
 
 
+class TestMakeCommonSizeVerticalGroups(unittest.TestCase):
+
+    def setUp(self):
+        index = pd.MultiIndex.from_product(
+            [['A', 'B'], ['Jan', 'Feb'], ['Revenue', 'Cost']],
+            names = ('company', 'period', 'line')
+        )
+        self.df = pd.DataFrame({
+            'amount': [200, 50, 100, 40, 400, 100, 0, 10],
+            'units' : [10, 5, 20, 5, 40, 10, 8, 4]
+        }, index = index)
+
+    def test_divides_by_group_base(self):
+        result = make_commonsize_vertical(self.df, 'line', 'Revenue', ['company', 'period'])
+        np.testing.assert_array_almost_equal(result['amount'].values, [1.0, 0.25, 1.0, 0.4, 1.0, 0.25, 0.0, 0.0])
+        np.testing.assert_array_almost_equal(result['units'].values, [1.0, 0.5, 1.0, 0.25, 1.0, 0.25, 1.0, 0.5])
+
+    def test_matches_groupby_apply(self):
+        df = self.df.replace({'amount': {0: 80}})
+        expected = df.groupby(['company', 'period'], group_keys = False).apply(
+            lambda x: x / x.loc[x.index.get_level_values('line') == 'Revenue'].values
+        )
+        result = make_commonsize_vertical(df, 'line', 'Revenue', ['company', 'period'])
+        pd.testing.assert_frame_equal(result, expected.astype(np.float64))
+
+    def test_missing_base_row(self):
+        df = self.df.drop(('A', 'Feb', 'Revenue'))
+        result = make_commonsize_vertical(df, 'line', 'Revenue', 'company')
+        np.testing.assert_array_almost_equal(result.loc[('A', 'Feb', 'Cost'), ['amount', 'units']].values, [0.2, 0.5])
+
+    def test_does_not_modify_input(self):
+        make_commonsize_vertical(self.df, 'line', 'Revenue', ['company', 'period'])
+        self.assertEqual(self.df['amount'].iloc[0], 200)
+
+
+class TestMakeCommonSizeHorizontal(unittest.TestCase):
+
+    def setUp(self):
+        columns = pd.MultiIndex.from_product(
+            [['MTD', 'YTD'], ['Jan', 'Feb', 'Mar']], names = ['duration', 'period']
+        )
+        self.df = pd.DataFrame([[10, 20, 30, 10, 30, 60], [4, 0, 5, 4, 4, 9]], columns = columns)
+
+    def test_matches_shift_division(self):
+        df = pd.DataFrame(np.random.default_rng(0).random((4, 5)) + 0.5, columns = list('abcde'))
+        expected = df.apply(lambda x: x / x.shift(1), axis = 1).drop(columns = 'a')
+        pd.testing.assert_frame_equal(make_commonsize_horizontal(df), expected)
+
+    def test_lag_within_level(self):
+        result = make_commonsize_horizontal(self.df, level = 'duration')
+        self.assertEqual(result.columns.tolist(), [('MTD', 'Feb'), ('MTD', 'Mar'), ('YTD', 'Feb'), ('YTD', 'Mar')])
+        np.testing.assert_array_almost_equal(result.values, [[2.0, 1.5, 3.0, 2.0], [0.0, 0.0, 1.0, 2.25]])
+
+    def test_larger_lag(self):
+        result = make_commonsize_horizontal(self.df, lag = 2, level = 0)
+        self.assertEqual(result.columns.tolist(), [('MTD', 'Mar'), ('YTD', 'Mar')])
+        np.testing.assert_array_almost_equal(result.values, [[3.0, 6.0], [1.25, 2.25]])
+
+    def test_fixed_base(self):
+        result = make_commonsize_horizontal(self.df, base = 0, level = 'duration')
+        self.assertEqual(result.columns.tolist(), self.df.columns.tolist())
+        np.testing.assert_array_almost_equal(result.values[0], [1.0, 2.0, 3.0, 1.0, 3.0, 6.0])
+
+    def test_invalid_lag(self):
+        with self.assertRaises(ValueError):
+            make_commonsize_horizontal(self.df, lag = 0)
+
+    def test_base_outside_block(self):
+        with self.assertRaises(ValueError):
+            make_commonsize_horizontal(self.df, base = 3, level = 'duration')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import pandas as pd
+from src.data_formatter import constants
+from src.data_formatter.categoricals import apply_canonical_dtypes, get_canonical_dtype, register_canonical_order
+from src.data_formatter.constants import duration_dtype, annum_dtype
+
+
+class TestApplyCanonicalDtypes(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'company': ['A', 'A', 'B'],
+            'duration': ['YTD', 'MTD', 'MTD'],
+            'annum': ['Prior Year', 'Current Year', 'Current Year'],
+            'amount': [1, 2, 3]
+        })
+
+    def test_registered_columns(self):
+        result = apply_canonical_dtypes(self.df)
+        self.assertEqual(result['duration'].dtype, duration_dtype)
+        self.assertEqual(result['annum'].dtype, annum_dtype)
+        self.assertEqual(result['company'].dtype, object)
+        # the categories are shared, not copied
+        self.assertIs(result['duration'].cat.categories, duration_dtype.categories)
+
+    def test_does_not_modify_input(self):
+        apply_canonical_dtypes(self.df)
+        self.assertEqual(self.df['duration'].dtype, object)
+
+    def test_index_levels_sort_in_canonical_order(self):
+        df = apply_canonical_dtypes(self.df.set_index(['company', 'duration', 'annum']))
+        self.assertEqual(df.index.levels[1].dtype, duration_dtype)
+        result = df.sort_index(level = ['duration', 'annum'])
+        self.assertEqual(result['amount'].tolist(), [2, 3, 1])
+
+    def test_column_levels(self):
+        columns = pd.MultiIndex.from_tuples([('YTD', 'x'), ('MTD', 'x')], names = ['duration', None])
+        df = apply_canonical_dtypes(pd.DataFrame([[1, 2]], columns = columns))
+        self.assertEqual(df.columns.levels[0].dtype, duration_dtype)
+        self.assertEqual(df.columns.tolist(), [('YTD', 'x'), ('MTD', 'x')])
+
+    def test_unknown_value(self):
+        df = self.df.assign(duration = ['YTD', 'MTD', 'HTD'])
+        with self.assertRaises(ValueError):
+            apply_canonical_dtypes(df)
+
+
+class TestRegisterCanonicalOrder(unittest.TestCase):
+
+    def tearDown(self):
+        constants.canonical_dtypes.pop('region', None)
+
+    def test_register(self):
+        dtype = register_canonical_order('region', ['North', 'South'])
+        self.assertIs(get_canonical_dtype('region'), dtype)
+        result = apply_canonical_dtypes(pd.DataFrame({'region': ['South', 'North']}))
+        self.assertEqual(result['region'].sort_values().tolist(), ['North', 'South'])
+
+    def test_duplicates(self):
+        with self.assertRaises(ValueError):
+            register_canonical_order('region', ['North', 'North'])
+
+
+if __name__ == '__main__':
+    unittest.main()
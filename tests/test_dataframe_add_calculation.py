@@ -1,12 +1,19 @@
 import unittest
+import warnings
 import pandas as pd
 import numpy as np
 from src.data_formatter.dataframe_add_calculation import (
     add_calculated_column,
+    add_calculated_columns,
     add_calculated_columns_by_group,
     add_calculated_row,
-    add_calculated_rows_by_group
+    add_calculated_rows_by_group,
+    add_expression_columns_by_group,
+    add_expression_rows_by_group,
+    add_comparison_columns_by_group,
+    add_comparison_rows_by_group
 )
+from src.data_formatter.calculations import growth
 
 
 class TestAddCalculatedColumn(unittest.TestCase):
@@ -127,6 +134,53 @@ class TestAddCalculatedColumn(unittest.TestCase):
         pd.testing.assert_frame_equal(result, expected)
 
 
+class TestAddCalculatedColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'A': [1, 2, 3],
+            'B': [4, 5, 6],
+            'C': [7, 8, 9]
+        })
+
+    def test_matches_sequential_inserts(self):
+        # Test that the batch places columns exactly where repeated inserts would
+        specs = [
+            (np.add, ['A', 'B'], 'AB'),
+            (np.subtract, ['A', 'B'], 'A-B'),
+            (np.multiply, ['AB', 'C'], 'ABC'),
+            (np.negative, ['A'], 'neg')
+        ]
+        expected = self.df.copy()
+        for func, column_names, new_column_name in specs:
+            expected = add_calculated_column(expected, func, *column_names, new_column_name = new_column_name)
+
+        result = add_calculated_columns(self.df, specs)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_explicit_position(self):
+        # Test that explicit positions refer to the original columns and keep spec order
+        result = add_calculated_columns(self.df, [
+            (np.add, ['B', 'C'], 'first', 0),
+            (np.add, ['A', 'C'], 'second', 0)
+        ])
+        self.assertEqual(list(result.columns), ['first', 'second', 'A', 'B', 'C'])
+
+    def test_existing_column_name(self):
+        # Test that a new column cannot reuse an existing name
+        with self.assertRaises(ValueError):
+            add_calculated_columns(self.df, [(np.add, ['A', 'B'], 'C')])
+
+    def test_non_existent_column(self):
+        # Test with a non-existent input column
+        with self.assertRaises(ValueError):
+            add_calculated_columns(self.df, [(np.add, ['A', 'Z'], 'AZ')])
+
+    def test_original_is_not_modified(self):
+        add_calculated_columns(self.df, [(np.add, ['A', 'B'], 'AB')])
+        self.assertEqual(list(self.df.columns), ['A', 'B', 'C'])
+
+
 class TestAddCalculatedColumnsByGroup(unittest.TestCase):
 
     def setUp(self):
@@ -160,6 +214,37 @@ class TestAddCalculatedColumnsByGroup(unittest.TestCase):
         )
         pd.testing.assert_frame_equal(result, expected)
 
+    def test_vectorized_matches_per_group(self):
+        # Test that the vectorized mode gives the same frame as calling func per group
+        columns = pd.MultiIndex.from_product([['acct 1', 'acct 2'], ['Jan', 'Feb'], ['Actual', 'Budget']])
+        df = pd.DataFrame(np.arange(24).reshape(3, 8), columns = columns)
+        expected = add_calculated_columns_by_group(df, np.subtract, 'Actual', 'Budget', new_column_suffix = 'var')
+        result = add_calculated_columns_by_group(
+            df, np.subtract, 'Actual', 'Budget', new_column_suffix = 'var', vectorized = True
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_vectorized_calls_func_once(self):
+        # Test that func receives one 2-D block per column name
+        shapes = []
+
+        def func(x, y):
+            shapes.append((x.shape, y.shape))
+            return x + y
+
+        add_calculated_columns_by_group(self.multiindex_columns_df, func, 'x', 'y', vectorized = True)
+        self.assertEqual(shapes, [((3, 2), (3, 2))])
+
+    def test_many_groups_without_fragmentation(self):
+        # Test that hundreds of groups are added without fragmenting the frame
+        columns = pd.MultiIndex.from_product([[f'acct {i}' for i in range(200)], ['Actual', 'Budget']])
+        df = pd.DataFrame(np.ones((3, len(columns))), columns = columns)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', pd.errors.PerformanceWarning)
+            result = add_calculated_columns_by_group(df, np.subtract, 'Actual', 'Budget', new_column_suffix = 'var')
+        self.assertEqual(result.shape, (3, 600))
+        self.assertEqual(list(result.columns[:3]), [('acct 0', 'Actual'), ('acct 0', 'Budget'), ('acct 0', 'var')])
+
     def test_invalid_column_names(self):
         # Test with invalid column names
         with self.assertRaises(TypeError):
@@ -197,6 +282,19 @@ class TestAddCalculatedRow(unittest.TestCase):
         with self.assertRaises(TypeError):
             add_calculated_row(self.df, np.add, 1)
 
+    def test_non_existent_row(self):
+        # Test with a row that does not exist
+        with self.assertRaises(ValueError) as context:
+            add_calculated_row(self.df, np.add, 'R1', 'R9')
+        self.assertEqual(str(context.exception), "Row 'R9' does not exist in the DataFrame.")
+
+    def test_mixed_dtypes_are_kept(self):
+        # Test that each column keeps its dtype when a row is added
+        df = pd.DataFrame({'A': [1, 2], 'B': [1.5, 2.5]}, index = ['R1', 'R2'])
+        result = add_calculated_row(df, np.add, 'R1', 'R2', new_row_name = 'R_sum')
+        expected = pd.DataFrame({'A': [1, 2, 3], 'B': [1.5, 2.5, 4.0]}, index = ['R1', 'R2', 'R_sum'])
+        pd.testing.assert_frame_equal(result, expected)
+
     def test_empty_dataframe(self):
         # Test with an empty DataFrame
         empty_df = pd.DataFrame()
@@ -226,6 +324,27 @@ class TestAddCalculatedRowsByGroup(unittest.TestCase):
         }, index=expected_index)
         pd.testing.assert_frame_equal(result, expected)
 
+    def test_add_calculated_rows_multiple_groups(self):
+        # Test that each new row lands after the last row of its own group
+        index = pd.MultiIndex.from_tuples([('R1', 'A'), ('R1', 'B'), ('R2', 'A'), ('R2', 'B')], names = ['g', 'v'])
+        df = pd.DataFrame({'A': [1, 2, 3, 4], 'B': [0.5, 1.5, 2.5, 3.5]}, index = index)
+        result = add_calculated_rows_by_group(df, np.subtract, 'A', 'B', new_row_suffix = 'diff')
+        expected_index = pd.MultiIndex.from_tuples(
+            [('R1', 'A'), ('R1', 'B'), ('R1', 'diff'), ('R2', 'A'), ('R2', 'B'), ('R2', 'diff')],
+            names = ['g', 'v']
+        )
+        expected = pd.DataFrame({
+            'A': [1, 2, -1, 3, 4, -1],
+            'B': [0.5, 1.5, -1.0, 2.5, 3.5, -1.0]
+        }, index = expected_index)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_add_calculated_rows_vectorized(self):
+        # Test that the vectorized mode gives the same rows as calling func per group
+        expected = add_calculated_rows_by_group(self.df, np.add, 'A', 'B', new_row_suffix = 'sum')
+        result = add_calculated_rows_by_group(self.df, np.add, 'A', 'B', new_row_suffix = 'sum', vectorized = True)
+        pd.testing.assert_frame_equal(result, expected)
+
     def test_invalid_row_names(self):
         # Test with invalid row names
         with self.assertRaises(ValueError):
@@ -248,5 +367,116 @@ class TestAddCalculatedRowsByGroup(unittest.TestCase):
             add_calculated_rows_by_group(df_single_index, np.add, 'R1', 'R2')
 
 
+class TestAddExpressionsByGroup(unittest.TestCase):
+
+    def setUp(self):
+        columns = pd.MultiIndex.from_product([['acct 1', 'acct 2'], ['Actual', 'Budget']])
+        self.df = pd.DataFrame([[12.0, 10.0, 5.0, 0.0], [6.0, 8.0, 1.0, 2.0]], columns = columns)
+
+    def test_matches_calculated_columns(self):
+        # Test that an expression gives the same result as the equivalent lambda
+        expected = add_calculated_columns_by_group(
+            self.df, lambda x, y: growth(x, y) - 1, 'Actual', 'Budget', new_column_suffix = 'Actual Vs Budget (%)'
+        )
+        result = add_expression_columns_by_group(self.df, "Actual Vs Budget (%) = growth(Actual, Budget) - 1")
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_derived_metrics_in_declared_order(self):
+        # Test that derived metrics can use each other and keep the declared order
+        result = add_expression_columns_by_group(
+            self.df,
+            "Actual Vs Budget = Actual - Budget",
+            "Actual Vs Budget (%) = growth(Actual, Budget) - 1",
+            "Double = Actual Vs Budget * 2"
+        )
+        self.assertEqual(
+            list(result.columns[:5]),
+            [('acct 1', 'Actual'), ('acct 1', 'Budget'), ('acct 1', 'Actual Vs Budget'),
+             ('acct 1', 'Actual Vs Budget (%)'), ('acct 1', 'Double')]
+        )
+        np.testing.assert_array_equal(result[('acct 2', 'Double')].values, [10.0, -2.0])
+
+    def test_results_keep_their_dtype(self):
+        df = self.df.astype(int)
+        result = add_expression_columns_by_group(df, "Gap = Actual - Budget", "Ratio = Actual / Budget")
+        self.assertEqual(result[('acct 1', 'Gap')].dtype, np.int64)
+        self.assertEqual(result[('acct 1', 'Ratio')].dtype, np.float64)
+        self.assertEqual(result[('acct 2', 'Actual')].dtype, np.int64)
+
+    def test_groups_missing_an_input_are_skipped(self):
+        df = self.df.drop(columns = [('acct 2', 'Budget')])
+        result = add_expression_columns_by_group(df, "Gap = Actual - Budget")
+        self.assertIn(('acct 1', 'Gap'), result.columns)
+        self.assertNotIn(('acct 2', 'Gap'), result.columns)
+
+    def test_rows(self):
+        # Test that the row version matches the calculated rows
+        df = self.df.T
+        expected = add_calculated_rows_by_group(df, np.subtract, 'Actual', 'Budget', new_row_suffix = 'Gap')
+        result = add_expression_rows_by_group(df, "Gap = Actual - Budget")
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_unknown_name(self):
+        with self.assertRaises(ValueError):
+            add_expression_columns_by_group(self.df, "Gap = Actual - Forecast")
+
+    def test_existing_target(self):
+        df = add_expression_columns_by_group(self.df, "Gap = Actual - Budget")
+        with self.assertRaises(ValueError):
+            add_expression_columns_by_group(df, "Gap = Actual - Budget")
+        with self.assertRaises(ValueError):
+            add_expression_rows_by_group(df.T, "Gap = Actual - Budget")
+        with self.assertRaises(ValueError):
+            add_expression_columns_by_group(self.df, "Gap = Actual - Budget", "Gap = Budget - Actual")
+
+
+class TestAddComparisonsByGroup(unittest.TestCase):
+
+    def setUp(self):
+        columns = pd.MultiIndex.from_product([['MTD', 'YTD'], ['Prior Year', 'Current Year', 'Prior Month']])
+        self.df = pd.DataFrame([[1, 2, 4, 10, 15, 12], [2, 3, 0, 20, 10, 10]], columns = columns)
+
+    def test_annum_comparisons_in_canonical_order(self):
+        result = add_comparison_columns_by_group(self.df)
+        self.assertEqual(result.columns.get_level_values(1).tolist()[:7], [
+            'Current Year', 'Prior Month', 'Prior Year',
+            'Current Vs Prior Month', 'Current Vs Prior Year',
+            'Current Vs Prior Month (%)', 'Current Vs Prior Year (%)'
+        ])
+        self.assertEqual(result.columns.get_level_values(0).tolist(), ['MTD'] * 7 + ['YTD'] * 7)
+        np.testing.assert_array_almost_equal(result[('YTD', 'Current Vs Prior Year')].values, [5, -10])
+        np.testing.assert_array_almost_equal(result[('MTD', 'Current Vs Prior Month (%)')].values, [-0.5, -1.0])
+
+    def test_matches_expression_columns(self):
+        result = add_comparison_columns_by_group(self.df)
+        expected = add_expression_columns_by_group(
+            self.df, "Current Vs Prior Year (%) = growth(Current Year, Prior Year) - 1"
+        )
+        pd.testing.assert_series_equal(
+            result[('YTD', 'Current Vs Prior Year (%)')], expected[('YTD', 'Current Vs Prior Year (%)')]
+        )
+
+    def test_version_order_is_detected(self):
+        df = pd.DataFrame([[10, 8]], columns = pd.MultiIndex.from_tuples([('Sales', 'Budget'), ('Sales', 'Actual')]))
+        result = add_comparison_columns_by_group(df)
+        self.assertEqual(result.columns.get_level_values(1).tolist(), [
+            'Actual', 'Budget', 'Actual Vs Budget', 'Actual Vs Budget (%)'
+        ])
+
+    def test_existing_comparisons_are_kept(self):
+        df = add_comparison_columns_by_group(self.df)
+        result = add_comparison_columns_by_group(df)
+        pd.testing.assert_frame_equal(result, df)
+
+    def test_rows(self):
+        result = add_comparison_rows_by_group(self.df.T)
+        pd.testing.assert_frame_equal(result, add_comparison_columns_by_group(self.df).T)
+
+    def test_no_matching_order(self):
+        df = pd.DataFrame([[1, 2]], columns = pd.MultiIndex.from_tuples([('A', 'x'), ('A', 'y')]))
+        with self.assertRaises(ValueError):
+            add_comparison_columns_by_group(df)
+
+
 if __name__ == '__main__':
     unittest.main()
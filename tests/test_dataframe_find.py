@@ -4,7 +4,10 @@ from src.data_formatter.dataframe_find import (
     find_columns,
     find_column_positions,
     find_columns_like,
-    find_common_columns
+    find_common_columns,
+    find_rows,
+    find_row_positions,
+    find_rows_like
 )
 
 
@@ -242,5 +245,29 @@ class TestFindCommonColumns(unittest.TestCase):
             find_common_columns(df_single_index, 'A')
 
 
+class TestFindRows(unittest.TestCase):
+
+    def setUp(self):
+        # Create a sample DataFrame with MultiIndex rows and mixed dtypes for testing
+        index = pd.MultiIndex.from_tuples([('A', 'foo'), ('B', 'bar'), ('C', 'foo bar')])
+        self.df = pd.DataFrame({'num': [1, 2, 3], 'text': ['x', 'y', 'z']}, index = index)
+
+    def test_find_rows(self):
+        self.assertEqual(find_rows(self.df, 'foo'), [('A', 'foo')])
+
+    def test_find_rows_with_lvl(self):
+        self.assertEqual(find_rows(self.df, 'B', lvl = 0), [('B', 'bar')])
+
+    def test_find_row_positions(self):
+        self.assertEqual(find_row_positions(self.df, 'bar'), [1])
+
+    def test_find_rows_like(self):
+        self.assertEqual(find_rows_like(self.df, 'bar', lvl = 1), [('B', 'bar'), ('C', 'foo bar')])
+
+    def test_find_rows_empty_dataframe(self):
+        with self.assertRaises(ValueError):
+            find_rows(pd.DataFrame(), 'foo')
+
+
 if __name__ == '__main__':
     unittest.main()
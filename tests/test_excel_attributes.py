@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+import pandas as pd
+import pandas.io.formats.style  # noqa: F401  get_dataframe_attributes looks up pd.io.formats.style.Styler
+from src.data_formatter.excel_attributes import get_dataframe_attributes
+
+
+class TestGetDataFrameAttributes(unittest.TestCase):
+
+    def test_single_level(self):
+        df = pd.DataFrame({'amount': [1, 2], 'units': [3, 4]}, index = pd.Index(['A', 'B'], name = 'company'))
+        attrs = get_dataframe_attributes(df, 0, 0)
+        # header on row 1, data on rows 2 and 3
+        self.assertEqual(attrs['cell_range'], '$A$1:$C$3')
+        self.assertEqual(attrs['columns_cell_range'], '$B$1:$C$1')
+        self.assertEqual(attrs['index_cell_range'], '$A$2:$A$3')
+        self.assertEqual(attrs['data_cell_range'], '$B$2:$C$3')
+        self.assertEqual((attrs['data_startrow'], attrs['data_startcol']), (1, 1))
+
+    def test_multiindex(self):
+        rows = pd.MultiIndex.from_product([['North'], ['A', 'B']], names = ['region', 'company'])
+        columns = pd.MultiIndex.from_product([['Actual'], ['Jan', 'Feb', 'Mar']], names = ['version', 'period'])
+        df = pd.DataFrame(np.zeros((2, 3)), index = rows, columns = columns)
+        attrs = get_dataframe_attributes(df, 1, 2)
+        # two header rows and the index names row, then the data, right of two index columns
+        self.assertEqual(attrs['cell_range'], '$B$3:$F$7')
+        self.assertEqual(attrs['columns_cell_range'], '$D$3:$F$4')
+        self.assertEqual(attrs['index_cell_range'], '$B$6:$C$7')
+        self.assertEqual(attrs['data_cell_range'], '$D$6:$F$7')
+        self.assertEqual((attrs['index_levels'], attrs['columns_levels']), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,363 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import pandas.io.formats.style  # noqa: F401  excel_attributes looks up pd.io.formats.style.Styler
+from pandas.io.formats.excel import ExcelFormatter
+from pandas.io.formats.style import Styler
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from src.data_formatter import excel_output
+from src.data_formatter.excel_output import (
+    create_workbook,
+    add_dataframe_below,
+    add_dataframe_right,
+    add_range_styles,
+    add_banding,
+    add_table_of_contents,
+    compile_styler,
+    write_dataframe
+)
+from src.data_formatter.excel_dataframe_styles import (
+    index_format_standard,
+    column_format_header_0,
+    column_format_header_1,
+    data_format_standard,
+    data_format_dollars,
+    data_format_percent,
+    data_format_totals,
+    alternate_color_rows,
+    format_hyperlink,
+    range_style,
+    range_format_dollars,
+    range_format_totals,
+    range_color_rows,
+    range_color_cols
+)
+
+
+class ExcelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, name, sheet_name = 'Sheet1'):
+        """Return the value, number format, font, fill and borders of every written cell, and the merged ranges."""
+        ws = load_workbook(self.path(name))[sheet_name]
+        cells = {}
+        for row in ws.iter_rows():
+            for c in row:
+                if c.value is not None or c.has_style:
+                    font = (c.font.b, c.font.i, c.font.u, c.font.name, c.font.sz, c.font.color and c.font.color.rgb)
+                    fill = c.fill.fgColor.rgb if c.fill.fill_type else None
+                    borders = (c.border.top.style, c.border.right.style, c.border.bottom.style, c.border.left.style)
+                    alignment = (c.alignment.horizontal, c.alignment.vertical, c.alignment.wrap_text)
+                    cells[c.coordinate] = (c.value, c.number_format, font, fill, borders, alignment)
+        return cells, sorted(str(x) for x in ws.merged_cells.ranges)
+
+    def assertSameSheet(self, name, expected, constant_memory = False):
+        """Compare two written sheets. A streaming sheet writes the labels to_excel merges down rows as the
+        label and formatted blanks, so the rest of those ranges is left out."""
+        (cells, merged), (expected_cells, expected_merged) = self.read(name), self.read(expected)
+        if constant_memory:
+            for cell_range in [CellRange(x) for x in expected_merged]:
+                if cell_range.min_row < cell_range.max_row:
+                    expected_merged.remove(cell_range.coord)
+                    for row, col in list(cell_range.cells)[1:]:
+                        coordinate = f'{get_column_letter(col)}{row}'
+                        self.assertIsNone(cells.pop(coordinate)[0])
+                        expected_cells.pop(coordinate, None)
+        self.assertEqual((cells, merged), (expected_cells, expected_merged))
+
+    def assertSameAsPandas(self, df, index = True, startrow = 0, startcol = 0, constant_memory = False):
+        """Write a frame with to_excel and with write_dataframe and compare the two sheets."""
+        w = create_workbook(self.path('pandas.xlsx'))
+        df.to_excel(w, sheet_name = 'Sheet1', startrow = startrow, startcol = startcol, index = index, merge_cells = True)
+        w.close()
+        w = create_workbook(self.path('native.xlsx'), constant_memory = constant_memory)
+        write_dataframe(w, df, startrow = startrow, startcol = startcol, index = index)
+        w.close()
+        self.assertSameSheet('native.xlsx', 'pandas.xlsx', constant_memory)
+
+
+class TestWriteDataFrame(ExcelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rows = pd.MultiIndex.from_product([['North', 'South'], ['A', 'B', 'C']], names = ['region', 'company'])
+        columns = pd.MultiIndex.from_product(
+            [['Actual', 'Budget'], pd.to_datetime(['2024-01-31', '2024-02-29'])], names = ['version', 'period']
+        )
+        self.multi = pd.DataFrame(np.arange(24, dtype = float).reshape(6, 4), index = rows, columns = columns)
+
+    def test_flat(self):
+        df = pd.DataFrame(
+            {
+                'amount': [1.5, np.nan, np.inf],
+                'units': [1, 2, 3],
+                'name': ['x', None, 'z'],
+                'date': pd.to_datetime(['2024-01-01', None, '2024-03-01'])
+            },
+            index = pd.Index(['A', 'B', 'C'], name = 'company')
+        )
+        self.assertSameAsPandas(df)
+        self.assertSameAsPandas(df.rename_axis(None), startrow = 2, startcol = 1)
+
+    def test_multiindex_rows_and_columns(self):
+        self.assertSameAsPandas(self.multi)
+        self.assertSameAsPandas(self.multi, startrow = 3, startcol = 2)
+        self.assertSameAsPandas(self.multi.rename_axis([None, None]).rename_axis([None, None], axis = 1))
+        self.assertSameAsPandas(self.multi.rename_axis(['region', None]))
+        self.assertSameAsPandas(self.multi.iloc[:, :2].droplevel(0, axis = 1))
+        self.assertSameAsPandas(self.multi.iloc[:3].droplevel(0))
+
+    def test_missing_labels(self):
+        df = pd.DataFrame({'amount': [1, 2, 3, 4]}, index = pd.MultiIndex.from_tuples(
+            [('North', 'A'), ('North', None), (None, 'B'), (np.nan, 'C')], names = ['region', 'company']
+        ))
+        self.assertSameAsPandas(df)
+
+        # to_excel writes another label of the level in place of a missing column label
+        w = create_workbook(self.path('native.xlsx'))
+        write_dataframe(w, df.T)
+        w.close()
+        cells, merged = self.read('native.xlsx')
+        self.assertEqual([cells[f'{c}1'][0] for c in 'ABCDE'], ['region', 'North', None, None, None])
+        self.assertEqual([cells[f'{c}2'][0] for c in 'ABCDE'], ['company', 'A', None, 'B', 'C'])
+        self.assertEqual(merged, ['B1:C1', 'D1:E1'])
+
+    def test_no_index(self):
+        df = pd.DataFrame({'company': ['A', 'B'], 'amount': [1.0, np.nan]})
+        self.assertSameAsPandas(df, index = False)
+        self.assertSameAsPandas(df, index = False, startrow = 1, startcol = 1)
+
+    def test_constant_memory(self):
+        # to_excel loses rows in a streaming workbook, so compare with a regular one
+        self.assertSameAsPandas(self.multi, constant_memory = True)
+        self.assertSameAsPandas(self.multi, startrow = 2, startcol = 1, constant_memory = True)
+        self.assertSameAsPandas(self.multi.iloc[:, :0], startrow = 1, constant_memory = True)
+
+
+class TestCompileStyler(ExcelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rows = pd.MultiIndex.from_product([['North', 'South'], ['A', 'B', 'Total']], names = ['region', 'company'])
+        columns = pd.MultiIndex.from_product(
+            [['Actual', 'Budget'], pd.to_datetime(['2024-01-31', '2024-02-29'])], names = ['version', 'period']
+        )
+        self.df = pd.DataFrame(np.arange(24, dtype = float).reshape(6, 4), index = rows, columns = columns)
+        self.df.iloc[1, 1] = np.nan
+
+    def styled(self):
+        styler = self.df.style
+        styler.apply(data_format_standard)
+        styler.apply(data_format_dollars, subset = ['Actual'])
+        styler.apply(data_format_percent, subset = ['Budget'])
+        styler.apply(data_format_totals, subset = pd.IndexSlice[[('North', 'Total'), ('South', 'Total')], :])
+        styler.apply(alternate_color_rows, dd = self.df)
+        styler.apply_index(index_format_standard, axis = 0)
+        styler.apply_index(column_format_header_0, axis = 1, level = 0)
+        styler.apply_index(column_format_header_1, axis = 1, level = 1)
+        return styler
+
+    def assertSameAsStyler(self, styler, index = True, constant_memory = False):
+        """Write a Styler with Styler.to_excel and with write_dataframe and compare the two sheets."""
+        w = create_workbook(self.path('pandas.xlsx'))
+        styler.to_excel(w, sheet_name = 'Sheet1', index = index, merge_cells = True)
+        w.close()
+        w = create_workbook(self.path('native.xlsx'), constant_memory = constant_memory)
+        write_dataframe(w, styler, index = index)
+        w.close()
+        self.assertSameSheet('native.xlsx', 'pandas.xlsx', constant_memory)
+
+    def test_matches_styler(self):
+        self.assertSameAsStyler(self.styled())
+        self.assertSameAsStyler(self.styled(), constant_memory = True)
+
+    def test_matches_styler_without_index(self):
+        df = pd.DataFrame({'Sheet': ['Data', 'Data', 'Charts'], 'Table Name': ['first', 'second', 'third']})
+        styler = df.style
+        styler.apply_index(column_format_header_1, axis = 1)
+        styler.apply(alternate_color_rows, dd = df)
+        styler.apply(format_hyperlink, subset = 'Table Name')
+        self.assertSameAsStyler(styler, index = False)
+
+    def test_dates_keep_their_number_format(self):
+        df = pd.DataFrame({'date': pd.to_datetime(['2024-01-31', '2024-02-29'])}, index = pd.Index(['A', 'B'], name = 'k'))
+        self.assertSameAsStyler(df.style.apply(data_format_percent))
+
+    def test_formats_shared_across_tables(self):
+        w = create_workbook(self.path('shared.xlsx'))
+        write_dataframe(w, self.styled())
+        count = len(w.book.formats)
+        write_dataframe(w, self.styled(), startrow = 20)
+        self.assertEqual(len(w.book.formats), count)
+        self.assertNotIn('format_cache', vars(w.book))
+        w.close()
+
+    def test_falls_back_without_pandas_internals(self):
+        w = create_workbook(self.path('internals.xlsx'))
+        with mock.patch.object(Styler, '_compute', side_effect = AttributeError):
+            self.assertIsNone(compile_styler(w, self.styled()))
+        w.close()
+        with mock.patch.object(excel_output, '_styler_results', return_value = None):
+            self.assertSameAsStyler(self.styled())
+            self.assertSameAsStyler(self.styled(), constant_memory = True)
+
+    def test_leaves_styler_unchanged(self):
+        styler = self.styled()
+        styler._compute()
+        ctx = dict(styler.ctx)
+        w = create_workbook(self.path('unchanged.xlsx'))
+        self.assertIsNotNone(compile_styler(w, styler))
+        w.close()
+        self.assertNotIn('_update_ctx', vars(styler))
+        self.assertEqual(dict(styler.ctx), ctx)
+
+    def test_header_format(self):
+        properties = excel_output._xlsxwriter_properties(ExcelFormatter(pd.DataFrame()).header_style)
+        self.assertEqual(properties, {
+            'bold': True, 'top': 1, 'right': 1, 'bottom': 1, 'left': 1, 'align': 'center', 'valign': 'top'
+        })
+
+
+class TestRangeStyles(ExcelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rows = pd.MultiIndex.from_product([['North', 'South'], ['A', 'B', 'Total']], names = ['region', 'company'])
+        columns = pd.MultiIndex.from_product([['Actual', 'Budget'], ['Jan', 'Feb']])
+        self.df = pd.DataFrame(np.arange(24, dtype = float).reshape(6, 4), index = rows, columns = columns)
+        self.w = create_workbook(self.path('ranges.xlsx'))
+
+    def tearDown(self):
+        self.w.close()
+        super().tearDown()
+
+    def rules(self):
+        """Return the criteria of each conditional format by range, highest priority first."""
+        formats = sorted(
+            (rule['priority'], cell_range, rule['criteria'])
+            for cell_range, rules in self.w.sheets['Data'].cond_formats.items() for rule in rules
+        )
+        return [(cell_range, criteria) for _, cell_range, criteria in formats]
+
+    def test_data_region(self):
+        region = add_dataframe_below(self.w, self.df, 'Data', name_of_region = 'sales')
+        attrs = self.w.sheets['Data'].attrs[region]
+        self.assertEqual(attrs['data_cell_range'], '$C$4:$F$9')
+        add_range_styles(self.w, 'Data', region, [range_color_rows(), range_format_totals()])
+        # the data starts below two header rows and the index names, right of two index columns
+        self.assertEqual(self.rules(), [('C9:F9', '=TRUE'), ('C4:F9', '=MOD(ROW()-4,2)=0')])
+
+    def test_positions_and_parts(self):
+        region = add_dataframe_below(self.w, self.df, 'Data', name_of_region = 'sales', range_styles = [
+            range_format_dollars(cols = [0, 2, 3]),
+            range_style({'bold': True}, part = 'index', rows = [0, 3]),
+            range_color_cols(part = 'columns'),
+            range_style({'italic': True}, rows = slice(1, None, 3), cols = slice(0, None, 2))
+        ])
+        self.assertEqual(self.rules(), [
+            ('C5:F9', '=AND(MOD(ROW()-5,3)=0,MOD(COLUMN()-3,2)=0)'),
+            ('C1:F2', '=MOD(COLUMN()-3,2)=0'),
+            ('A4:B4 A7:B7', '=TRUE'),
+            ('C4:C9 E4:F9', '=TRUE')
+        ])
+        self.assertEqual(region, 'sales')
+
+    def test_single_level_region(self):
+        df = pd.DataFrame({'amount': [1, 2, 3]}, index = pd.Index(['A', 'B', 'C'], name = 'company'))
+        add_dataframe_below(self.w, df, 'Data', name_of_region = 'sales', range_styles = [range_format_totals()])
+        self.assertEqual(self.rules(), [('B4:B4', '=TRUE')])
+
+    def test_unsupported_property(self):
+        region = add_dataframe_below(self.w, self.df, 'Data', name_of_region = 'sales')
+        with self.assertRaises(ValueError):
+            add_range_styles(self.w, 'Data', region, [range_style({'font_name': 'Garamond'})])
+        with self.assertRaises(ValueError):
+            add_range_styles(self.w, 'Data', region, [range_format_totals(rows = 6)])
+
+
+class TestBanding(ExcelTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.w = create_workbook(self.path('banding.xlsx'))
+
+    def tearDown(self):
+        self.w.close()
+        super().tearDown()
+
+    def rules(self, sheet_name = 'Data'):
+        """Return each conditional format as its range and criteria."""
+        formats = self.w.sheets[sheet_name].cond_formats
+        return [(x, rule['criteria']) for x, rules in formats.items() for rule in rules]
+
+    def test_rows_and_columns(self):
+        df = pd.DataFrame(np.zeros((5, 3)), index = pd.Index(list('abcde'), name = 'company'))
+        region = add_dataframe_below(self.w, df, 'Data', name_of_region = 'first')
+        self.assertEqual(self.w.sheets['Data'].attrs[region]['data_cell_range'], '$B$2:$D$6')
+        add_banding(self.w, 'Data', region)
+        add_banding(self.w, 'Data', region, axis = 1)
+        # one rule each, over the data only, shading the first data row and column
+        self.assertEqual(self.rules(), [('B2:D6', '=MOD(ROW()-2,2)=0'), ('B2:D6', '=MOD(COLUMN()-2,2)=0')])
+
+    def test_header_and_index_offsets(self):
+        rows = pd.MultiIndex.from_product([['North', 'South'], ['A', 'B']], names = ['region', 'company'])
+        columns = pd.MultiIndex.from_product([['Actual', 'Budget'], ['Jan', 'Feb']])
+        df = pd.DataFrame(np.zeros((4, 4)), index = rows, columns = columns)
+        add_dataframe_below(self.w, pd.DataFrame({'amount': [1]}), 'Data', name_of_region = 'first')
+        region = add_dataframe_below(self.w, df, 'Data', name_of_region = 'second')
+        add_banding(self.w, 'Data', region, color = '#FFFFFF')
+        add_banding(self.w, 'Data', region, axis = 1)
+        # the second table starts on row 5: two header rows and the index names come before its data
+        self.assertEqual(self.rules(), [('C8:F11', '=MOD(ROW()-8,2)=0'), ('C8:F11', '=MOD(COLUMN()-3,2)=0')])
+
+    def test_table_of_contents(self):
+        df = pd.DataFrame({'amount': [1, 2]}, index = pd.Index(['A', 'B'], name = 'company'))
+        add_dataframe_below(self.w, df, 'Data', name_of_region = 'first')
+        add_dataframe_below(self.w, df, 'Data', name_of_region = 'second')
+        add_dataframe_below(self.w, df, 'Data', name_of_region = 'third')
+        add_table_of_contents(self.w, banding = True)
+        self.assertEqual(self.rules('Contents'), [('A2:C4', '=MOD(ROW()-2,2)=0')])
+
+    def test_table_of_contents_keeps_static_fill(self):
+        df = pd.DataFrame({'amount': [1, 2]}, index = pd.Index(['A', 'B'], name = 'company'))
+        w = create_workbook(self.path('contents.xlsx'))
+        add_dataframe_below(w, df, 'Data', name_of_region = 'first')
+        add_dataframe_below(w, df, 'Data', name_of_region = 'second')
+        add_table_of_contents(w)
+        self.assertEqual(w.sheets['Contents'].cond_formats, {})
+        w.close()
+        cells, _ = self.read('contents.xlsx', 'Contents')
+        self.assertEqual([cells[f'B{row}'][3] for row in (2, 3)], ['FFDCE6F0', None])
+
+
+class TestConstantMemory(ExcelTestCase):
+
+    def test_failed_write_leaves_no_region(self):
+        df = pd.DataFrame({'amount': [1, 2, 3]}, index = pd.Index(['A', 'B', 'C'], name = 'company'))
+        w = create_workbook(self.path('stream.xlsx'), constant_memory = True)
+        add_dataframe_below(w, df, 'Data', name_of_region = 'first')
+        names = [list(x) for x in w.book.defined_names]
+        rows = dict(w.sheets['Data'].set_rows)
+
+        with self.assertRaises(ValueError):
+            add_dataframe_right(w, df, 'Data', startrow = 0, name_of_region = 'second')
+        self.assertEqual([list(x) for x in w.book.defined_names], names)
+        self.assertEqual(dict(w.sheets['Data'].set_rows), rows)
+        w.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
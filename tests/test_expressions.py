@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+from src.data_formatter import expressions
+from src.data_formatter.expressions import parse_expression, compile_expressions, comparison_expressions
+
+
+class TestParseExpression(unittest.TestCase):
+
+    def test_names_with_spaces(self):
+        expr = parse_expression("Actual Vs Budget (%) = growth(Actual, Budget) - 1", ["Actual", "Budget"])
+        self.assertEqual(expr.target, "Actual Vs Budget (%)")
+        self.assertEqual(expr.inputs, ["Actual", "Budget"])
+        result = expr.evaluate({"Actual": np.array([12.0, 5.0]), "Budget": np.array([10.0, 0.0])})
+        np.testing.assert_array_almost_equal(result, [0.2, -1.0])
+
+    def test_longest_name_wins(self):
+        expr = parse_expression("Twice = Actual Vs Budget * 2", ["Actual", "Budget", "Actual Vs Budget"])
+        self.assertEqual(expr.inputs, ["Actual Vs Budget"])
+
+    def test_unknown_name(self):
+        with self.assertRaises(ValueError):
+            parse_expression("Gap = Actual - Plan", ["Actual", "Budget"])
+
+    def test_missing_target(self):
+        with self.assertRaises(ValueError):
+            parse_expression("Actual - Budget", ["Actual", "Budget"])
+
+    def test_disallowed_syntax(self):
+        with self.assertRaises(ValueError):
+            parse_expression("Gap = __import__('os')", ["Actual"])
+        with self.assertRaises(ValueError):
+            parse_expression("Gap = Actual.sum()", ["Actual"])
+
+    @unittest.skipIf(expressions.numexpr is None, "numexpr is not installed")
+    def test_numexpr_matches_numpy(self):
+        expr = parse_expression("Gap = abs(Actual - Budget) / 2", ["Actual", "Budget"])
+        blocks = {"Actual": np.arange(6.0).reshape(2, 3), "Budget": np.ones((2, 3))}
+        np.testing.assert_array_almost_equal(
+            expr.evaluate(blocks, use_numexpr = True),
+            expr.evaluate(blocks, use_numexpr = False)
+        )
+
+
+class TestCompileExpressions(unittest.TestCase):
+
+    def test_dependency_order(self):
+        compiled = compile_expressions(
+            ["Twice = Actual Vs Budget * 2", "Actual Vs Budget = Actual - Budget"],
+            ["Actual", "Budget"]
+        )
+        self.assertEqual([x.target for x in compiled], ["Actual Vs Budget", "Twice"])
+
+    def test_independent_expressions_keep_order(self):
+        compiled = compile_expressions(["B = Actual * 2", "A = Actual * 3"], ["Actual"])
+        self.assertEqual([x.target for x in compiled], ["B", "A"])
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError):
+            compile_expressions(["A = B + 1", "B = A + 1"], ["Actual"])
+
+    def test_duplicate_target(self):
+        with self.assertRaises(ValueError):
+            compile_expressions(["A = Actual", "A = Actual * 2"], ["Actual"])
+
+
+class TestComparisonExpressions(unittest.TestCase):
+
+    def test_variance_and_percent(self):
+        order = ["Actual", "Budget", "Actual Vs Budget", "Actual Vs Budget (%)"]
+        self.assertEqual(comparison_expressions(order), [
+            "Actual Vs Budget = Actual - Budget",
+            "Actual Vs Budget (%) = growth(Actual, Budget) - 1"
+        ])
+
+    def test_short_names_resolve_to_bases(self):
+        order = ["Current Year", "Prior Year", "Current Vs Prior Year"]
+        self.assertEqual(comparison_expressions(order), ["Current Vs Prior Year = Current Year - Prior Year"])
+
+    def test_ambiguous_name(self):
+        with self.assertRaises(ValueError):
+            comparison_expressions(["Current Year", "Current Month", "Current Vs Current Year"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import gc
+import unittest
+import numpy as np
+import pandas as pd
+from src.data_formatter import index_lookup
+from src.data_formatter.index_lookup import (
+    aligned_group_positions,
+    get_index_lookup,
+    grouped_positions,
+    level_codes,
+    match_mask,
+    match_like_mask,
+    mask_positions,
+    mask_labels
+)
+
+
+class TestLevelCodes(unittest.TestCase):
+
+    def test_multiindex_codes(self):
+        index = pd.MultiIndex.from_tuples([('A', 'x'), ('B', 'y'), ('A', 'y')])
+        codes, uniques = level_codes(index, 0)
+        self.assertEqual(list(uniques[codes]), ['A', 'B', 'A'])
+
+    def test_single_index_codes(self):
+        index = pd.Index(['b', 'a', 'b'])
+        codes, uniques = level_codes(index)
+        self.assertEqual(list(uniques[codes]), ['b', 'a', 'b'])
+
+
+class TestMatchMask(unittest.TestCase):
+
+    def setUp(self):
+        self.index = pd.MultiIndex.from_tuples([
+            ('Actual', 'Sales', 'Jan'),
+            ('Budget', 'Sales', 'Jan'),
+            ('Actual', 'Cost', 'Feb'),
+            ('Budget', 'Actual', 'Feb')
+        ])
+
+    def test_all_levels(self):
+        mask = match_mask(self.index, 'Actual')
+        self.assertEqual(mask_positions(mask), [0, 2, 3])
+
+    def test_specific_level(self):
+        mask = match_mask(self.index, 'Actual', 0)
+        self.assertEqual(mask_labels(self.index, mask), [('Actual', 'Sales', 'Jan'), ('Actual', 'Cost', 'Feb')])
+
+    def test_no_match(self):
+        mask = match_mask(self.index, 'Forecast')
+        self.assertEqual(mask_positions(mask), [])
+
+    def test_missing_values_do_not_match(self):
+        index = pd.MultiIndex.from_arrays([['A', np.nan], ['x', 'y']])
+        mask = match_mask(index, 'B', 0)
+        self.assertEqual(mask_positions(mask), [])
+
+    def test_matches_tuple_scan(self):
+        rng = np.random.default_rng(0)
+        index = pd.MultiIndex.from_arrays([
+            rng.choice(['Actual', 'Budget', 'Forecast'], 500),
+            rng.choice(['Sales', 'Cost', 'Actual'], 500),
+            rng.integers(0, 12, 500)
+        ])
+        expected = [i for i, col in enumerate(index) if 'Actual' in col]
+        self.assertEqual(mask_positions(match_mask(index, 'Actual')), expected)
+
+
+class TestMatchLikeMask(unittest.TestCase):
+
+    def test_joined_levels(self):
+        # The levels are joined without a separator, as in the original tuple scan
+        index = pd.MultiIndex.from_tuples([('A', 'foo'), ('B', 'bar')])
+        mask = match_like_mask(index, 'Afo')
+        self.assertEqual(mask_positions(mask), [0])
+
+    def test_specific_level(self):
+        index = pd.MultiIndex.from_tuples([('A', 'foo'), ('B', 'bar'), ('C', 'baz')])
+        mask = match_like_mask(index, ['ba', 'xyz'], lvl = 1)
+        self.assertEqual(mask_positions(mask), [1, 2])
+
+    def test_non_string_levels(self):
+        index = pd.MultiIndex.from_tuples([('A', 2023), ('A', 2024)])
+        mask = match_like_mask(index, '24')
+        self.assertEqual(mask_positions(mask), [1])
+
+    def test_single_index(self):
+        index = pd.Index(['Column One', 'Other'])
+        mask = match_like_mask(index, 'One')
+        self.assertEqual(mask_positions(mask), [0])
+
+
+class TestIndexLookupCache(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame(
+            [[1, 2, 3, 4]],
+            columns = pd.MultiIndex.from_tuples([('A', 'x'), ('A', 'y'), ('B', 'x'), ('B', 'y')])
+        )
+
+    def test_same_index_is_cached(self):
+        self.assertIs(get_index_lookup(self.df.columns), get_index_lookup(self.df.columns))
+
+    def test_entry_is_evicted_when_index_is_replaced(self):
+        key = id(self.df.columns)
+        get_index_lookup(self.df.columns)
+        self.assertIn(key, index_lookup._lookup_cache)
+
+        self.df.columns = pd.MultiIndex.from_tuples([('C', 'x'), ('C', 'y'), ('D', 'x'), ('D', 'y')])
+        gc.collect()
+        self.assertNotIn(key, index_lookup._lookup_cache)
+
+    def test_cache_size_is_bounded(self):
+        indexes = [pd.Index([i]) for i in range(index_lookup.LOOKUP_CACHE_SIZE + 10)]
+        for index in indexes:
+            get_index_lookup(index)
+        self.assertLessEqual(len(index_lookup._lookup_cache), index_lookup.LOOKUP_CACHE_SIZE)
+
+    def test_value_positions(self):
+        table = get_index_lookup(self.df.columns).value_positions(-1)
+        self.assertEqual(table['x'].tolist(), [0, 2])
+        self.assertEqual(table['y'].tolist(), [1, 3])
+
+    def test_grouped_positions(self):
+        groups = grouped_positions(self.df.columns, ['y', 'x'])
+        self.assertEqual([g.tolist() for g in groups], [[0, 1], [2, 3]])
+
+    def test_grouped_positions_interleaved(self):
+        columns = pd.MultiIndex.from_tuples([('A', 'x'), ('B', 'x'), ('A', 'y'), ('B', 'y')])
+        groups = grouped_positions(columns, ['x', 'y'])
+        self.assertEqual([g.tolist() for g in groups], [[0, 2], [1, 3]])
+
+    def test_aligned_group_positions(self):
+        columns = pd.MultiIndex.from_tuples([
+            ('A', 'y'), ('A', 'x'), ('B', 'x'), ('C', 'x'), ('C', 'y')
+        ])
+        aligned = aligned_group_positions(columns, ['x', 'y'])
+        # group B is incomplete and is left out
+        self.assertEqual(aligned.tolist(), [[1, 3], [0, 4]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,17 @@
+import io
 import unittest
+import numpy as np
 import pandas as pd
-from src.data_formatter.pivot_tables import pivot_to
+from src.data_formatter.pivot_tables import (
+    pivot_to,
+    pivot_to_standard_format,
+    pivot_many,
+    pivot_chunks,
+    pivot_parallel,
+    IncrementalPivot,
+    add_subtotals
+)
+from src.data_formatter.constants import duration_dtype, annum_dtype
 
 
 class TestPivotTo(unittest.TestCase):
@@ -31,6 +42,20 @@ class TestPivotTo(unittest.TestCase):
         expected.columns.names = ['Testing Data', None, 'Region']
         pd.testing.assert_frame_equal(result, expected)
 
+    def test_title_does_not_modify_input(self):
+        original = self.df.copy()
+        pivot_to(self.df, values=['Sales'], columns=['Region'], title='Report')
+        pd.testing.assert_frame_equal(self.df, original)
+
+    def test_any_title(self):
+        result = pivot_to(self.df, values=['Sales'], columns=['Region'], title='Report')
+        self.assertEqual(result.columns.names, ['Report', None, 'Region'])
+        self.assertEqual(result.columns.tolist(), [('Report', 'Sales', 'North'), ('Report', 'Sales', 'South')])
+
+    def test_title_with_margins(self):
+        result = pivot_to(self.df, values=['Sales'], columns=['Region'], title='Report', margins=True)
+        self.assertEqual(result[('Report', 'Sales', 'Total')].iloc[-1], 700)
+
     def test_pivot_without_title(self):
         # Test pivoting without a title
         result = pivot_to(self.df, values=['Sales', 'Profit'], columns=['Region'])
@@ -79,5 +104,277 @@ class TestPivotTo(unittest.TestCase):
         pd.testing.assert_frame_equal(result, expected)
 
 
+class TestPivotToStandardFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'company': ['A', 'A', 'B', 'B'],
+            'duration': ['YTD', 'MTD', 'MTD', 'YTD'],
+            'annum': ['Prior Year', 'Current Year', 'Current Year', 'Prior Year'],
+            'amount': [1, 2, 3, 4]
+        })
+
+    def test_canonical_levels(self):
+        result = pivot_to_standard_format(self.df.copy(), canonical = True)
+        self.assertEqual(result.columns.levels[1].dtype, duration_dtype)
+        self.assertEqual(result.columns.levels[2].dtype, annum_dtype)
+        # only observed combinations are kept
+        self.assertEqual(len(result.columns), 2)
+        self.assertEqual(
+            result.sort_index(axis = 1).columns.tolist(),
+            [('amount', 'MTD', 'Current Year'), ('amount', 'YTD', 'Prior Year')]
+        )
+
+    def test_canonical_matches_values(self):
+        result = pivot_to_standard_format(self.df.copy(), canonical = True)
+        expected = pivot_to_standard_format(self.df.copy())
+        self.assertEqual(result.values.tolist(), expected.values.tolist())
+
+
+class TestPivotToFast(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Year': [2020, 2020, 2021, 2021, 2021],
+            'Region': ['North', 'South', 'North', 'South', 'South'],
+            'Product': ['A', 'B', 'A', 'B', 'A'],
+            'Sales': [100, 150, 200, 250, 50],
+            'Profit': [20.5, 30.0, 40.0, 50.0, 10.0]
+        })
+
+    def test_matches_default(self):
+        for kwargs in [{}, {'margins': True}, {'func': ['sum', 'max']}]:
+            expected = pivot_to(self.df.copy(), values = ['Sales', 'Profit'], columns = ['Region'], **kwargs)
+            result = pivot_to(self.df.copy(), values = ['Sales', 'Profit'], columns = ['Region'], fast = True, **kwargs)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_matches_default_with_several_column_keys(self):
+        for func in ['sum', 'mean', ['count', 'min']]:
+            expected = pivot_to(self.df.copy(), values = ['Sales', 'Profit'], columns = ['Product', 'Region'], func = func)
+            result = pivot_to(self.df.copy(), values = ['Sales', 'Profit'], columns = ['Product', 'Region'], func = func, fast = True)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_missing_keys_and_values(self):
+        df = self.df.copy()
+        df.loc[1, 'Product'] = None
+        df.loc[[0, 2], 'Profit'] = np.nan
+        for func in ['sum', 'max']:
+            expected = pivot_to(df.copy(), values = ['Profit'], columns = ['Region'], func = func)
+            result = pivot_to(df.copy(), values = ['Profit'], columns = ['Region'], func = func, fast = True)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_categorical_keys_keep_observed_combinations(self):
+        df = self.df.drop(columns = 'Profit')
+        df['Region'] = df['Region'].astype(pd.CategoricalDtype(['West', 'South', 'North']))
+        result = pivot_to(df, values = ['Sales'], columns = ['Region'], fast = True)
+        self.assertEqual(result.columns.tolist(), [('Sales', 'North'), ('Sales', 'South')])
+        self.assertEqual(result.index.tolist(), [(2020, 'A'), (2020, 'B'), (2021, 'A'), (2021, 'B')])
+        self.assertEqual(result.to_numpy().tolist(), [[100, 0], [0, 150], [200, 50], [0, 250]])
+
+    def test_default_keeps_unobserved_categories(self):
+        df = self.df.drop(columns = 'Profit')
+        df['Region'] = df['Region'].astype(pd.CategoricalDtype(['West', 'South', 'North']))
+        result = pivot_to(df, values = ['Sales'], columns = ['Region'])
+        self.assertEqual(result.columns.tolist(), [('Sales', 'West'), ('Sales', 'South'), ('Sales', 'North')])
+        self.assertEqual(result[('Sales', 'West')].tolist(), [0, 0, 0, 0])
+
+    def test_narrow_aggregations_keep_dtype(self):
+        result = pivot_to(self.df.copy(), values = ['Sales'], columns = ['Region'], func = 'min', fast = True)
+        self.assertTrue(all(dtype == self.df['Sales'].dtype for dtype in result.dtypes))
+
+    def test_does_not_convert_input(self):
+        df = self.df.copy()
+        pivot_to(df, values = ['Sales'], columns = ['Region'], fast = True)
+        self.assertEqual(df['Region'].dtype, object)
+        self.assertEqual(df['Sales'].dtype, self.df['Sales'].dtype)
+
+
+class TestPivotMany(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'account': ['Sales', 'Sales', 'Cost', 'Cost', 'Sales', 'Cost'],
+            'duration': ['MTD', 'YTD', 'MTD', 'YTD', 'MTD', 'MTD'],
+            'annum': ['Current Year', 'Current Year', 'Prior Year', 'Current Year', 'Prior Year', 'Prior Year'],
+            'amount': [10, 30, 5, 15, 8, 7]
+        })
+
+    def test_matches_pivot_to(self):
+        specs = [
+            {'values': ['amount'], 'columns': ['duration', 'annum']},
+            {'values': ['amount'], 'columns': ['annum'], 'index': ['account'], 'func': 'max', 'margins': True},
+            {'values': ['amount'], 'columns': ['annum'], 'index': ['account'], 'func': 'mean', 'margins': True}
+        ]
+        results = pivot_many(self.df, specs)
+        pd.testing.assert_frame_equal(results[0], pivot_to(self.df, ['amount'], ['duration', 'annum']))
+        pd.testing.assert_frame_equal(
+            results[1], pivot_to(self.df.drop(columns = 'duration'), ['amount'], ['annum'], func = 'max', margins = True)
+        )
+        pd.testing.assert_frame_equal(
+            results[2], pivot_to(self.df.drop(columns = 'duration'), ['amount'], ['annum'], func = 'mean', margins = True)
+        )
+
+    def test_where_and_title(self):
+        results = pivot_many(self.df, {
+            'ytd': {'values': ['amount'], 'columns': ['annum'], 'index': ['account'], 'where': {'duration': ['YTD']}, 'title': 'YTD'}
+        })
+        result = results['ytd']
+        self.assertEqual(result.columns.tolist(), [('YTD', 'amount', 'Current Year')])
+        self.assertEqual(result[('YTD', 'amount', 'Current Year')].tolist(), [30, 15])
+
+    def test_count_rolls_up(self):
+        result = pivot_many(self.df, [{'values': ['amount'], 'columns': ['annum'], 'index': ['account'], 'func': 'count'}])[0]
+        expected = pivot_to(self.df.drop(columns = 'duration'), ['amount'], ['annum'], func = 'count')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_unsupported_function(self):
+        with self.assertRaises(ValueError):
+            pivot_many(self.df, [{'values': ['amount'], 'columns': ['annum'], 'func': 'median'}])
+
+    def test_unknown_key(self):
+        with self.assertRaises(ValueError):
+            pivot_many(self.df, [{'values': ['amount'], 'columns': ['region']}])
+
+
+class TestPivotChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'account': ['Sales', 'Cost', 'Sales', 'Other', 'Cost', 'Sales', 'Other'],
+            'annum': ['Prior Year', 'Current Year', 'Current Year', 'Prior Year', 'Prior Year', 'Prior Year', 'Current Year'],
+            'amount': [10, 5, 30, 2, 15, 8, 7]
+        })
+
+    def test_matches_pivot_to(self):
+        chunks = [self.df.iloc[i:i + 2] for i in range(0, len(self.df), 2)]
+        for func in ['sum', 'mean', 'min']:
+            result = pivot_chunks(iter(chunks), ['amount'], ['annum'], func = func, margins = True, merge_every = 2)
+            expected = pivot_to(self.df, ['amount'], ['annum'], func = func, margins = True)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_read_csv_chunks(self):
+        reader = pd.read_csv(io.StringIO(self.df.to_csv(index = False)), chunksize = 3)
+        result = pivot_chunks(reader, ['amount'], ['annum'], title = 'Ledger')
+        expected = pivot_to(self.df, ['amount'], ['annum'], title = 'Ledger')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_no_chunks(self):
+        with self.assertRaises(ValueError):
+            pivot_chunks(iter([]), ['amount'], ['annum'])
+
+
+class TestPivotParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'company': ['A', 'B', 'C', 'A', 'B', 'C', 'D', 'A'],
+            'year': [2023, 2023, 2024, 2024, 2023, 2024, 2023, 2023],
+            'annum': ['Current Year', 'Prior Year'] * 4,
+            'amount': [10, 5, 30, 2, 15, 8, 7, 1]
+        })
+
+    def test_matches_pivot_to(self):
+        for func in ['sum', 'mean']:
+            result = pivot_parallel(self.df, ['amount'], ['annum'], func = func, margins = True, max_workers = 2)
+            expected = pivot_to(self.df, ['amount'], ['annum'], func = func, margins = True)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_single_worker(self):
+        result = pivot_parallel(self.df, ['amount'], ['annum'], title = 'Report', max_workers = 1)
+        pd.testing.assert_frame_equal(result, pivot_to(self.df, ['amount'], ['annum'], title = 'Report'))
+
+    def test_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            pivot_parallel(self.df, ['amount'], ['annum'], max_workers = 0)
+
+
+class TestIncrementalPivot(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'company': ['A', 'B', 'A', 'B', 'C', 'A', 'D', 'B'],
+            'annum': ['Current Year', 'Prior Year', 'Prior Year', 'Current Year'] * 2,
+            'amount': [10, 5, 30, 2, 15, 8, 7, 1]
+        })
+
+    def test_matches_pivot_to(self):
+        for func in ['sum', 'min', 'mean', ['sum', 'count']]:
+            pivot = IncrementalPivot(['amount'], ['annum'], func = func, margins = True)
+            for start, end in [(0, 3), (3, 4), (4, 6), (6, 8)]:
+                result = pivot.update(self.df.iloc[start:end])
+                expected = pivot_to(self.df.iloc[:end], ['amount'], ['annum'], func = func, margins = True)
+                pd.testing.assert_frame_equal(result, expected)
+
+    def test_update_existing_keys_in_place(self):
+        pivot = IncrementalPivot(['amount'], ['annum'], title = 'Report', margins = True)
+        pivot.update(self.df)
+        result = pivot.update(self.df.iloc[:2])
+        expected = pivot_to(pd.concat([self.df, self.df.iloc[:2]]), ['amount'], ['annum'], title = 'Report', margins = True)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_all_missing_delta(self):
+        df = pd.DataFrame({
+            'company': ['A', 'A', 'B', 'A', 'B'],
+            'annum': ['Current Year'] * 5,
+            'amount': [5.0, np.nan, 3.0, np.nan, np.nan]
+        })
+        for func in ['min', 'max']:
+            pivot = IncrementalPivot(['amount'], ['annum'], func = func, margins = True)
+            for start, end in [(0, 1), (1, 2), (2, 3), (3, 5)]:
+                result = pivot.update(df.iloc[start:end])
+                expected = pivot_to(df.iloc[:end], ['amount'], ['annum'], func = func, margins = True)
+                pd.testing.assert_frame_equal(result, expected)
+            self.assertEqual(result.loc['A', ('amount', 'Current Year')], 5.0)
+
+    def test_returns_copies(self):
+        pivot = IncrementalPivot(['amount'], ['annum'])
+        first = pivot.update(self.df.iloc[:4])
+        pivot.update(self.df.iloc[:4])
+        self.assertEqual(first.loc['A', ('amount', 'Current Year')], 10)
+
+    def test_no_rows(self):
+        with self.assertRaises(ValueError):
+            IncrementalPivot(['amount'], ['annum']).pivot()
+
+
+class TestAddSubtotals(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'region': ['North', 'South', 'North', 'South', 'North'],
+            'company': ['A', 'B', 'C', 'B', 'A'],
+            'annum': ['Current Year', 'Prior Year', 'Current Year', 'Current Year', 'Prior Year'],
+            'amount': [1, 2, 3, 4, 5]
+        })
+        self.pivot = pivot_to(self.df, ['amount'], ['annum'])
+
+    def test_subtotal_rows_follow_their_group(self):
+        result = add_subtotals(self.pivot)
+        self.assertEqual(result.index.tolist(), [
+            ('North', 'A'), ('North', 'C'), ('North', 'Total'),
+            ('South', 'B'), ('South', 'Total'), ('Total', '')
+        ])
+        self.assertEqual(result.loc[('North', 'Total'), ('amount', 'Current Year')], 4)
+        self.assertEqual(result.loc[('Total', ''), ('amount', 'Prior Year')], 7)
+
+    def test_rolls_up_max(self):
+        pivot = pivot_to(self.df, ['amount'], ['annum'], func = 'max')
+        result = add_subtotals(pivot, func = 'max', grand_total = False)
+        self.assertEqual(result.loc[('South', 'Total'), ('amount', 'Current Year')], 4)
+        self.assertNotIn(('Total', ''), result.index)
+
+    def test_last_level_and_mean_are_rejected(self):
+        with self.assertRaises(ValueError):
+            add_subtotals(self.pivot, levels = ['company'])
+        with self.assertRaises(ValueError):
+            add_subtotals(self.pivot, func = 'mean')
+
+    def test_pivot_to_margins_match_pivot_table(self):
+        result = pivot_to(self.df, ['amount'], ['annum'], margins = True, subtotals = True)
+        expected = pivot_to(self.df, ['amount'], ['annum'], margins = True)
+        pd.testing.assert_frame_equal(result.loc[expected.index], expected, check_dtype = False)
+        self.assertEqual(result.loc[('South', 'Total'), ('amount', 'Total')], 6)
+
+
 if __name__ == '__main__':
     unittest.main()
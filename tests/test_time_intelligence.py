@@ -0,0 +1,124 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.data_formatter.time_intelligence import compute_durations, compute_durations_as_of
+
+
+class TestComputeDurations(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'company': ['A', 'A', 'A', 'A', 'B', 'B'],
+            'date': pd.to_datetime([
+                '2023-12-29', '2024-01-05', '2024-01-08', '2024-02-10', '2024-01-05', '2024-01-06'
+            ]),
+            'amount': [5, 10, 20, 40, 1, 2]
+        })
+
+    def _amount(self, result, company, date, duration):
+        row = result[
+            (result['company'] == company)
+            & (result['period_ending'] == pd.Timestamp(date))
+            & (result['duration'] == duration)
+        ]
+        self.assertEqual(len(row), 1)
+        return row['amount'].iloc[0]
+
+    def test_long_format_columns(self):
+        result = compute_durations(self.df)
+        self.assertEqual(result.columns.tolist(), ['company', 'period_ending', 'duration', 'amount'])
+        self.assertEqual(result['duration'].unique().tolist(), ['WTD', 'MTD', 'QTD', 'YTD', 'LTM'])
+
+    def test_to_date_resets(self):
+        result = compute_durations(self.df)
+        # 2024-01-08 is a Monday, so the week starts again
+        self.assertEqual(self._amount(result, 'A', '2024-01-08', 'WTD'), 20)
+        self.assertEqual(self._amount(result, 'A', '2024-01-08', 'MTD'), 30)
+        self.assertEqual(self._amount(result, 'A', '2024-02-10', 'MTD'), 40)
+        self.assertEqual(self._amount(result, 'A', '2024-02-10', 'QTD'), 70)
+        self.assertEqual(self._amount(result, 'A', '2024-02-10', 'YTD'), 70)
+        self.assertEqual(self._amount(result, 'A', '2024-02-10', 'LTM'), 75)
+        self.assertEqual(self._amount(result, 'B', '2024-01-06', 'WTD'), 3)
+
+    def test_fiscal_year_end(self):
+        result = compute_durations(self.df, durations = ['YTD'], year_end = 'JAN')
+        self.assertEqual(self._amount(result, 'A', '2024-01-08', 'YTD'), 35)
+        self.assertEqual(self._amount(result, 'A', '2024-02-10', 'YTD'), 40)
+
+    def test_frequency_carries_totals(self):
+        result = compute_durations(self.df, durations = ['MTD', 'YTD'], freq = 'M')
+        # company B has no entries in February
+        self.assertEqual(self._amount(result, 'B', '2024-02-29', 'MTD'), 0)
+        self.assertEqual(self._amount(result, 'B', '2024-02-29', 'YTD'), 3)
+        self.assertEqual(self._amount(result, 'A', '2023-12-31', 'MTD'), 5)
+        # company B is only reported once it has entries
+        self.assertEqual(len(result[(result['company'] == 'B') & (result['period_ending'] == '2023-12-31')]), 0)
+
+    def test_matches_groupby(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        df = pd.DataFrame({
+            'company': rng.choice(['A', 'B', 'C'], n),
+            'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 500, n), unit = 'D'),
+            'amount': rng.integers(1, 100, n)
+        })
+        result = compute_durations(df, durations = ['MTD', 'LTM'], freq = 'M')
+        result = result[result['period_ending'] == '2024-03-31'].set_index(['company', 'duration'])['amount']
+
+        month = df[(df['date'] >= '2024-03-01') & (df['date'] <= '2024-03-31')].groupby('company')['amount'].sum()
+        ltm = df[(df['date'] > '2023-03-31') & (df['date'] <= '2024-03-31')].groupby('company')['amount'].sum()
+        for company in ['A', 'B', 'C']:
+            self.assertEqual(result[(company, 'MTD')], month[company])
+            self.assertEqual(result[(company, 'LTM')], ltm[company])
+
+    def test_missing_key(self):
+        df = pd.DataFrame({
+            'company': ['A', 'A', None, None, 'B'],
+            'date': pd.to_datetime(['2024-01-05', '2024-02-03', '2024-01-10', '2024-02-03', '2024-02-03']),
+            'amount': [1.0, 2.0, 10.0, 20.0, 100.0]
+        })
+        result = compute_durations(df, durations = ['YTD'])
+        self.assertEqual(self._amount(result, 'A', '2024-02-03', 'YTD'), 3)
+        self.assertEqual(self._amount(result, 'B', '2024-02-03', 'YTD'), 100)
+        missing = result[result['company'].isna() & (result['period_ending'] == '2024-02-03')]
+        self.assertEqual(missing['amount'].tolist(), [30])
+
+    def test_small_key_after_large_ones(self):
+        df = pd.DataFrame({
+            'company': ['A', 'A', 'B', 'B', 'C', 'C'],
+            'date': pd.to_datetime(['2024-01-05', '2024-02-03'] * 3),
+            'amount': [1e17, 3e17, 2e17, 5e17, 0.1, 0.2]
+        })
+        result = compute_durations(df, durations = ['MTD', 'YTD'])
+        self.assertAlmostEqual(self._amount(result, 'C', '2024-01-05', 'YTD'), 0.1)
+        self.assertAlmostEqual(self._amount(result, 'C', '2024-02-03', 'MTD'), 0.2)
+        self.assertAlmostEqual(self._amount(result, 'C', '2024-02-03', 'YTD'), 0.3)
+        self.assertEqual(self._amount(result, 'B', '2024-02-03', 'MTD'), 5e17)
+
+    def test_unknown_duration(self):
+        with self.assertRaises(ValueError):
+            compute_durations(self.df, durations = ['MTD', 'HTD'])
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            compute_durations(self.df, value_col = 'sales')
+
+
+class TestComputeDurationsAsOf(unittest.TestCase):
+
+    def test_annum_labels(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2023-02-15', '2024-01-10', '2024-02-20']),
+            'amount': [1, 10, 100]
+        })
+        result = compute_durations_as_of(df, '2024-02-29', durations = ['MTD', 'YTD'])
+        self.assertEqual(result.columns.tolist(), ['annum', 'duration', 'amount'])
+        amounts = result.set_index(['annum', 'duration'])['amount']
+        self.assertEqual(amounts[('Current Year', 'MTD')], 100)
+        self.assertEqual(amounts[('Current Year', 'YTD')], 110)
+        self.assertEqual(amounts[('Prior Month', 'MTD')], 10)
+        self.assertEqual(amounts[('Prior Year', 'YTD')], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
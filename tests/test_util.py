@@ -1,6 +1,8 @@
 import unittest
+import numpy as np
 import pandas as pd
 from src.data_formatter.util import (
+    _level_sort_keys,
     sort_dataframe_by_custom_order,
     move_df_level_to_front
 )
@@ -75,6 +77,50 @@ class TestSortDataFrameByCustomOrder(unittest.TestCase):
         self.assertEqual(result.columns.tolist(), expected_columns)
 
 
+    def test_multiple_levels(self):
+        # Sort two levels at once, given by number and by name
+        df = self.df_columns.copy()
+        df.columns.names = ['first', 'second', 'third']
+        result = sort_dataframe_by_custom_order(df, {'second': ['B', 'A'], 2: [2, 1]}, axis = 1)
+        expected_columns = [
+            ('One', 'B', 2),
+            ('One', 'B', 1),
+            ('One', 'A', 2),
+            ('One', 'A', 1),
+            ('Two', 'A', 2),
+            ('Two', 'A', 1)
+        ]
+        self.assertEqual(result.columns.tolist(), expected_columns)
+
+    def test_negative_and_unknown_levels(self):
+        result = sort_dataframe_by_custom_order(self.df_columns, ['B', 'A'], axis = 1, level = -2)
+        expected = sort_dataframe_by_custom_order(self.df_columns, ['B', 'A'], axis = 1, level = 1)
+        self.assertEqual(result.columns.tolist(), expected.columns.tolist())
+        with self.assertRaises(KeyError):
+            sort_dataframe_by_custom_order(self.df_columns, ['B', 'A'], axis = 1, level = 3)
+        with self.assertRaises(KeyError):
+            sort_dataframe_by_custom_order(self.df_columns, ['B', 'A'], axis = 1, level = 'second')
+
+    def test_unlisted_values_come_last(self):
+        result = sort_dataframe_by_custom_order(self.df_index, [2], axis = 0, level = 2)
+        self.assertEqual(result.index.get_level_values(2).tolist(), [2, 1, 2, 1, 2, 1])
+
+    def test_single_level_index(self):
+        df = pd.DataFrame({'b': [1], 'c': [2], 'a': [3]})
+        result = sort_dataframe_by_custom_order(df, ['c', 'a'], axis = 1)
+        self.assertEqual(result.columns.tolist(), ['c', 'a', 'b'])
+
+    def test_ties_keep_their_order(self):
+        df = pd.DataFrame({'v': [1, 2, 3]}, index = pd.MultiIndex.from_tuples([('A', 1), ('B', 1), ('A', 1)]))
+        result = sort_dataframe_by_custom_order(df, ['B', 'A'])
+        self.assertEqual(result['v'].tolist(), [2, 1, 3])
+
+    def test_missing_labels_come_after_unlisted_values(self):
+        # An order longer than the level must not rank unlisted values after missing labels
+        idx = pd.Index(['X', None, 'B', 'A'])
+        keys = _level_sort_keys(idx, {0: ['A', 'B', 'C', 'D', 'E', 'F']})
+        self.assertEqual(idx[np.argsort(keys[0], kind = 'stable')].tolist(), ['A', 'B', 'X', None])
+
 class TestMoveDfLevelToFront(unittest.TestCase):
 
     def setUp(self):
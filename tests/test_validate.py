@@ -0,0 +1,23 @@
+import unittest
+import pandas as pd
+from src.data_formatter.validate import validate_string_in_any_column_tuple
+
+
+class TestValidateStringInAnyColumnTuple(unittest.TestCase):
+
+    def test_multiindex_levels_must_equal(self):
+        columns = pd.MultiIndex.from_tuples([('acct 1', 'Actual'), ('acct 1', 'Budget')])
+        self.assertTrue(validate_string_in_any_column_tuple(columns, 'Budget'))
+        with self.assertRaises(ValueError):
+            validate_string_in_any_column_tuple(columns, 'Budg')
+
+    def test_single_level_labels_may_contain(self):
+        columns = pd.Index(['Actual', 'Budget'])
+        self.assertTrue(validate_string_in_any_column_tuple(columns, 'Budget'))
+        self.assertTrue(validate_string_in_any_column_tuple(columns, 'udg'))
+        with self.assertRaises(ValueError):
+            validate_string_in_any_column_tuple(columns, 'Forecast')
+
+
+if __name__ == '__main__':
+    unittest.main()